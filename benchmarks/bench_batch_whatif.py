@@ -0,0 +1,45 @@
+"""Time calculate_transfer_batch against rerunning calculate_transfer per scenario.
+
+Usage: python benchmarks/bench_batch_whatif.py [rows] [margins]
+"""
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monthly_expense_track import (PAYEES, ExpenseStore, IncomeStore, calculate_transfer,
+                                   calculate_transfer_batch, pay_period_dates)
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    margin_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    rng = random.Random(42)
+    start = datetime.now().toordinal()
+    expenses = ExpenseStore()
+    for _ in range(rows):
+        expenses.add(rng.choice(PAYEES), rng.randrange(100000) / 100, datetime.fromordinal(start + rng.randrange(400)))
+    income = IncomeStore([
+        {'Bank': 'SCCU Checking', 'Amount': 5000.0, 'Balance Date': datetime.now()},
+        {'Bank': 'E-Trade Savings', 'Amount': 250000.0, 'Balance Date': datetime.now()},
+    ])
+    as_of_dates = pay_period_dates(datetime.now(), months=12)
+    margins = [500.0 + 50 * i for i in range(margin_count)]
+    
+    begin = time.perf_counter()
+    results = calculate_transfer_batch(expenses, income, as_of_dates, margins)
+    batch = time.perf_counter() - begin
+    print(f"{len(results)} scenarios over {rows} expenses: batch {batch * 1000:.1f} ms")
+    
+    begin = time.perf_counter()
+    for as_of in as_of_dates:
+        for margin in margins[:5]:
+            calculate_transfer(expenses, income, as_of=as_of, margin=margin)
+    per_call = (time.perf_counter() - begin) / (len(as_of_dates) * 5)
+    print(f"calculate_transfer per scenario: {per_call * 1000:.2f} ms "
+          f"(~{per_call * len(results):.2f} s for all {len(results)})")
+
+if __name__ == "__main__":
+    main()
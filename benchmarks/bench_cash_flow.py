@@ -0,0 +1,78 @@
+"""Time the cash-flow timeline against rerunning the analysis per date.
+
+Builds a store of expenses spread over a multi-year horizon, then answers
+"when does checking first drop below the margin" both by re-running
+calculate_transfer-style sums for each day and with the prefix-sum
+timeline (build once, then binary searches).
+Usage: python benchmarks/bench_cash_flow.py [rows] [years]
+"""
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monthly_expense_track import PAYEES, ExpenseStore, IncomeStore, cash_flow_timeline, to_cents
+
+def build_ledger(count, years, seed=42):
+    """Expenses due over the next `years` years and a large checking balance."""
+    rng = random.Random(seed)
+    today = datetime.now().toordinal()
+    expenses = ExpenseStore()
+    for _ in range(count):
+        expenses.add_row(rng.choice(PAYEES), rng.randrange(1, 20000), today + rng.randrange(365 * years))
+    income = IncomeStore()
+    income.add_row('SCCU Checking', sum(expenses.cents) // 2, today)
+    return expenses, income
+
+def rerun_first_below(expenses, income, margin, days):
+    """Walk forward day by day, re-summing everything due so far (the old way)."""
+    today = datetime.now()
+    start = income.cents[0]
+    ordinals, rows = expenses.due_index()
+    for day in range(days):
+        end = (today + timedelta(days=day + 1)).toordinal()
+        paid = sum(expenses.cents[row] for row, ordinal in zip(rows, ordinals) if ordinal < end)
+        if start - paid < to_cents(margin):
+            return day
+    return None
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    years = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    expenses, income = build_ledger(count, years)
+    expenses.due_index()
+    
+    start = time.perf_counter()
+    timeline = cash_flow_timeline(expenses, income, horizon_days=365 * years)
+    build_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for margin in range(0, 100000, 100):
+        timeline.first_below(margin)
+        timeline.minimum_balance()
+    query_time = (time.perf_counter() - start) / 1000
+    
+    start = time.perf_counter()
+    cached = cash_flow_timeline(expenses, income, horizon_days=365 * years)
+    cached_time = time.perf_counter() - start
+    assert cached is timeline
+    
+    print(f"{count} expenses over {years} years, {len(timeline)} distinct days")
+    print(f"  timeline build   {build_time * 1000:10.1f} ms")
+    print(f"  cached lookup    {cached_time * 1000:10.3f} ms")
+    print(f"  query pair       {query_time * 1e6:10.2f} us")
+    print(f"  first below:     {timeline.first_below(1000.0)}")
+    
+    # The old way is quadratic; time a few days of it to extrapolate
+    sample_days = 3
+    start = time.perf_counter()
+    rerun_first_below(expenses, income, -1e12, sample_days)
+    per_day = (time.perf_counter() - start) / sample_days
+    print(f"  rerun per day    {per_day * 1000:10.1f} ms "
+          f"(~{per_day * 365 * years:.0f} s for the whole horizon)")
+
+if __name__ == '__main__':
+    main()
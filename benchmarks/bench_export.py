@@ -0,0 +1,72 @@
+"""Compare the export formats by file size, save time and load time.
+
+Loads a synthetic ledger, then saves it with save_to_csv as plain CSV,
+gzipped CSV, the built-in .cols format and Parquet (only when pyarrow is
+installed), and reads each back with read_csv_file without a snapshot.
+A csv.DictWriter loop, one dict and strftime per row, is timed as the
+baseline for the CSV writer. Times are the best of `repeat` runs.
+Usage: python benchmarks/bench_export.py [rows] [repeat]
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ledger_generator import generate_ledger
+from monthly_expense_track import Money, optional_module, read_csv_file, save_to_csv
+
+def dictwriter_baseline(filename, expenses, income):
+    """Write the ledger the way save_to_csv used to, for comparison."""
+    with open(filename, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['Type', 'Payee', 'Bank', 'Amount', 'Due Date', 'Balance Date'])
+        writer.writeheader()
+        for expense in expenses:
+            writer.writerow({'Type': 'Expense', 'Payee': expense['Payee'], 'Bank': '',
+                             'Amount': Money.of(expense['Amount']),
+                             'Due Date': expense['Due Date'].strftime('%Y-%m-%d'), 'Balance Date': ''})
+        for inc in income:
+            writer.writerow({'Type': 'Income', 'Payee': '', 'Bank': inc['Bank'],
+                             'Amount': Money.of(inc['Amount']), 'Due Date': '',
+                             'Balance Date': inc['Balance Date'].strftime('%Y-%m-%d')})
+
+def timed(repeat, func, *args):
+    """Return (best seconds, result) over repeat calls, with their output discarded."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with redirect_stdout(StringIO()):
+            result = func(*args)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    with tempfile.TemporaryDirectory() as workdir:
+        expenses, income = read_csv_file(generate_ledger(os.path.join(workdir, 'ledger.csv'), rows))
+        baseline = os.path.join(workdir, 'baseline.csv')
+        seconds, _ = timed(repeat, dictwriter_baseline, baseline, expenses, income)
+        print(f"{rows} rows")
+        print(f"  {'format':<16} {'size':>10} {'save':>10} {'rows/s':>12} {'load':>10}")
+        print(f"  {'DictWriter':<16} {os.path.getsize(baseline) / 1e6:8.1f} MB {seconds * 1000:7.0f} ms "
+              f"{rows / seconds:12,.0f} {'':>10}")
+        formats = ['ledger.out.csv', 'ledger.csv.gz', 'ledger.cols']
+        if optional_module('pyarrow.parquet') is not None:
+            formats.append('ledger.parquet')
+        for name in formats:
+            filename = os.path.join(workdir, name)
+            save_seconds, _ = timed(repeat, save_to_csv, expenses, income, filename)
+            load_seconds, (loaded, _) = timed(repeat, read_csv_file, filename, False)
+            assert len(loaded) == len(expenses)
+            print(f"  {name.partition('.')[2]:<16} {os.path.getsize(filename) / 1e6:8.1f} MB "
+                  f"{save_seconds * 1000:7.0f} ms {rows / save_seconds:12,.0f} {load_seconds * 1000:7.0f} ms")
+
+if __name__ == '__main__':
+    main()
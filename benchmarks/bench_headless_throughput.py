@@ -0,0 +1,36 @@
+"""Measure headless-mode throughput over many small household ledgers.
+
+Usage: python benchmarks/bench_headless_throughput.py [ledgers] [rows_per_ledger]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_stream_memory import write_ledger
+from monthly_expense_track import analyze_ledgers
+
+def main():
+    ledgers = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    with tempfile.TemporaryDirectory() as tmp:
+        filenames = []
+        for i in range(ledgers):
+            filename = str(Path(tmp) / f"household_{i}.csv")
+            write_ledger(filename, rows, seed=i)
+            filenames.append(filename)
+        # The first pass parses every CSV and writes snapshots; later passes reuse them
+        runs = [('cold', 1)] + [('snapshot', jobs) for jobs in sorted({1, os.cpu_count() or 1})]
+        for label, jobs in runs:
+            start = time.perf_counter()
+            summaries = analyze_ledgers(filenames, output='json', jobs=jobs)
+            elapsed = time.perf_counter() - start
+            assert not any('error' in summary for summary in summaries)
+            print(f"jobs={jobs:<3} {label:<9} {ledgers} ledgers in {elapsed:.2f}s "
+                  f"({ledgers / elapsed * 60:,.0f} ledgers/minute)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Time undo and redo on a large ledger, against copying it before each edit.
+
+Loads a synthetic ledger, then makes `steps` edits through an
+EditHistory the way the data management menu does (modify an amount and
+due date, add a row, delete a row), undoes all of them and redoes them
+all again, checking the ledger comes back the same each way. The
+due-date and per-name indexes are built first and must still be current
+at the end, so every step pays for keeping them up to date. Reports the
+mean and worst time per step for each kind of edit and the memory the
+history holds, next to one copy.deepcopy of the expense store, the cost
+per edit of keeping undo levels as copies.
+Usage: python benchmarks/bench_history.py [rows] [steps]
+"""
+import copy
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ledger_generator import generate_ledger
+from monthly_expense_track import PAYEES, EditHistory, Money, read_csv_file
+
+def columns(store):
+    """The store's column bytes, to compare ledgers exactly."""
+    return bytes(store.name_ids), bytes(store.cents), bytes(store.ordinals)
+
+KINDS = ('modify', 'add', 'delete')
+
+def pick_edit(rng):
+    """The kind of the next edit, in the menu's rough proportions."""
+    choice = rng.random()
+    return 'modify' if choice < 0.6 else 'add' if choice < 0.8 else 'delete'
+
+def edit(expenses, kind, rng):
+    """One menu-sized edit of the given kind, at a random row."""
+    if kind == 'modify':
+        row = expenses[rng.randrange(len(expenses))]
+        row['Amount'] = Money(rng.randrange(1, 250000))
+        row['Due Date'] = datetime.fromordinal(row['Due Date'].toordinal() + rng.randrange(-5, 6))
+    elif kind == 'add':
+        # Dated among the existing rows, so the due-date index takes an insert, not an append
+        expenses.add(rng.choice(PAYEES), Money(rng.randrange(1, 250000)), datetime(2026, 2, rng.randrange(1, 29)))
+    else:
+        expenses.pop(rng.randrange(len(expenses)))
+
+def timed_steps(steps, func, kind_of):
+    """Run func steps times; return {kind: (mean, worst) seconds}, kind_of() naming each step's kind."""
+    timings = {}
+    for _ in range(steps):
+        kind = kind_of()
+        start = time.perf_counter()
+        func()
+        timings.setdefault(kind, []).append(time.perf_counter() - start)
+    return {kind: (sum(times) / len(times), max(times)) for kind, times in timings.items()}
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rng = random.Random(11)
+    with tempfile.TemporaryDirectory() as workdir:
+        expenses, income = read_csv_file(generate_ledger(os.path.join(workdir, 'ledger.csv'), rows))
+    expenses.due_index()
+    expenses.totals_by_name()
+    
+    start = time.perf_counter()
+    copy.deepcopy(expenses)
+    copy_seconds = time.perf_counter() - start
+    copy_bytes = sum(len(column) for column in columns(expenses))
+    
+    history = EditHistory(expenses, income, limit=steps, user='bench')
+    before = columns(expenses)
+    tracemalloc.start()
+    
+    kinds = [pick_edit(rng) for _ in range(steps)]
+    pending = iter(kinds)
+    
+    def make_edit():
+        kind = next(pending)
+        with history.edit(kind):
+            edit(expenses, kind, rng)
+    
+    edit_times = timed_steps(steps, make_edit, lambda: kinds[len(history.undo_steps)])
+    log_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    after = columns(expenses)
+    undo_times = timed_steps(steps, history.undo, history.undo_label)
+    assert columns(expenses) == before
+    redo_times = timed_steps(steps, history.redo, history.redo_label)
+    assert columns(expenses) == after
+    # A stale index would mean the steps skipped its upkeep
+    assert not expenses.index_is_stale()
+    
+    print(f"{rows} rows, {steps} steps")
+    print(f"  {'':<16} {'mean':>10} {'worst':>10}")
+    for label, times in (('edit', edit_times), ('undo', undo_times), ('redo', redo_times)):
+        for kind in KINDS:
+            if kind in times:
+                mean, worst = times[kind]
+                print(f"  {label + ' ' + kind:<16} {mean * 1000:7.3f} ms {worst * 1000:7.3f} ms")
+    print(f"  history holds {log_bytes / 1024:.0f} KB for {steps} steps ({log_bytes / steps:.0f} bytes/step), "
+          f"{len(history.audit)} audit entries")
+    print(f"  deepcopy     {copy_seconds * 1000:7.1f} ms and {copy_bytes / 1e6:.1f} MB of columns per copy")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Measure ingest_files throughput as worker processes are added.
+
+Writes a directory of statement CSVs (total size set by the first
+argument, in MB) and ingests it with 1, 2, 4, ... workers up to the CPU
+count. Usage: python benchmarks/bench_ingest.py [total_mb] [files]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_stream_memory import write_ledger
+from monthly_expense_track import ingest_files
+
+# Roughly what write_ledger produces per expense row
+BYTES_PER_ROW = 40
+
+def main():
+    total_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    files = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    rows_per_file = total_mb * 2**20 // BYTES_PER_ROW // files
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(files):
+            write_ledger(str(Path(tmp) / f"bank_{i}.csv"), rows_per_file, seed=i)
+        size = sum(path.stat().st_size for path in Path(tmp).glob('*.csv'))
+        print(f"{files} files, {size / 2**20:.0f} MB")
+        jobs = 1
+        baseline = None
+        while True:
+            start = time.perf_counter()
+            expenses, income, duplicates = ingest_files(str(Path(tmp) / '*.csv'), jobs=jobs)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"  jobs={jobs:<3} {elapsed:>7.2f}s  {size / 2**20 / elapsed:>7.1f} MB/s  "
+                  f"speedup {baseline / elapsed:.2f}x  ({len(expenses)} expenses, {duplicates} duplicates)")
+            if jobs >= (os.cpu_count() or 1):
+                break
+            jobs = min(jobs * 2, os.cpu_count())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Compare linear scans with the per-name index for bank and payee lookups.
+
+Times first-row and per-payee total lookups on stores of 1k to 1M rows,
+the way add_income and _account_balances used them before the index.
+Usage: python benchmarks/bench_name_index.py [max_rows]
+"""
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monthly_expense_track import PAYEES, ExpenseStore
+
+def build_store(count, seed=42):
+    """Build an ExpenseStore with random payees."""
+    rng = random.Random(seed)
+    today = datetime.now().toordinal()
+    store = ExpenseStore()
+    for _ in range(count):
+        store.add_row(rng.choice(PAYEES), rng.randrange(100000), today + rng.randrange(365))
+    return store
+
+def scan_lookups(store, names):
+    """Linear scans: first row and total per name."""
+    results = []
+    for name in names:
+        first = next((row for row in store if row['Payee'] == name), None)
+        total = sum(row.store.cents[row.index] for row in store if row['Payee'] == name)
+        results.append((first.index if first else None, total))
+    return results
+
+def indexed_lookups(store, names):
+    """Per-name index: first row and total per name."""
+    results = []
+    for name in names:
+        first = store.first_row(name)
+        results.append((first.index if first else None, store.total_cents_for(name)))
+    return results
+
+def main():
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    names = PAYEES + ['Unknown payee']
+    count = 1000
+    while count <= max_rows:
+        store = build_store(count)
+        start = time.perf_counter()
+        expected = scan_lookups(store, names)
+        scan_time = time.perf_counter() - start
+        start = time.perf_counter()
+        store.totals_by_name()
+        build_time = time.perf_counter() - start
+        start = time.perf_counter()
+        got = indexed_lookups(store, names)
+        lookup_time = time.perf_counter() - start
+        assert got == expected
+        print(f"{count:>9} rows  scan {scan_time * 1000:9.2f} ms  "
+              f"index build {build_time * 1000:8.2f} ms  lookups {lookup_time * 1000:7.3f} ms")
+        count *= 10
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Time the NumPy analysis backend against pure Python.
+
+tests/test_backends.py checks that both give the same rows and totals.
+Usage: python benchmarks/bench_numpy_backend.py [rows]
+"""
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monthly_expense_track import ANALYSIS_BACKENDS, PAYEES, ExpenseStore, optional_module
+
+def random_store(rng, count, build_index=True):
+    """Build a store with clustered due dates and some non-positive amounts."""
+    start = datetime(2026, 1, 1).toordinal()
+    store = ExpenseStore()
+    for _ in range(count):
+        amount = rng.choice([0, -12.5, rng.randrange(1, 100000) / 100])
+        store.add(rng.choice(PAYEES), amount, datetime.fromordinal(start + rng.randrange(90)))
+    if build_index:
+        store.rows_due_between(0)
+    # Edits after the index is built exercise incremental maintenance
+    for _ in range(count // 10):
+        row = store[rng.randrange(len(store))]
+        row['Amount'] = rng.choice([0, rng.randrange(1, 100000) / 100])
+        row['Due Date'] = datetime.fromordinal(start + rng.randrange(90))
+    return store, start
+
+def main():
+    if optional_module('numpy') is None:
+        print("NumPy is not installed; nothing to compare.")
+        return
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"{'Backend':<8} {'cold (fresh load)':>18} {'warm':>10}   ({count} rows)")
+    for name, split_period in ANALYSIS_BACKENDS.items():
+        # Cold: the first analysis after loading, before any index exists
+        store, start = random_store(random.Random(42), count, build_index=False)
+        today, end = start + 40, start + 46
+        begin = time.perf_counter()
+        split_period(store, today, end)
+        cold = time.perf_counter() - begin
+        begin = time.perf_counter()
+        for _ in range(10):
+            split_period(store, today, end)
+        warm = (time.perf_counter() - begin) / 10
+        print(f"{name:<8} {cold * 1000:>15.2f} ms {warm * 1000:>7.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Compare the date-parsing engine with the original strptime cascade."""
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monthly_expense_track import DateParser, parse_date
+
+LEGACY_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%m-%d-%Y', '%Y/%m/%d', '%d/%m/%Y', '%d-%m-%Y']
+
+def legacy_parse_date(date_string):
+    """The original try/except cascade, kept here as the baseline."""
+    for fmt in LEGACY_FORMATS:
+        try:
+            return datetime.strptime(date_string, fmt)
+        except ValueError:
+            continue
+    raise ValueError(date_string)
+
+def make_dates(count, fmt, seed=42):
+    """Build a column of date strings spread over a few years."""
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1).toordinal()
+    return [datetime.fromordinal(start + rng.randrange(6 * 365)).strftime(fmt) for _ in range(count)]
+
+def time_it(func, values):
+    """Return seconds taken to parse every value."""
+    start = time.perf_counter()
+    for value in values:
+        func(value)
+    return time.perf_counter() - start
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"Parsing {count} dates per column")
+    print(f"{'Format':<12} {'cascade':>10} {'parse_date':>12} {'DateParser':>12} {'speedup':>9}")
+    for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%d-%m-%Y']:
+        values = make_dates(count, fmt)
+        legacy = time_it(legacy_parse_date, values)
+        fast = time_it(parse_date, values)
+        column = time_it(DateParser().parse, values)
+        print(f"{fmt:<12} {legacy:>9.3f}s {fast:>11.3f}s {column:>11.3f}s {legacy / column:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Scale calculate_transfer's period lookups from 1k to 10M expenses.
+
+Compares a full scan of the ordinal/cents columns (what calculate_transfer
+did before the due-date index) with the bisect range lookups.
+Usage: python benchmarks/bench_period_index.py [max_rows]
+"""
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monthly_expense_track import PAYEES, ExpenseStore
+
+def build_store(count, seed=42):
+    """Build an ExpenseStore with due dates spread five years around today."""
+    rng = random.Random(seed)
+    start = datetime.now().toordinal() - 5 * 365 // 2
+    store = ExpenseStore()
+    for _ in range(count):
+        store.add(rng.choice(PAYEES), rng.randrange(100000) / 100, datetime.fromordinal(start + rng.randrange(5 * 365)))
+    return store
+
+def scan(store, today_ordinal, end_ordinal):
+    """Full-column scan for the period and future rows."""
+    relevant, future = [], []
+    for i, (ordinal, cents) in enumerate(zip(store.ordinals, store.cents)):
+        if cents <= 0:
+            continue
+        if ordinal >= end_ordinal:
+            future.append(i)
+        elif ordinal >= today_ordinal:
+            relevant.append(i)
+    return relevant, future
+
+def lookup(store, today_ordinal, end_ordinal):
+    """Range lookups on the due-date index."""
+    return store.rows_due_between(today_ordinal, end_ordinal), store.rows_due_between(end_ordinal)
+
+def best_of(func, *args, repeat=3):
+    """Return the fastest of several timed calls."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    today = datetime.now().toordinal()
+    window = (today, today + 15)
+    print(f"{'Rows':>10} {'build idx':>10} {'scan':>10} {'indexed':>10} {'speedup':>9}")
+    count = 1000
+    while count <= max_rows:
+        store = build_store(count)
+        start = time.perf_counter()
+        store.rows_due_between(today)
+        build = time.perf_counter() - start
+        scanned = best_of(scan, store, *window)
+        indexed = best_of(lookup, store, *window)
+        print(f"{count:>10} {build:>9.4f}s {scanned:>9.4f}s {indexed:>9.6f}s {scanned / indexed:>8.0f}x")
+        count *= 10
+
+if __name__ == "__main__":
+    main()
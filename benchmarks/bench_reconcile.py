@@ -0,0 +1,71 @@
+"""Time importing a bank statement and closing the expenses it paid.
+
+Loads a synthetic ledger, then writes a bank CSV export with `payments`
+debits: most pay a ledger row (payee name or alias in the description,
+posted a few days off, some a few cents off), the rest are unrelated
+card spending. Times read_bank_statement, reconcile_statement and
+closing the matched rows.
+Usage: python benchmarks/bench_reconcile.py [rows] [payments]
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ledger_generator import generate_ledger
+from monthly_expense_track import (PAYEE_ALIASES, Money, close_paid_expenses, read_bank_statement,
+                                   read_csv_file, reconcile_statement)
+
+NOISE = ['STARBUCKS #1234', 'SHELL OIL 5551', 'AMAZON MKTPLACE', 'SAFEWAY 0042', 'ATM WITHDRAWAL']
+
+def write_statement(filename, expenses, payments, rng):
+    """Write a bank CSV export paying about 70% of `payments` from expense rows."""
+    descriptions = {payee: fragment for fragment, payee in PAYEE_ALIASES.items()}
+    rows = rng.sample(range(len(expenses)), min(len(expenses), payments * 7 // 10))
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Posted Date', 'Description', 'Amount'])
+        for row in rows:
+            payee = expenses.names[expenses.name_ids[row]]
+            cents = expenses.cents[row] + (rng.randrange(-50, 51) if rng.random() < 0.2 else 0)
+            posted = date.fromordinal(expenses.ordinals[row] + rng.randrange(-3, 4))
+            writer.writerow([posted.isoformat(), f"{descriptions.get(payee, payee).upper()} PAYMENT",
+                             Money(-cents)])
+        for _ in range(payments - len(rows)):
+            posted = date.fromordinal(expenses.ordinals[rng.randrange(len(expenses))])
+            writer.writerow([posted.isoformat(), rng.choice(NOISE), Money(-rng.randrange(100, 20000))])
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    payments = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as workdir:
+        expenses, income = read_csv_file(generate_ledger(os.path.join(workdir, 'ledger.csv'), rows))
+        statement = os.path.join(workdir, 'statement.csv')
+        write_statement(statement, expenses, payments, rng)
+        
+        start = time.perf_counter()
+        transactions = read_bank_statement(statement)
+        read_time = time.perf_counter() - start
+        start = time.perf_counter()
+        result = reconcile_statement(expenses, transactions)
+        match_time = time.perf_counter() - start
+        start = time.perf_counter()
+        closed = close_paid_expenses(expenses, result)
+        close_time = time.perf_counter() - start
+    
+    print(f"{rows} ledger rows, {len(transactions)} payments")
+    print(f"  read_bank_statement  {read_time * 1000:10.1f} ms")
+    print(f"  reconcile_statement  {match_time * 1000:10.1f} ms")
+    print(f"  close matched rows   {close_time * 1000:10.1f} ms")
+    print(f"  {closed} closed, {len(result['unmatched'])} unmatched payment(s), "
+          f"{len(result['unpaid'])} unpaid expense(s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Measure requests per second against the local HTTP/JSON service.
+
+Serves a synthetic ledger from a temporary directory with
+make_ledger_server(), then runs client threads over keep-alive
+connections: first only GET /analysis (answered from the cache), then a
+mix where one request in `write_every` adds an expense, so the cache is
+invalidated and recomputed under the write lock.
+Usage: python benchmarks/bench_service.py [rows] [clients] [seconds]
+"""
+import http.client
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ledger_generator import ANCHOR, generate_ledger
+from monthly_expense_track import make_ledger_server
+
+def client(port, seconds, write_every, counts):
+    """Issue requests until the deadline; count responses by status."""
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    analysis = f"/analysis?as_of={ANCHOR:%Y-%m-%d}"
+    expense = json.dumps({'Payee': 'Other', 'Amount': '12.34', 'Due Date': f"{ANCHOR:%Y-%m-%d}"})
+    deadline = time.perf_counter() + seconds
+    sent = 0
+    while time.perf_counter() < deadline:
+        sent += 1
+        if write_every and sent % write_every == 0:
+            conn.request('POST', '/expenses', body=expense, headers={'Content-Type': 'application/json'})
+        else:
+            conn.request('GET', analysis)
+        response = conn.getresponse()
+        response.read()
+        counts[response.status] = counts.get(response.status, 0) + 1
+    conn.close()
+
+def run(port, clients, seconds, write_every):
+    counts = [{} for _ in range(clients)]
+    threads = [threading.Thread(target=client, args=(port, seconds, write_every, counts[i]))
+               for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    totals = {}
+    for per_client in counts:
+        for status, count in per_client.items():
+            totals[status] = totals.get(status, 0) + count
+    return totals
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 3
+    with tempfile.TemporaryDirectory() as workdir:
+        filename = generate_ledger(os.path.join(workdir, 'ledger.csv'), rows)
+        server = make_ledger_server(filename)
+        port = server.server_address[1]
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            for label, write_every in (('cached reads', 0), ('1 write in 50', 50)):
+                totals = run(port, clients, seconds, write_every)
+                print(f"{rows} rows, {clients} clients, {label:<14} "
+                      f"{sum(totals.values()) / seconds:10.0f} req/s  {totals}")
+        finally:
+            server.shutdown()
+            server.server_close()
+            server.service.close()
+
+if __name__ == '__main__':
+    main()
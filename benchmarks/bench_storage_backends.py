@@ -0,0 +1,48 @@
+"""Compare load and analysis time of the CSV and SQLite storage backends.
+
+Usage: python benchmarks/bench_storage_backends.py [rows]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_stream_memory import write_ledger
+from monthly_expense_track import CSVStorage, SQLiteStorage, calculate_transfer, migrate_csv_to_sqlite, read_csv_file
+
+def timed(func, *args, **kwargs):
+    """Return (result, seconds) for one call."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_filename = str(Path(tmp) / 'ledger.csv')
+        db_filename = str(Path(tmp) / 'ledger.db')
+        write_ledger(csv_filename, rows)
+        _, migrate = timed(migrate_csv_to_sqlite, csv_filename, db_filename)
+        
+        (expenses, income), csv_parse = timed(read_csv_file, csv_filename, use_snapshot=False)
+        _, csv_snapshot = timed(read_csv_file, csv_filename)
+        _, csv_analysis = timed(calculate_transfer, expenses, income)
+        
+        sqlite_storage = SQLiteStorage(db_filename)
+        _, sqlite_load = timed(sqlite_storage.load)
+        _, sqlite_analysis = timed(sqlite_storage.calculate_transfer)
+        _, csv_end_to_end = timed(CSVStorage(csv_filename).calculate_transfer)
+        sqlite_storage.close()
+    
+    print(f"{rows} rows (migration took {migrate:.2f}s)")
+    print(f"  CSV load (parse):        {csv_parse:>8.3f}s")
+    print(f"  CSV load (snapshot):     {csv_snapshot:>8.3f}s")
+    print(f"  SQLite load:             {sqlite_load:>8.3f}s")
+    print(f"  Analysis on loaded data: {csv_analysis:>8.3f}s")
+    print(f"  CSV load + analysis:     {csv_end_to_end:>8.3f}s")
+    print(f"  SQLite indexed analysis: {sqlite_analysis:>8.3f}s")
+
+if __name__ == "__main__":
+    main()
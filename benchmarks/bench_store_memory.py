@@ -0,0 +1,42 @@
+"""Compare memory held by a list of expense dicts with an ExpenseStore."""
+import random
+import sys
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monthly_expense_track import PAYEES, ExpenseStore
+
+def make_expenses(count, seed=42):
+    """Yield expense dicts like read_csv_file used to build."""
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1).toordinal()
+    for _ in range(count):
+        yield {
+            'Payee': rng.choice(PAYEES),
+            'Amount': rng.randrange(100000) / 100,
+            'Due Date': datetime.fromordinal(start + rng.randrange(6 * 365))
+        }
+
+def traced_size(build):
+    """Return bytes still allocated by the object build() returns."""
+    tracemalloc.start()
+    obj = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return size
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    as_dicts = traced_size(lambda: list(make_expenses(count)))
+    as_store = traced_size(lambda: ExpenseStore(make_expenses(count)))
+    print(f"{count} expenses")
+    print(f"  list of dicts: {as_dicts / 2**20:>8.1f} MB ({as_dicts / count:.0f} B/row)")
+    print(f"  ExpenseStore:  {as_store / 2**20:>8.1f} MB ({as_store / count:.0f} B/row)")
+    print(f"  reduction:     {as_dicts / as_store:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Show peak RSS of the streaming loader staying flat as the ledger grows.
+
+Each measurement runs in a fresh interpreter so ru_maxrss reflects only
+that run. Memory is flat only for rows already past due: the analysis
+returns future_expenses, so every future-dated row is still kept in
+memory. The 'stream MB' column uses a historical ledger (all bills past
+due); 'mixed MB' uses one where FUTURE_SHARE of the bills fall due in the
+coming year, which grows with those rows. Usage: python benchmarks/bench_stream_memory.py [max_rows]
+"""
+import csv
+import random
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+
+from monthly_expense_track import PAYEES
+
+# Materializing lists gets expensive quickly, so only measure it this far
+MAX_LIST_ROWS = 1_000_000
+# Share of bills the mixed ledger dates in the coming year
+FUTURE_SHARE = 0.1
+
+def write_ledger(filename, rows, future_share=0.0, seed=42):
+    """Write a synthetic ledger of expense rows, future_share of them due in the coming year."""
+    rng = random.Random(seed)
+    start = datetime(2016, 1, 1).toordinal()
+    today = datetime.now().toordinal()
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Type', 'Payee', 'Bank', 'Amount', 'Due Date', 'Balance Date'])
+        writer.writerow(['Income', '', 'SCCU Checking', '5000.00', '', '2026-01-01'])
+        writer.writerow(['Income', '', 'E-Trade Savings', '25000.00', '', '2026-01-01'])
+        for _ in range(rows):
+            if rng.random() < future_share:
+                due = datetime.fromordinal(today + 1 + rng.randrange(365)).strftime('%Y-%m-%d')
+            else:
+                due = datetime.fromordinal(start + rng.randrange(10 * 365)).strftime('%Y-%m-%d')
+            writer.writerow(['Expense', rng.choice(PAYEES), '', f"{rng.randrange(100000) / 100:.2f}", due, ''])
+
+def measure(mode, filename):
+    """Run one load+analysis in a child process and return its peak RSS in MB."""
+    code = f"""
+import resource, sys
+sys.path.insert(0, {str(REPO)!r})
+import monthly_expense_track as m
+if {mode!r} == 'stream':
+    m.calculate_transfer_from_records(m.iter_csv_records({filename!r}))
+else:
+    expenses, income = m.read_csv_file({filename!r})
+    m.calculate_transfer(expenses, income)
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return int(output.stdout.split()[-1]) / 1024
+
+def main():
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    sizes = [n for n in (10_000, 100_000, 1_000_000, 10_000_000) if n <= max_rows]
+    print(f"{'Rows':>12} {'stream MB':>10} {'mixed MB':>10} {'list MB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            filename = str(Path(tmp) / f"ledger_{rows}.csv")
+            write_ledger(filename, rows)
+            stream_mb = measure('stream', filename)
+            list_mb = f"{measure('list', filename):.1f}" if rows <= MAX_LIST_ROWS else '-'
+            write_ledger(filename, rows, FUTURE_SHARE)
+            mixed_mb = measure('stream', filename)
+            print(f"{rows:>12} {stream_mb:>10.1f} {mixed_mb:>10.1f} {list_mb:>10}")
+            Path(filename).unlink()
+
+if __name__ == "__main__":
+    main()
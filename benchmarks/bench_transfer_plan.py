@@ -0,0 +1,61 @@
+"""Time plan_transfers on many accounts over a long horizon.
+
+Builds `accounts` paying accounts, each with its own payees and margin,
+plus a few savings accounts to fund them, and `bills` bills per account
+per month (some as monthly recurring rules), then plans `months` months.
+Usage: python benchmarks/bench_transfer_plan.py [accounts] [months] [bills]
+"""
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monthly_expense_track import ExpenseStore, IncomeStore, Money, plan_transfers
+
+def build_ledger(accounts, months, bills, seed=42):
+    """Return (expenses, income, payee_accounts, margins) for a synthetic household."""
+    rng = random.Random(seed)
+    today = datetime.now()
+    expenses = ExpenseStore()
+    income = IncomeStore()
+    payee_accounts = {}
+    margins = {}
+    for a in range(accounts):
+        account = f"Checking {a:02d}"
+        margins[account] = Money(rng.randrange(0, 200000))
+        income.add_row(account, rng.randrange(0, 500000), today.toordinal())
+        payees = [f"Payee {a:02d}-{p}" for p in range(bills)]
+        for payee in payees:
+            payee_accounts[payee] = account
+        for payee in payees[:bills // 4]:
+            expenses.add_recurring(payee, Money(rng.randrange(1000, 50000)), 'monthly',
+                                   today + timedelta(days=rng.randrange(28)))
+        for _ in range(months * (bills - bills // 4)):
+            expenses.add_row(rng.choice(payees[bills // 4:]), rng.randrange(100, 80000),
+                             today.toordinal() + rng.randrange(months * 30))
+    for s in range(max(1, accounts // 10)):
+        income.add_row(f"Savings {s}", 10 ** 10, today.toordinal())
+    return expenses, income, payee_accounts, margins
+
+def main():
+    accounts = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    months = int(sys.argv[2]) if len(sys.argv) > 2 else 24
+    bills = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    expenses, income, payee_accounts, margins = build_ledger(accounts, months, bills)
+    expenses.due_index()
+    
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        plan = plan_transfers(expenses, income, months=months, payee_accounts=payee_accounts, margins=margins)
+        timings.append(time.perf_counter() - start)
+    print(f"{accounts} accounts, {months} months, {len(expenses)} bills + {len(expenses.recurring)} recurring rules")
+    print(f"  plan_transfers   {min(timings) * 1000:10.1f} ms (best of {len(timings)})")
+    print(f"  {len(plan['transfers'])} transfer(s), total ${plan['total']:.2f}, "
+          f"{len(plan['shortfalls'])} shortfall(s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Time --watch from appending rows to a ledger to the updated recommendation.
+
+Writes a synthetic ledger, starts watch_ledger() on it with JSON output,
+then appends small batches of expense rows and measures how long each
+takes to show up as a new summary (poll interval included). A full
+rewrite of the file is timed last for comparison.
+Usage: python benchmarks/bench_watch.py [rows] [appends]
+"""
+import asyncio
+import csv
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ledger_generator import ANCHOR, generate_ledger
+from monthly_expense_track import PAYEES, SNAPSHOT_SUFFIX, Money, watch_ledger
+
+class SummaryStream(io.StringIO):
+    """Collects watch output and wakes the benchmark when a summary is flushed."""
+    
+    def __init__(self):
+        super().__init__()
+        self.summaries = asyncio.Queue()
+    
+    def flush(self):
+        text = self.getvalue()
+        if text:
+            self.seek(0)
+            self.truncate()
+            self.summaries.put_nowait((time.perf_counter(), json.loads(text)))
+
+def append_rows(filename, count, rng):
+    """Append expense rows due after ANCHOR, in date order, like an export job."""
+    with open(filename, 'a', newline='') as f:
+        writer = csv.writer(f)
+        for day in sorted(rng.randrange(1, 30) for _ in range(count)):
+            due = ANCHOR + timedelta(days=day)
+            writer.writerow(['Expense', rng.choice(PAYEES), '', Money(rng.randrange(1, 50000)), due.strftime('%Y-%m-%d'), ''])
+
+async def run(rows, appends):
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as workdir:
+        filename = os.path.join(workdir, 'ledger.csv')
+        generate_ledger(filename, rows)
+        stream = SummaryStream()
+        start = time.perf_counter()
+        task = asyncio.create_task(watch_ledger(filename, as_of=ANCHOR, output='json', stream=stream))
+        ready, first = await stream.summaries.get()
+        print(f"{rows} rows: initial load {(ready - start) * 1000:10.1f} ms "
+              f"(recommended ${first['ledgers'][0]['recommended_transfer']:.2f})")
+        
+        latencies = []
+        for _ in range(appends):
+            await asyncio.sleep(rng.uniform(0.1, 0.2))
+            start = time.perf_counter()
+            append_rows(filename, 10, rng)
+            ready, summary = await stream.summaries.get()
+            latencies.append(ready - start)
+        latencies.sort()
+        print(f"  append 10 rows   median {latencies[len(latencies) // 2] * 1000:8.1f} ms, "
+              f"max {latencies[-1] * 1000:8.1f} ms over {appends} appends "
+              f"(recommended ${summary['ledgers'][0]['recommended_transfer']:.2f})")
+        
+        # A rewrite (new file, no snapshot) has to be reloaded in full
+        with open(filename, 'rb') as f:
+            data = f.read()
+        os.remove(filename + SNAPSHOT_SUFFIX)
+        start = time.perf_counter()
+        with open(filename + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(filename + '.tmp', filename)
+        ready, _ = await stream.summaries.get()
+        print(f"  full rewrite     {(ready - start) * 1000:10.1f} ms")
+        task.cancel()
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    appends = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    asyncio.run(run(rows, appends))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Deterministic synthetic ledgers for the benchmark suite.
+
+Writes the exact Type,Payee,Bank,Amount,Due Date,Balance Date layout that
+save_to_csv produces (expenses first, then income, amounts as exact
+two-decimal Money strings), so a generated file loads like a real one. The same rows, seed
+and date style always give the same bytes.
+Usage: python benchmarks/ledger_generator.py rows out.csv [--seed N] [--mixed-dates]
+"""
+import argparse
+import csv
+import random
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monthly_expense_track import INCOME_SOURCES, PAYEES, Money
+
+FIELDNAMES = ['Type', 'Payee', 'Bank', 'Amount', 'Due Date', 'Balance Date']
+# Fixed "today" for generated ledgers, so timings never depend on the clock
+ANCHOR = datetime(2026, 1, 16)
+# Only month-first formats: mixing day-first ones would make rows ambiguous
+MIXED_DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%m-%d-%Y', '%Y/%m/%d']
+
+def generate_rows(rows, seed=42, mixed_dates=False):
+    """Yield CSV rows: `rows` expenses due within two years of ANCHOR, then income."""
+    rng = random.Random(seed)
+    start = ANCHOR.toordinal() - 365
+    formats = MIXED_DATE_FORMATS if mixed_dates else MIXED_DATE_FORMATS[:1]
+    for _ in range(rows):
+        due = datetime.fromordinal(start + rng.randrange(2 * 365))
+        amount = Money(rng.randrange(1, 250000))
+        yield ['Expense', rng.choice(PAYEES), '', amount, due.strftime(rng.choice(formats)), '']
+    for bank in INCOME_SOURCES:
+        amount = Money(rng.randrange(100000, 5000000))
+        yield ['Income', '', bank, amount, '', ANCHOR.strftime(rng.choice(formats))]
+
+def generate_ledger(filename, rows, seed=42, mixed_dates=False):
+    """Write a synthetic ledger CSV and return its filename."""
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDNAMES)
+        writer.writerows(generate_rows(rows, seed, mixed_dates))
+    return filename
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic ledger CSV.")
+    parser.add_argument('rows', type=int, help="number of expense rows")
+    parser.add_argument('filename', help="CSV file to write")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--mixed-dates', action='store_true', help="mix several date formats")
+    args = parser.parse_args()
+    generate_ledger(args.filename, args.rows, args.seed, args.mixed_dates)
+
+if __name__ == '__main__':
+    main()
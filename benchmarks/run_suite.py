@@ -0,0 +1,182 @@
+"""Benchmark suite: time the hot paths on generated ledgers and check for regressions.
+
+Times parse_date, read_csv_file (parsing and snapshot), calculate_transfer,
+save_to_csv and the table renderers on ledgers from ledger_generator.py,
+taking the best of --repeat runs, and the best cold start of the
+headless CLI from bench_startup.py. Results are written as JSON. The run
+exits with status 1 if the cold start is over --startup-budget or, with
+--baseline, if any timing is more than --threshold times slower than in
+an earlier results file.
+
+Usage:
+    python benchmarks/run_suite.py --sizes 1000 100000 --output results.json
+    python benchmarks/run_suite.py --baseline results.json --threshold 1.25
+"""
+import argparse
+import csv
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import monthly_expense_track as met
+from bench_startup import BUDGET_MS, headless_command, startup_times
+from ledger_generator import ANCHOR, generate_ledger
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+# Rows in the ledger the cold-start benchmark analyzes
+STARTUP_ROWS = 100
+# parse_date is timed on at most this many of the ledger's date strings
+PARSE_SAMPLE = 100_000
+
+def best_time(func, repeat, setup=None):
+    """Best wall time of func() over repeat runs; setup() runs untimed before each."""
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def ledger_path(workdir, rows, seed, mixed_dates):
+    """Generate the ledger once per (rows, seed, date style) and reuse it."""
+    filename = Path(workdir) / f"ledger_{rows}_{seed}_{'mixed' if mixed_dates else 'iso'}.csv"
+    if not filename.exists():
+        generate_ledger(str(filename), rows, seed, mixed_dates)
+    return str(filename)
+
+def bench_size(filename, repeat):
+    """Return {benchmark name: seconds} for one ledger file (run with stdout discarded)."""
+    timings = {}
+    expenses, income = met.read_csv_file(filename, use_snapshot=False)
+    with open(filename, newline='') as f:
+        rows = (row for row in csv.DictReader(f) if row['Type'] == 'Expense')
+        dates = [row['Due Date'] for _, row in zip(range(PARSE_SAMPLE), rows)]
+    
+    def parse_all():
+        for value in dates:
+            met.parse_date(value)
+    
+    timings['parse_date'] = best_time(parse_all, repeat, setup=met._parse_date_cascade.cache_clear)
+    timings['read_csv_file'] = best_time(lambda: met.read_csv_file(filename, use_snapshot=False), repeat)
+    met.write_snapshot(filename, expenses, income)
+    timings['read_csv_file_snapshot'] = best_time(lambda: met.read_csv_file(filename), repeat)
+    
+    timings['calculate_transfer'] = best_time(lambda: met.calculate_transfer(expenses, income, as_of=ANCHOR), repeat)
+    results = met.calculate_transfer(expenses, income, as_of=ANCHOR)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, 'saved.csv')
+        timings['save_to_csv'] = best_time(lambda: met.save_to_csv(expenses, income, out), repeat)
+    
+    timings['display_expenses'] = best_time(lambda: met.display_expenses(expenses), repeat)
+    timings['display_income'] = best_time(lambda: met.display_income(income), repeat)
+    timings['print_results'] = best_time(
+        lambda: met.print_results(results, actual_transfer=results['transfer_amount']), repeat)
+    return timings
+
+def check_regressions(results, baseline, threshold, min_seconds=0.0):
+    """Return a list of messages for timings more than threshold times the baseline.
+    
+    Timings under min_seconds in both runs are too noisy to judge and are skipped.
+    """
+    previous = {(entry['benchmark'], entry['rows'], entry['dates']): entry['seconds']
+                for entry in baseline['results']}
+    failures = []
+    for entry in results:
+        before = previous.get((entry['benchmark'], entry['rows'], entry['dates']))
+        if not before or max(before, entry['seconds']) < min_seconds:
+            continue
+        if entry['seconds'] > before * threshold:
+            failures.append(f"{entry['benchmark']} @ {entry['rows']} rows ({entry['dates']}): "
+                            f"{entry['seconds'] * 1000:.1f} ms vs {before * 1000:.1f} ms baseline "
+                            f"({entry['seconds'] / before:.2f}x)")
+    return failures
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite on generated ledgers.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="expense rows per ledger, 1000 to 10000000 (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per benchmark; the best is kept")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--dates', choices=['iso', 'mixed', 'both'], default='both',
+                        help="date style of the generated ledgers")
+    parser.add_argument('--workdir', help="where generated ledgers are kept (default: a temp dir)")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON results file")
+    parser.add_argument('--baseline', help="earlier results file to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="fail when a timing exceeds baseline * threshold (default: %(default)s)")
+    parser.add_argument('--min-seconds', type=float, default=0.001,
+                        help="ignore timings below this in both runs (default: %(default)s)")
+    parser.add_argument('--startup-runs', type=int, default=20, help="cold starts to take the best of")
+    parser.add_argument('--startup-budget', type=float, default=BUDGET_MS,
+                        help="fail when the best cold start is over this many ms; 0 to skip (default: %(default)s)")
+    return parser
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    date_styles = ['iso', 'mixed'] if args.dates == 'both' else [args.dates]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, 'w') as devnull:
+        workdir = args.workdir or tmp
+        os.makedirs(workdir, exist_ok=True)
+        for rows in args.sizes:
+            for style in date_styles:
+                filename = ledger_path(workdir, rows, args.seed, style == 'mixed')
+                with redirect_stdout(devnull):
+                    timings = bench_size(filename, args.repeat)
+                for benchmark, seconds in timings.items():
+                    results.append({'benchmark': benchmark, 'rows': rows, 'dates': style, 'seconds': seconds})
+                    print(f"{benchmark:<24} {rows:>10} {style:<6} {seconds * 1000:>12.2f} ms")
+        if args.startup_runs:
+            filename = ledger_path(workdir, STARTUP_ROWS, args.seed, False)
+            startup = min(startup_times(headless_command(filename), args.startup_runs))
+            results.append({'benchmark': 'startup', 'rows': STARTUP_ROWS, 'dates': 'iso', 'seconds': startup})
+            print(f"{'startup':<24} {STARTUP_ROWS:>10} {'iso':<6} {startup * 1000:>12.2f} ms")
+    
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to '{args.output}'")
+    
+    status = 0
+    startup = next((entry['seconds'] for entry in results if entry['benchmark'] == 'startup'), None)
+    if args.startup_budget and startup is not None:
+        if startup * 1000 > args.startup_budget:
+            print(f"\nSTARTUP over budget: {startup * 1000:.1f} ms vs {args.startup_budget:.0f} ms")
+            status = 1
+        else:
+            print(f"Startup within the {args.startup_budget:.0f} ms budget")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        failures = check_regressions(results, baseline, args.threshold, args.min_seconds)
+        if failures:
+            print(f"\nREGRESSIONS (over {args.threshold:.2f}x baseline):")
+            for failure in failures:
+                print(f"  {failure}")
+            return 1
+        print(f"No regressions over {args.threshold:.2f}x baseline")
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,20 @@
+"""Monthly expense and income tracker.
+
+The code lives in submodules: core (settings, parsing and the ledger
+stores), storage and sqlite_storage (files and databases), analysis
+(transfer calculations), ui (the interactive program), headless, watch,
+service and cli. Names are also reachable from the package itself, which
+imports the submodule that defines one the first time it is asked for.
+"""
+from importlib import import_module
+
+# In the order __getattr__ searches them, cheapest to import first
+SUBMODULES = ('core', 'storage', 'analysis', 'ui', 'headless', 'sqlite_storage', 'watch', 'service', 'cli')
+
+def __getattr__(name):
+    if not name.startswith('__'):
+        for module in SUBMODULES:
+            module = import_module(f'{__name__}.{module}')
+            if hasattr(module, name):
+                return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
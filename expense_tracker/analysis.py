@@ -0,0 +1,561 @@
+"""Transfer calculations: period splits, what-if batches, cash-flow timelines,
+multi-account plans and bank statement matching.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from heapq import merge
+from itertools import accumulate, chain
+
+from .core import (CASH_FLOW_HORIZON_DAYS, DEFAULT_PAYING_ACCOUNT, NUMPY_MIN_ROWS, PAYEE_ALIASES, PLAN_MONTHS,
+                   RECONCILE_TOLERANCE, RECONCILE_WINDOW_DAYS, SAFETY_MARGIN_CENTS, ExpenseStore, IncomeStore,
+                   Money, RowRange, _add_recurring, expand_recurring, optional_module, to_cents)
+
+def _payee_matcher(expenses, aliases):
+    """Return description -> payee ID (or None), resolving each distinct description once.
+    
+    The longest matching fragment wins; payee names are fragments of
+    themselves, except the catch-all 'Other'.
+    """
+    fragments = {}
+    for name_id, name in enumerate(expenses.names):
+        if name != 'Other':
+            fragments[name.casefold()] = name_id
+    for fragment, payee in aliases.items():
+        name_id = expenses.name_id(expenses.canonical_name(payee))
+        if name_id is not None:
+            fragments[fragment.casefold()] = name_id
+    ordered = sorted(fragments.items(), key=lambda item: -len(item[0]))
+    resolved = {}
+    
+    def match(description):
+        name_id = resolved.get(description, -1)
+        if name_id == -1:
+            folded = description.casefold()
+            name_id = next((found for fragment, found in ordered if fragment in folded), None)
+            resolved[description] = name_id
+        return name_id
+    return match
+
+def reconcile_statement(expenses, transactions, aliases=None,
+                        window_days=RECONCILE_WINDOW_DAYS, tolerance=RECONCILE_TOLERANCE):
+    """Match statement payments to open expense rows without changing the store.
+    
+    Open rows are hashed by (payee, cents), each bucket sorted by due date,
+    with the sorted distinct amounts per payee alongside. Each payment, in
+    date order, bisects the amounts within tolerance and each bucket's due
+    dates within window_days, and takes the closest unmatched row by date,
+    then amount. Returns {'matched': [(transaction, row)], 'unmatched':
+    [transaction], 'unpaid': [row]}, where unpaid rows are open expenses
+    due during the statement that no payment matched.
+    """
+    tolerance = to_cents(tolerance)
+    match_payee = _payee_matcher(expenses, PAYEE_ALIASES if aliases is None else aliases)
+    buckets = {}
+    for row, (name_id, cents, ordinal) in enumerate(zip(expenses.name_ids, expenses.cents, expenses.ordinals)):
+        if cents > 0:
+            bucket = buckets.get((name_id, cents))
+            if bucket is None:
+                bucket = buckets[(name_id, cents)] = []
+            bucket.append((ordinal, row))
+    amounts = {}
+    for (name_id, cents), bucket in buckets.items():
+        bucket.sort()
+        amounts.setdefault(name_id, []).append(cents)
+    for payee_amounts in amounts.values():
+        payee_amounts.sort()
+    
+    matched, unmatched = [], []
+    for transaction in transactions:
+        ordinal, cents, description = transaction
+        name_id = match_payee(description)
+        payee_amounts = amounts.get(name_id, ())
+        best = None
+        for amount in payee_amounts[bisect_left(payee_amounts, cents - tolerance):
+                                    bisect_right(payee_amounts, cents + tolerance)]:
+            bucket = buckets[(name_id, amount)]
+            # The nearest due dates are either side of the payment date;
+            # take the first row of each, as rows sharing a date sort by row
+            j = bisect_left(bucket, (ordinal,))
+            for k in (bisect_left(bucket, (bucket[j - 1][0],)) if j else -1, j):
+                if 0 <= k < len(bucket):
+                    due, row = bucket[k]
+                    key = (abs(due - ordinal), abs(amount - cents), due, row)
+                    if key[0] <= window_days and (best is None or key < best[0]):
+                        best = (key, amount, k)
+        if best is None:
+            unmatched.append(transaction)
+            continue
+        (_, _, _, row), amount, k = best
+        bucket = buckets[(name_id, amount)]
+        del bucket[k]
+        if not bucket:
+            del buckets[(name_id, amount)]
+            del payee_amounts[bisect_left(payee_amounts, amount)]
+        matched.append((transaction, row))
+    
+    unpaid = []
+    if transactions:
+        paid = {row for _, row in matched}
+        start = min(ordinal for ordinal, _, _ in transactions)
+        end = max(ordinal for ordinal, _, _ in transactions)
+        unpaid = [row for row in expenses.rows_due_between(start, end + 1).rows if row not in paid]
+    return {'matched': matched, 'unmatched': unmatched, 'unpaid': unpaid}
+
+def close_paid_expenses(expenses, result):
+    """Remove the expense rows a reconciliation matched; returns how many."""
+    rows = [row for _, row in result['matched']]
+    expenses.remove_rows(rows)
+    return len(rows)
+
+def _split_period_python(expenses, today_ordinal, end_ordinal):
+    """Period and future rows via range lookups on the due-date index."""
+    relevant = expenses.rows_due_between(today_ordinal, end_ordinal)
+    future = expenses.rows_due_between(end_ordinal)
+    return relevant, future, relevant.total_cents()
+
+def _split_period_numpy(expenses, today_ordinal, end_ordinal):
+    """Period and future rows via boolean masks over the store's columns."""
+    np = optional_module('numpy')
+    ordinals = np.frombuffer(expenses.ordinals, dtype=expenses.ordinals.typecode)
+    cents = np.frombuffer(expenses.cents, dtype=expenses.cents.typecode)
+    payable = cents > 0
+    relevant_mask = payable & (ordinals >= today_ordinal) & (ordinals < end_ordinal)
+    future_mask = payable & (ordinals >= end_ordinal)
+    relevant_cents = int(cents[relevant_mask].sum())
+    return (_masked_rows(expenses, ordinals, relevant_mask),
+            _masked_rows(expenses, ordinals, future_mask),
+            relevant_cents)
+
+def _masked_rows(expenses, ordinals, mask):
+    """RowRange of the rows selected by mask, in due-date then row order."""
+    np = optional_module('numpy')
+    rows = np.flatnonzero(mask)
+    rows = rows[np.argsort(ordinals[rows], kind='stable')]
+    positions = array('I')
+    positions.frombytes(rows.astype(positions.typecode).tobytes())
+    return RowRange(expenses, positions)
+
+ANALYSIS_BACKENDS = {
+    'python': _split_period_python,
+    'numpy': _split_period_numpy,
+}
+
+def choose_backend(expenses):
+    """Pick the analysis backend for an ExpenseStore.
+    
+    A built due-date index answers in O(log n), so it wins once it exists.
+    Right after a bulk load the index would need a full Python sort, and
+    NumPy masks are much cheaper, so use them when NumPy is installed and
+    the ledger is big enough to pay for importing it.
+    """
+    if (expenses.index_is_stale() and len(expenses) >= NUMPY_MIN_ROWS
+            and optional_module('numpy') is not None):
+        return 'numpy'
+    return 'python'
+
+def period_bounds(as_of):
+    """Return (period name, start of as_of's day, end of its half-month period).
+    
+    The period ends where "future" expenses begin: the 16th in the first
+    half, or the 1st of next month in the second half.
+    """
+    today = datetime(as_of.year, as_of.month, as_of.day)
+    if as_of.day <= 15:
+        return "first half", today, datetime(as_of.year, as_of.month, 16)
+    if as_of.month == 12:
+        return "second half", today, datetime(as_of.year + 1, 1, 1)
+    return "second half", today, datetime(as_of.year, as_of.month + 1, 1)
+
+def calculate_transfer(expenses, income, backend=None, as_of=None, margin=None, recurring=None):
+    """Calculate recommended transfer from savings to checking.
+    
+    as_of defaults to now and margin to SAFETY_MARGIN_CENTS. For an ExpenseStore,
+    backend picks 'python' (due-date index) or 'numpy' (boolean masks); by
+    default choose_backend() decides. Recurring rules come from the store,
+    or from the recurring list for any other iterable; that list is read
+    only after the expenses are drained, so a stream may fill it.
+    """
+    current_date = as_of or datetime.now()
+    margin = Money(SAFETY_MARGIN_CENTS) if margin is None else Money.of(margin)
+    period, today, period_end = period_bounds(current_date)
+    
+    # Expenses due today through the end of the period count toward the
+    # transfer; anything after the period is listed as a future expense.
+    # Zero amounts are skipped either way. Both lists come back in due-date
+    # order. Any other iterable, including a lazy stream, takes one pass.
+    if isinstance(expenses, ExpenseStore):
+        split_period = ANALYSIS_BACKENDS[backend or choose_backend(expenses)]
+        relevant_expenses, future_expenses, relevant_cents = split_period(
+            expenses, today.toordinal(), period_end.toordinal())
+        total_expenses = Money(relevant_cents)
+        recurring = expenses.recurring
+        if recurring:
+            explicit, last_known = expenses.recurring_context()
+    else:
+        relevant_expenses = []
+        future_expenses = []
+        explicit = set()
+        latest = {}
+        for exp in expenses:
+            due_date = exp['Due Date']
+            if recurring is not None:
+                explicit.add((exp['Payee'], due_date.year, due_date.month))
+                if exp['Amount'] > 0 and due_date >= latest.get(exp['Payee'], (due_date,))[0]:
+                    latest[exp['Payee']] = (due_date, exp['Amount'])
+            if exp['Amount'] <= 0:
+                continue
+            if due_date >= period_end:
+                future_expenses.append(exp)
+            elif due_date >= today:
+                relevant_expenses.append(exp)
+        relevant_expenses.sort(key=lambda exp: exp['Due Date'])
+        future_expenses.sort(key=lambda exp: exp['Due Date'])
+        total_expenses = sum((Money.of(exp['Amount']) for exp in relevant_expenses), Money(0))
+        last_known = {payee: Money.of(amount) for payee, (_, amount) in latest.items()}
+    
+    # Recurring rules fill in the bills that have no row of their own
+    if recurring:
+        relevant_expenses, future_expenses, generated_total = _add_recurring(
+            recurring, explicit, last_known, today, period_end, relevant_expenses, future_expenses)
+        total_expenses += generated_total
+    
+    return _transfer_results(current_date, period, relevant_expenses, future_expenses, total_expenses,
+                             income, margin)
+
+def _transfer_results(current_date, period, relevant_expenses, future_expenses, total_expenses, income, margin):
+    """Assemble calculate_transfer's results dict, shared by every storage backend.
+    
+    The headless summaries, the service and print_results read these keys.
+    """
+    sccu_balance, etrade_balance = _account_balances(income)
+    
+    # Calculate required balance (expenses + safety margin)
+    required_balance = total_expenses + margin
+    
+    # Determine if transfer is needed
+    transfer_amount = Money(0)
+    if sccu_balance < required_balance:
+        transfer_amount = required_balance - sccu_balance
+    
+    return {
+        'period': period,
+        'current_date': current_date,
+        'relevant_expenses': relevant_expenses,
+        'future_expenses': future_expenses,
+        'total_expenses': total_expenses,
+        'sccu_before': sccu_balance,
+        'etrade_before': etrade_balance,
+        'transfer_amount': transfer_amount,
+        'sccu_after': sccu_balance + transfer_amount,
+        'etrade_after': etrade_balance - transfer_amount,
+        'safety_margin': margin
+    }
+
+def _account_balances(income):
+    """Return the (SCCU Checking, E-Trade Savings) balances; first entry per bank wins."""
+    if isinstance(income, IncomeStore):
+        sccu = income.first_row('SCCU Checking')
+        etrade = income.first_row('E-Trade Savings')
+        return (sccu['Amount'] if sccu else Money(0)), (etrade['Amount'] if etrade else Money(0))
+    balances = {}
+    for inc in income:
+        balances.setdefault(inc['Bank'], inc['Amount'])
+    return (Money.of(balances.get('SCCU Checking', 0)), Money.of(balances.get('E-Trade Savings', 0)))
+
+def pay_period_dates(start, months=12):
+    """Return the 1st and 16th of each month for the given number of months from start."""
+    dates = []
+    year, month = start.year, start.month
+    for _ in range(months):
+        dates.append(datetime(year, month, 1))
+        dates.append(datetime(year, month, 16))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return dates
+
+def calculate_transfer_batch(expenses, income, as_of_dates, margins=None):
+    """Project the recommended transfer for every (as-of date, margin) pair.
+    
+    Sorts the positive expenses once (via the due-date index) and builds
+    prefix sums of their cents, so each scenario costs two bisects instead
+    of a scan, plus expanding the recurring rules over its period. Returns one summary dict per scenario, dates outer and
+    margins inner, without the per-expense lists calculate_transfer adds.
+    """
+    if not isinstance(expenses, ExpenseStore):
+        expenses = ExpenseStore(expenses)
+    margins = [Money(SAFETY_MARGIN_CENTS)] if margins is None else [Money.of(margin) for margin in margins]
+    ordinals, rows = expenses.due_index()
+    cents = expenses.cents
+    prefix = array('q', [0])
+    prefix.extend(accumulate(cents[row] for row in rows))
+    sccu_balance, etrade_balance = _account_balances(income)
+    if expenses.recurring:
+        explicit, last_known = expenses.recurring_context()
+    
+    results = []
+    for as_of in as_of_dates:
+        period, today, period_end = period_bounds(as_of)
+        lo = bisect_left(ordinals, today.toordinal())
+        hi = bisect_left(ordinals, period_end.toordinal(), lo)
+        expense_count = hi - lo
+        total_expenses = Money(prefix[hi] - prefix[lo])
+        if expenses.recurring:
+            for exp in expand_recurring(expenses.recurring, today, period_end, explicit, last_known):
+                expense_count += 1
+                total_expenses += exp['Amount']
+        for margin in margins:
+            transfer_amount = max(Money(0), total_expenses + margin - sccu_balance)
+            results.append({
+                'as_of': as_of,
+                'period': period,
+                'safety_margin': margin,
+                'expense_count': expense_count,
+                'total_expenses': total_expenses,
+                'sccu_before': sccu_balance,
+                'etrade_before': etrade_balance,
+                'transfer_amount': transfer_amount,
+                'sccu_after': sccu_balance + transfer_amount,
+                'etrade_after': etrade_balance - transfer_amount
+            })
+    return results
+
+class CashFlowTimeline:
+    """Projected SCCU Checking balance, one step per day with expenses due.
+    
+    days holds the due ordinals in ascending order and spent the running
+    total of cents paid out through each of them. Expenses only lower the
+    balance, so spent is sorted and every query is a binary search. A
+    transfer into checking can be passed to any query.
+    """
+    
+    def __init__(self, as_of, horizon_end, start_cents, days, spent):
+        self.as_of = as_of
+        self.horizon_end = horizon_end
+        self.start_cents = start_cents
+        self.days = days
+        self.spent = spent
+    
+    def __len__(self):
+        return len(self.days)
+    
+    def balance_on(self, day, transfer=0):
+        """Checking balance after the expenses due on or before day."""
+        i = bisect_right(self.days, day.toordinal())
+        paid = self.spent[i - 1] if i else 0
+        return Money(self.start_cents + to_cents(transfer) - paid)
+    
+    def first_below(self, margin=Money(SAFETY_MARGIN_CENTS), transfer=0):
+        """Return (date, balance) when checking first drops below margin, or None."""
+        start = self.start_cents + to_cents(transfer)
+        allowed = start - to_cents(margin)
+        if allowed < 0:
+            return self.as_of, Money(start)
+        i = bisect_right(self.spent, allowed)
+        if i == len(self.spent):
+            return None
+        return datetime.fromordinal(self.days[i]), Money(start - self.spent[i])
+    
+    def minimum_balance(self, until=None, transfer=0):
+        """Return (date, balance) of the lowest balance up to until (default: the horizon)."""
+        start = self.start_cents + to_cents(transfer)
+        i = len(self.days) if until is None else bisect_right(self.days, until.toordinal())
+        if i == 0:
+            return self.as_of, Money(start)
+        return datetime.fromordinal(self.days[i - 1]), Money(start - self.spent[i - 1])
+
+def cash_flow_timeline(expenses, income, as_of=None, horizon_days=CASH_FLOW_HORIZON_DAYS):
+    """Build (or reuse) the CashFlowTimeline from as_of's day through horizon_days.
+    
+    Uses the same rows calculate_transfer does: positive expenses due from
+    today on, recurring rules expanded over the horizon, and the current
+    SCCU Checking balance. For an ExpenseStore the last timeline is cached
+    until either store changes.
+    """
+    _, today, _ = period_bounds(as_of or datetime.now())
+    horizon_end = today + timedelta(days=horizon_days)
+    if not isinstance(expenses, ExpenseStore):
+        expenses = ExpenseStore(expenses)
+    key = None
+    if isinstance(income, IncomeStore):
+        key = (today, horizon_end, expenses.version, income, income.version)
+        if expenses._timeline is not None and expenses._timeline[0] == key:
+            return expenses._timeline[1]
+    
+    today_ordinal, end_ordinal = today.toordinal(), horizon_end.toordinal()
+    ordinals, rows = expenses.due_index()
+    lo = bisect_left(ordinals, today_ordinal)
+    hi = bisect_left(ordinals, end_ordinal, lo)
+    cents = expenses.cents
+    explicit = ((ordinals[j], cents[rows[j]]) for j in range(lo, hi))
+    generated = ((exp['Due Date'].toordinal(), to_cents(exp['Amount']))
+                 for exp in expenses.iter_recurring(today, horizon_end))
+    
+    # Bucket by day: one running total per distinct due date
+    days, spent = array('i'), array('q')
+    total = 0
+    for ordinal, amount in merge(explicit, generated):
+        total += amount
+        if days and days[-1] == ordinal:
+            spent[-1] = total
+        else:
+            days.append(ordinal)
+            spent.append(total)
+    
+    sccu_balance, _ = _account_balances(income)
+    timeline = CashFlowTimeline(today, horizon_end, to_cents(sccu_balance), days, spent)
+    if key is not None:
+        expenses._timeline = (key, timeline)
+    return timeline
+
+def account_balances(income):
+    """Return {bank: balance} for every account; the first entry per bank wins."""
+    balances = {}
+    for inc in income:
+        balances.setdefault(inc['Bank'], Money.of(inc['Amount']))
+    return balances
+
+def plan_transfers(expenses, income, as_of=None, months=PLAN_MONTHS, margin=None, payee_accounts=None, margins=None):
+    """Plan transfers between any number of accounts over a multi-period horizon.
+    
+    Each bill is paid from payee_accounts[payee] (default:
+    DEFAULT_PAYING_ACCOUNT), and every account must stay at or above
+    margins[account] (margin, default SAFETY_MARGIN_CENTS, for the default
+    paying account; 0 otherwise). Bills due within `months` months, recurring
+    ones included, are bucketed into calculate_transfer's half-month periods.
+    
+    Greedy over the periods in date order: at the first period start where
+    an account cannot cover the period's bills plus its margin, it gets
+    what it needs for the rest of the horizon in one go, so each account is
+    usually topped up once rather than every period. The money comes from
+    the accounts with a surplus beyond their margin and all of their own
+    bills: the smallest surplus that covers it (best fit), otherwise the
+    largest ones combined. The total moved is the same either way: no more
+    than the accounts need. When the surpluses cannot cover every account,
+    money instead moves as late as possible, exactly the difference each
+    period as calculate_transfer recommends for one account, so it goes to
+    the earliest bills, and whatever cannot be funded is a shortfall.
+    
+    Returns a dict with 'as_of', 'horizon_end', 'balances_before',
+    'balances_after', 'margins', 'transfers' ('Date', 'From', 'To',
+    'Amount', in date order), 'shortfalls' ('Date', 'Account', 'Amount')
+    and 'total'.
+    """
+    _, today, _ = period_bounds(as_of or datetime.now())
+    payee_accounts = payee_accounts or {}
+    account_margins = {DEFAULT_PAYING_ACCOUNT: Money(SAFETY_MARGIN_CENTS) if margin is None else Money.of(margin)}
+    account_margins.update((account, Money.of(value)) for account, value in (margins or {}).items())
+    if not isinstance(expenses, ExpenseStore):
+        expenses = ExpenseStore(expenses)
+    
+    # Period starts: today, then every 1st and 16th until the horizon
+    later = [day for day in pay_period_dates(today, months + 1) if day > today]
+    starts = [today] + later[:2 * months - 1]
+    horizon_end = later[2 * months - 1]
+    boundaries = [day.toordinal() for day in starts]
+    
+    # Bucket the bills into {account: cents} per period
+    today_ordinal, end_ordinal = today.toordinal(), horizon_end.toordinal()
+    ordinals, rows = expenses.due_index()
+    lo = bisect_left(ordinals, today_ordinal)
+    hi = bisect_left(ordinals, end_ordinal, lo)
+    names, name_ids, cents = expenses.names, expenses.name_ids, expenses.cents
+    explicit = ((ordinals[j], names[name_ids[rows[j]]], cents[rows[j]]) for j in range(lo, hi))
+    generated = ((exp['Due Date'].toordinal(), exp['Payee'], int(exp['Amount']))
+                 for exp in expenses.iter_recurring(today, horizon_end))
+    needs = [{} for _ in starts]
+    outflow = {}
+    for ordinal, payee, amount in chain(explicit, generated):
+        account = payee_accounts.get(payee, DEFAULT_PAYING_ACCOUNT)
+        period_needs = needs[bisect_right(boundaries, ordinal) - 1]
+        period_needs[account] = period_needs.get(account, 0) + amount
+        outflow[account] = outflow.get(account, 0) + amount
+    
+    balances_before = account_balances(income)
+    balance = {account: int(amount) for account, amount in balances_before.items()}
+    for account in outflow:
+        balance.setdefault(account, 0)
+    floor = {account: int(account_margins.get(account, 0)) for account in balance}
+    # What an account can give away and still cover its own bills
+    spare = {account: balance[account] - floor[account] - outflow.get(account, 0) for account in balance}
+    
+    # Fund whole-horizon needs up front only when nobody can end up short for it
+    consolidate = sum(amount for amount in spare.values() if amount > 0) >= \
+        -sum(amount for amount in spare.values() if amount < 0)
+    
+    transfers = []
+    shortfalls = []
+    total = 0
+    # An account below its margin needs topping up even in a period without bills
+    watched = {account for account, amount in floor.items() if amount > 0}
+    # Shortfalls already reported, so later periods only report new ones
+    unfunded = dict.fromkeys(balance, 0)
+    for start, period_needs in zip(starts, needs):
+        for account in sorted(watched.union(period_needs)):
+            short = period_needs.get(account, 0) + floor[account] - balance[account] - unfunded[account]
+            while short > 0:
+                donors = [(amount, donor) for donor, amount in spare.items() if amount > 0 and donor != account]
+                if not donors:
+                    shortfalls.append({'Date': start, 'Account': account, 'Amount': Money(short)})
+                    unfunded[account] += short
+                    break
+                # spare[account] is minus what the account lacks through the horizon
+                wanted = max(short, -spare[account]) if consolidate else short
+                covering = [donor for donor in donors if donor[0] >= wanted]
+                available, donor = min(covering) if covering else max(donors)
+                amount = min(wanted, available)
+                transfers.append({'Date': start, 'From': donor, 'To': account, 'Amount': Money(amount)})
+                spare[donor] -= amount
+                balance[donor] -= amount
+                spare[account] += amount
+                balance[account] += amount
+                total += amount
+                short -= amount
+            balance[account] -= period_needs.get(account, 0)
+    
+    return {
+        'as_of': today,
+        'horizon_end': horizon_end,
+        'balances_before': balances_before,
+        'balances_after': {account: Money(amount) for account, amount in balance.items()},
+        'margins': {account: Money(amount) for account, amount in floor.items()},
+        'transfers': transfers,
+        'shortfalls': shortfalls,
+        'total': Money(total)
+    }
+
+def _single_transfer_plan(results):
+    """calculate_transfer's recommendation as a one-step transfer plan."""
+    _, today, _ = period_bounds(results['current_date'])
+    transfers = []
+    if results['transfer_amount'] > 0:
+        transfers.append({'Date': today, 'From': 'E-Trade Savings', 'To': 'SCCU Checking',
+                          'Amount': results['transfer_amount']})
+    return {
+        'as_of': today,
+        'balances_before': {'SCCU Checking': results['sccu_before'], 'E-Trade Savings': results['etrade_before']},
+        'transfers': transfers,
+        'shortfalls': [],
+        'total': results['transfer_amount']
+    }
+
+def calculate_transfer_from_records(records):
+    """Calculate the transfer straight from an iter_csv_records stream.
+    
+    Past-due rows are dropped as they stream by, but the future expenses
+    in the result are kept, so memory grows with future-dated rows.
+    """
+    income = []
+    recurring = []
+    
+    def stream_expenses():
+        for record_type, record in records:
+            if record_type == 'Expense':
+                yield record
+            elif record_type == 'Recurring':
+                recurring.append(record)
+            else:
+                income.append(record)
+    
+    # calculate_transfer drains the expense stream before reading income
+    # and rules, so both are complete by the time they are used.
+    return calculate_transfer(stream_expenses(), income, recurring=recurring)
@@ -0,0 +1,249 @@
+"""Command-line entry point.
+
+Only what the headless analysis needs is imported up front; the interactive
+program, SQLite, --watch, --serve and profiling load when they are used.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from functools import wraps
+from importlib import import_module
+
+from . import SUBMODULES
+from .core import (COLUMNS_EXTENSION, GZIP_EXTENSION, INSTRUMENTED_FUNCTIONS, PARQUET_EXTENSION, PROFILE_ENV,
+                   PSTATS_ENV, SAFETY_MARGIN_CENTS, SERVICE_HOST, SQLITE_EXTENSIONS, WATCH_POLL_SECONDS, DateParser,
+                   Money, parse_date)
+from .headless import analyze_ledgers, analyze_merged_ledgers, write_ledger_summaries
+from .storage import _expand_sources
+
+def _as_of_argument(value):
+    """argparse type for --as-of."""
+    try:
+        return parse_date(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def _serve_argument(value):
+    """argparse type for --serve: PORT or HOST:PORT."""
+    host, _, port = value.rpartition(':')
+    if not port.isdigit():
+        raise argparse.ArgumentTypeError(f"expected PORT or HOST:PORT, got {value!r}")
+    return host or SERVICE_HOST, int(port)
+
+class Instrumentation:
+    """Timers, call counts and tracemalloc peaks for the hot-path functions.
+    
+    install() swaps the INSTRUMENTED_FUNCTIONS (and DateParser.parse,
+    which does the parsing for whole files) for wrappers in every package
+    module that imported them; until then nothing is wrapped, so a normal
+    run pays nothing.
+    Times include nested calls, and a peak is the most memory allocated
+    above what was in use when the call started.
+    """
+    
+    def __init__(self):
+        self.stats = {}
+        self._originals = []
+        self._peaks = []
+        self._started_tracing = False
+    
+    def install(self):
+        """Start measuring."""
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        # Load every module first, so the ones imported lazily later are wrapped too
+        modules = [import_module(f'{__package__}.{module}') for module in SUBMODULES]
+        for qualified in INSTRUMENTED_FUNCTIONS:
+            module, _, name = qualified.partition('.')
+            original = getattr(import_module(f'{__package__}.{module}'), name)
+            wrapper = self._wrap(name, original)
+            for target in modules:
+                if vars(target).get(name) is original:
+                    self._originals.append((target, name, original))
+                    setattr(target, name, wrapper)
+        self._originals.append((DateParser, 'parse', DateParser.parse))
+        DateParser.parse = self._wrap('DateParser.parse', DateParser.parse)
+    
+    def uninstall(self):
+        """Put the original functions back and stop tracing memory."""
+        import tracemalloc
+        for target, name, original in self._originals:
+            setattr(target, name, original)
+        self._originals = []
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+    
+    def _wrap(self, name, func):
+        import tracemalloc
+        stats = self.stats.setdefault(name, {'calls': 0, 'seconds': 0.0, 'peak_bytes': 0})
+        peaks = self._peaks
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # Fold the caller's peak so far into its slot before resetting it
+            if peaks:
+                peaks[-1] = max(peaks[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            in_use = tracemalloc.get_traced_memory()[0]
+            peaks.append(0)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats['seconds'] += time.perf_counter() - start
+                stats['calls'] += 1
+                peak = max(peaks.pop(), tracemalloc.get_traced_memory()[1])
+                if peaks:
+                    peaks[-1] = max(peaks[-1], peak)
+                stats['peak_bytes'] = max(stats['peak_bytes'], peak - in_use)
+        
+        return wrapper
+    
+    def report(self, output='table', stream=None):
+        """Write the per-phase summary (to stderr by default, away from report output)."""
+        stream = stream or sys.stderr
+        called = {name: stats for name, stats in self.stats.items() if stats['calls']}
+        if output == 'json':
+            json.dump(called, stream, indent=2)
+            stream.write('\n')
+            return
+        stream.write(f"\n{'PHASE':<20} {'CALLS':>9} {'TOTAL ms':>11} {'MEAN us':>10} {'PEAK KB':>10}\n")
+        stream.write("-" * 64 + "\n")
+        for name, stats in sorted(called.items(), key=lambda item: -item[1]['seconds']):
+            stream.write(f"{name:<20} {stats['calls']:>9} {stats['seconds'] * 1000:>11.2f} "
+                         f"{stats['seconds'] / stats['calls'] * 1e6:>10.1f} {stats['peak_bytes'] / 1024:>10.1f}\n")
+
+class _HelpFormatter(argparse.HelpFormatter):
+    """HelpFormatter sized like shutil.get_terminal_size() without importing shutil.
+    
+    argparse builds a formatter for every add_argument(), and the stock one
+    imports shutil (and with it bz2, lzma and zlib) on each headless start.
+    """
+    
+    def __init__(self, prog, **kwargs):
+        if kwargs.get('width') is None:
+            try:
+                columns = int(os.environ['COLUMNS'])
+            except (KeyError, ValueError):
+                try:
+                    columns = os.get_terminal_size(sys.__stdout__.fileno()).columns
+                except (AttributeError, ValueError, OSError):
+                    columns = 80
+            kwargs['width'] = (columns or 80) - 2
+        super().__init__(prog, **kwargs)
+
+def build_arg_parser():
+    """Command-line options for the headless mode."""
+    parser = argparse.ArgumentParser(
+        formatter_class=_HelpFormatter,
+        description="Monthly expense and income manager. Runs interactively when no options are given.",
+        epilog="Migrate a CSV ledger to SQLite with: %(prog)s migrate LEDGER.csv LEDGER.db. "
+               "Close the expenses paid by bank statements with: %(prog)s reconcile LEDGER STATEMENT...")
+    parser.add_argument('--csv', action='append', nargs='+', metavar='FILE',
+                        help="ledger file(s) to analyze without prompting (CSV or SQLite); may be repeated")
+    parser.add_argument('--as-of', type=_as_of_argument, metavar='DATE',
+                        help="analysis date (default: today)")
+    parser.add_argument('--margin', type=Money.parse, default=Money(SAFETY_MARGIN_CENTS),
+                        help=f"safety margin to keep in checking (default: {Money(SAFETY_MARGIN_CENTS)})")
+    parser.add_argument('--accept-recommended', action='store_true',
+                        help="assume the recommended transfer is made (otherwise none is)")
+    parser.add_argument('--output', choices=['json', 'csv', 'table'], default='table',
+                        help="report format (default: table)")
+    parser.add_argument('--merge', action='store_true',
+                        help="merge all --csv files (e.g. one statement per bank) into one ledger, dropping duplicates")
+    parser.add_argument('--jobs', type=int, default=None, metavar='N',
+                        help="worker processes for multiple ledgers (default: CPU count)")
+    parser.add_argument('--watch', action='store_true',
+                        help="keep running and re-emit the analysis of a single CSV ledger whenever it changes")
+    parser.add_argument('--interval', type=float, default=WATCH_POLL_SECONDS, metavar='SECONDS',
+                        help=f"how often --watch checks the file (default: {WATCH_POLL_SECONDS})")
+    parser.add_argument('--serve', type=_serve_argument, metavar='[HOST:]PORT',
+                        help=f"serve a single CSV ledger as a local HTTP/JSON service (default host: {SERVICE_HOST})")
+    parser.add_argument('--profile', choices=['table', 'json'],
+                        help=f"print per-phase timings and memory peaks to stderr (or set {PROFILE_ENV}); "
+                             "without --csv the interactive program is profiled")
+    parser.add_argument('--pstats', metavar='FILE',
+                        help=f"dump cProfile stats for the whole run to FILE (or set {PSTATS_ENV})")
+    return parser
+
+def cli(argv=None):
+    """Program entry point: interactive without arguments, headless with --csv."""
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) == 3 and argv[0] == 'migrate':
+        from .sqlite_storage import migrate_csv_to_sqlite
+        return 0 if migrate_csv_to_sqlite(argv[1], argv[2]) else 1
+    if len(argv) >= 3 and argv[0] == 'reconcile':
+        from .ui import reconcile_ledger
+        return 0 if reconcile_ledger(argv[1], argv[2:]) else 1
+    
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    profile = args.profile or os.environ.get(PROFILE_ENV)
+    if profile and profile != 'json':
+        profile = 'table'
+    pstats_filename = args.pstats or os.environ.get(PSTATS_ENV)
+    
+    instrumentation = profiler = None
+    if profile:
+        instrumentation = Instrumentation()
+        instrumentation.install()
+    if pstats_filename:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        return _run_cli(parser, args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(pstats_filename)
+        if instrumentation is not None:
+            instrumentation.uninstall()
+            instrumentation.report(profile)
+
+def _run_cli(parser, args):
+    """Run the interactive program or the headless analysis for parsed arguments."""
+    if not args.csv:
+        headless_options = ('as_of', 'margin', 'accept_recommended', 'output', 'merge', 'jobs', 'watch', 'interval',
+                            'serve')
+        if any(getattr(args, option) != parser.get_default(option) for option in headless_options):
+            parser.error("--csv is required for headless mode")
+        from .ui import main
+        main()
+        return 0
+    filenames = _expand_sources([filename for group in args.csv for filename in group])
+    # Watching and serving follow a plain CSV and its journal
+    plain_csv = len(filenames) == 1 and os.path.splitext(filenames[0])[1].lower() not in \
+        SQLITE_EXTENSIONS + (GZIP_EXTENSION, PARQUET_EXTENSION, COLUMNS_EXTENSION)
+    if args.serve:
+        if not plain_csv or args.merge or args.watch:
+            parser.error("--serve takes exactly one CSV ledger")
+        from .service import serve_ledger
+        try:
+            serve_ledger(filenames[0], *args.serve)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        return 0
+    if args.watch:
+        if not plain_csv or args.merge:
+            parser.error("--watch takes exactly one CSV ledger")
+        import asyncio
+        from .watch import watch_ledger
+        try:
+            asyncio.run(watch_ledger(filenames[0], args.as_of, args.margin, args.accept_recommended,
+                                     args.output, args.interval))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    if args.merge:
+        summaries = [analyze_merged_ledgers(filenames, args.as_of, args.margin, args.accept_recommended, args.output, args.jobs)]
+    else:
+        summaries = analyze_ledgers(filenames, args.as_of, args.margin, args.accept_recommended, args.output, args.jobs)
+    write_ledger_summaries(summaries, args.output)
+    return 1 if any('error' in summary for summary in summaries) else 0
@@ -0,0 +1,1362 @@
+"""Ledger model: settings, date and money parsing, the columnar stores and recurring rules."""
+import operator
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import ROUND_HALF_EVEN, Decimal, InvalidOperation
+from functools import lru_cache
+from heapq import merge
+from importlib import import_module
+
+# Constants
+PAYEES = [
+    "Ameritus", "Capital One", "Chase Visa", "Medicare N RG", "Medicare N YG", 
+    "Amex YG", "Amex RG", "HOA Q", "HOA M", "Citibank Visa", "Apple card RG", 
+    "Apple card YG", "Medicare RG", "Medicare YG", "Other"
+]
+
+# Bank statement description fragments for payees whose name the bank
+# does not print; a payee's own name always matches too
+PAYEE_ALIASES = {
+    "AMERITUS": "Ameritus",
+    "CAPITAL ONE": "Capital One",
+    "CHASE CREDIT CRD": "Chase Visa",
+    "CITI CARD": "Citibank Visa",
+}
+
+INCOME_SOURCES = ["SCCU Checking", "E-Trade Savings"]
+# Balance to keep in checking after the period's bills, in cents ($1,000.00)
+SAFETY_MARGIN_CENTS = 100_000
+DEFAULT_CSV_FILENAME = 'expense_income_data.csv'
+# Largest amount, in cents, that fits the stores' signed 64-bit columns
+MAX_CENTS = 2**63 - 1
+
+JOURNAL_SUFFIX = '.journal'
+# Fold the journal back into the CSV once it holds this many edits
+JOURNAL_COMPACT_THRESHOLD = 500
+
+# Undo levels kept by the data management menu
+HISTORY_LIMIT = 1000
+AUDIT_SUFFIX = '.audit.csv'
+AUDIT_FIELDS = ['When', 'User', 'Action', 'Type', 'Name', 'Date', 'Old Amount', 'New Amount']
+
+HEADLESS_CSV_FIELDS = [
+    'file', 'as_of', 'period', 'expense_count', 'total_expenses', 'safety_margin',
+    'sccu_before', 'etrade_before', 'recommended_transfer', 'actual_transfer',
+    'sccu_after_expenses', 'etrade_after', 'error',
+]
+
+# Binary snapshot of a parsed CSV: header (magic, column layout, CSV size,
+# mtime and content hash), then per store its row/name counts, followed by
+# fixed-width cents, ordinal and name ID columns and the name table.
+SNAPSHOT_SUFFIX = '.snapshot'
+SNAPSHOT_MAGIC = b'EXPSNAP1'
+SNAPSHOT_HEADER = struct.Struct('<8s4sQq32s')
+SNAPSHOT_COUNTS = struct.Struct('<QQQ')
+
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+# Export formats, chosen by file name when saving and by content when
+# reading: gzip-compressed CSV, Parquet (with pyarrow) and a built-in
+# columnar file laid out like the snapshot body
+GZIP_EXTENSION = '.gz'
+GZIP_LEVEL = 6
+PARQUET_EXTENSION = '.parquet'
+PARQUET_MAGIC = b'PAR1'
+COLUMNS_EXTENSION = '.cols'
+COLUMNS_MAGIC = b'EXPCOLS1'
+COLUMNS_HEADER = struct.Struct('<8s4s')
+# Lines per write when saving a CSV
+SAVE_WRITE_BATCH = 10000
+
+# Files bigger than this are split across worker processes by ingest_files
+INGEST_CHUNK_BYTES = 32 * 1024 * 1024
+# How far into a file ingest looks for its date formats before splitting it
+INGEST_DATE_SAMPLE_BYTES = 1024 * 1024
+CASH_FLOW_HORIZON_DAYS = 365
+# Transfer plans: how far ahead, which account pays bills with no account
+# of their own, and the optional per-ledger account settings file
+PLAN_MONTHS = 24
+DEFAULT_PAYING_ACCOUNT = 'SCCU Checking'
+ACCOUNTS_SUFFIX = '.accounts.json'
+# Bank statement reconciliation: a payment matches an open expense of the
+# same payee due this many days either side, within this many dollars
+RECONCILE_WINDOW_DAYS = 5
+RECONCILE_TOLERANCE = 1.00
+ALIASES_SUFFIX = '.aliases.json'
+# Bank export column names, matched case-insensitively, in order of preference
+STATEMENT_DATE_COLUMNS = ('date', 'posted date', 'posting date', 'transaction date', 'trans. date')
+STATEMENT_DESCRIPTION_COLUMNS = ('description', 'payee', 'name', 'memo', 'details')
+# Out-of-order appended rows up to this many are inserted into a built
+# due-date index one by one; more mark it stale for a single re-sort
+INDEX_INSERT_LIMIT = 256
+# Smaller ledgers re-sort a stale due-date index in less time than it
+# takes to import NumPy for the vectorized backend
+NUMPY_MIN_ROWS = 150_000
+# How often --watch checks the ledger for changes
+WATCH_POLL_SECONDS = 0.05
+SERVICE_HOST = '127.0.0.1'
+# Rows per page when the service lists expenses or income
+SERVICE_PAGE_SIZE = 100
+# Rows per page in the interactive tables, and lines per write when unpaged
+TABLE_PAGE_SIZE = 50
+TABLE_WRITE_BATCH = 10000
+# Opt-in instrumentation: 'table' or 'json' summary, and a cProfile dump file
+PROFILE_ENV = 'EXPENSE_TRACKER_PROFILE'
+PSTATS_ENV = 'EXPENSE_TRACKER_PSTATS'
+# Wrapped functions, as module.name within the expense_tracker package
+INSTRUMENTED_FUNCTIONS = ['storage.read_csv_file', 'core.parse_date', 'analysis.calculate_transfer',
+                          'ui.print_results', 'storage.save_to_csv']
+# Months between occurrences of a recurring expense
+RECURRING_FREQUENCIES = {'monthly': 1, 'quarterly': 3, 'annual': 12}
+
+DATE_FORMATS = [
+    '%Y-%m-%d',      # 2026-02-10
+    '%m/%d/%Y',      # 2/10/2026 or 02/10/2026
+    '%m-%d-%Y',      # 2-10-2026 or 02-10-2026
+    '%Y/%m/%d',      # 2026/02/10
+    '%d/%m/%Y',      # 10/02/2026
+    '%d-%m-%Y',      # 10-02-2026
+]
+# Formats that read the same string with day and month swapped
+SWAPPED_DATE_FORMATS = {
+    '%m/%d/%Y': '%d/%m/%Y', '%d/%m/%Y': '%m/%d/%Y',
+    '%m-%d-%Y': '%d-%m-%Y', '%d-%m-%Y': '%m-%d-%Y',
+}
+DATE_CACHE_SIZE = 4096
+
+@lru_cache(maxsize=None)
+def optional_module(name):
+    """Import an optional dependency on first use; None when it is not installed."""
+    try:
+        return import_module(name)
+    except ImportError:
+        return None
+
+def _parse_iso_date(date_string):
+    """Parse a zero-padded YYYY-MM-DD string without strptime, or return None."""
+    if len(date_string) != 10 or date_string[4] != '-' or date_string[7] != '-':
+        return None
+    year, month, day = date_string[:4], date_string[5:7], date_string[8:]
+    if not (year.isdigit() and month.isdigit() and day.isdigit()):
+        return None
+    try:
+        return datetime(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_date_cascade(date_string):
+    """Try each supported format in turn (memoized)."""
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_string, fmt)
+        except ValueError:
+            continue
+    
+    # If none of the formats work, raise an error
+    raise ValueError(f"Unable to parse date '{date_string}'. Please use format YYYY-MM-DD, M/D/YYYY, or similar.")
+
+def parse_date(date_string):
+    """Parse date string with multiple format support."""
+    parsed = _parse_iso_date(date_string)
+    if parsed is not None:
+        return parsed
+    return _parse_date_cascade(date_string)
+
+class DateParser:
+    """Parse one column of dates, detecting its format once and memoizing results.
+    
+    The first non-ISO string fixes the column's format. A later string
+    that does not match it is read with the first format that does, and
+    recorded in mismatched, so earlier and later rows never read the same
+    string differently. Pass fmt when the format is already known, as for
+    the later chunks of a file read in parallel.
+    """
+    
+    def __init__(self, cache_size=DATE_CACHE_SIZE, fmt=None):
+        self.fmt = fmt
+        self.cache_size = cache_size
+        self.ambiguous = []
+        self.mismatched = []
+        self._cache = {}
+    
+    def parse(self, date_string):
+        """Parse a date string from this column."""
+        parsed = self._cache.get(date_string)
+        if parsed is not None:
+            return parsed
+        
+        parsed = _parse_iso_date(date_string)
+        if parsed is None:
+            parsed = self._parse_with_format(date_string)
+        
+        # Bounded memo: drop the oldest entry once full
+        if len(self._cache) >= self.cache_size:
+            del self._cache[next(iter(self._cache))]
+        self._cache[date_string] = parsed
+        return parsed
+    
+    def _parse_with_format(self, date_string):
+        """Parse using the detected format, falling back to the cascade for strings it does not match."""
+        parsed = None
+        fmt = self.fmt
+        if fmt is not None:
+            try:
+                parsed = datetime.strptime(date_string, fmt)
+            except ValueError:
+                parsed = None
+        
+        if parsed is None:
+            for fmt in DATE_FORMATS:
+                try:
+                    parsed = datetime.strptime(date_string, fmt)
+                except ValueError:
+                    continue
+                break
+            else:
+                raise ValueError(f"Unable to parse date '{date_string}'. Please use format YYYY-MM-DD, M/D/YYYY, or similar.")
+            if self.fmt is None:
+                self.fmt = fmt
+            else:
+                self.mismatched.append((date_string, fmt))
+        
+        # Flag strings that read differently with day and month swapped
+        swapped_fmt = SWAPPED_DATE_FORMATS.get(fmt)
+        if swapped_fmt:
+            try:
+                if datetime.strptime(date_string, swapped_fmt) != parsed:
+                    self.ambiguous.append((date_string, fmt))
+            except ValueError:
+                pass
+        return parsed
+    
+    def summary(self):
+        """(format, ambiguous count, first ambiguous, mismatched count, first mismatched).
+        
+        Small enough to send back from a worker process; see
+        merge_date_summaries() and warn_dates().
+        """
+        return (self.fmt, len(self.ambiguous), self.ambiguous[0] if self.ambiguous else None,
+                len(self.mismatched), self.mismatched[0] if self.mismatched else None)
+    
+    def warn_ambiguous(self, column):
+        """Print a warning if any parsed dates were ambiguous or did not match the column's format."""
+        warn_dates(f"'{column}'", self.summary())
+
+def merge_date_summaries(earlier, later):
+    """Combine DateParser.summary() tuples from consecutive parts of one column."""
+    if earlier is None:
+        return later
+    return (earlier[0] or later[0], earlier[1] + later[1], earlier[2] or later[2],
+            earlier[3] + later[3], earlier[4] or later[4])
+
+def warn_dates(where, summary):
+    """Print the warnings for a DateParser.summary() of the column described by where."""
+    column_fmt, ambiguous, first_ambiguous, mismatched, first_mismatched = summary
+    if ambiguous:
+        date_string, fmt = first_ambiguous
+        print(f"Warning: {ambiguous} ambiguous date(s) in {where} could be "
+              f"month/day or day/month (e.g. '{date_string}' was read as {fmt})")
+    if mismatched:
+        date_string, fmt = first_mismatched
+        print(f"Warning: {mismatched} date(s) in {where} do not match its format {column_fmt} "
+              f"(e.g. '{date_string}' was read as {fmt})")
+
+def parse_cents(text):
+    """Parse a dollar amount string such as '250', '250.5' or '-1,250.00' into exact integer cents.
+    
+    Commas are only accepted as thousands separators, so '1,2,3' is a
+    ValueError rather than 123.00. Plain amounts with up to two decimals
+    take an integer-only fast path; anything else (more decimals,
+    exponents) goes through Decimal and is rounded half-to-even.
+    """
+    text = text.strip()
+    if ',' in text:
+        whole, _, fraction = text.partition('.')
+        groups = whole.lstrip('+-').split(',')
+        if ',' in fraction or not (groups[0].isdigit() and len(groups[0]) <= 3) or \
+                not all(group.isdigit() and len(group) == 3 for group in groups[1:]):
+            raise ValueError(f"invalid amount: {text!r}")
+        text = text.replace(',', '')
+    sign = -1 if text[:1] == '-' else 1
+    whole, _, fraction = (text[1:] if text[:1] in '+-' else text).partition('.')
+    if (whole or fraction) and (not whole or whole.isdigit()) and \
+            (not fraction or (fraction.isdigit() and len(fraction) <= 2)):
+        return _check_cents(sign * (int(whole or 0) * 100 + int(fraction.ljust(2, '0') or 0)), text)
+    try:
+        amount = Decimal(text)
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"invalid amount: {text!r}") from None
+    return _decimal_cents(amount, text)
+
+def _decimal_cents(amount, text):
+    """Round a Decimal dollar amount to cents, rejecting NaN, infinity and out-of-range amounts."""
+    if not amount.is_finite():
+        raise ValueError(f"invalid amount: {text!r}")
+    # Check the exponent first: 1e999999999 would overflow the Decimal context
+    if amount.adjusted() > 17:
+        raise ValueError(f"amount out of range: {text!r}")
+    return _check_cents(int((amount * 100).to_integral_value(ROUND_HALF_EVEN)), text)
+
+def _check_cents(cents, text):
+    """Return cents if it fits the stores' 64-bit columns, else raise ValueError."""
+    if not -MAX_CENTS - 1 <= cents <= MAX_CENTS:
+        raise ValueError(f"amount out of range: {text!r}")
+    return cents
+
+class Money:
+    """An exact amount of money, held as integer cents.
+    
+    Money(250) is $2.50; use Money.of() for dollar amounts and
+    Money.parse() for text; both raise ValueError for NaN, infinity and
+    amounts beyond MAX_CENTS. Adding, subtracting and negating Money (or
+    plain integer cents) gives Money, as does multiplying or floor-dividing
+    by an integer. Money is not an int, so floats cannot slip in from
+    either side: mixing them in, even to order them, raises TypeError
+    rather than silently treating dollars as cents, and Money never equals
+    a float. int() and operator.index() give the cents, str() gives
+    '250.00', format specs such as '>10.2f' are applied exactly, and
+    float() gives dollars for JSON and other float consumers.
+    """
+    __slots__ = ('_cents',)
+    
+    def __init__(self, cents=0):
+        if isinstance(cents, float):
+            raise TypeError("Money() takes integer cents; use Money.of() for dollars")
+        self._cents = operator.index(cents)
+    
+    @classmethod
+    def of(cls, amount):
+        """Money from Money, a dollar amount (int, float or Decimal) or text."""
+        if isinstance(amount, Money):
+            return amount
+        if isinstance(amount, str):
+            return cls(parse_cents(amount))
+        if isinstance(amount, Decimal):
+            return cls(_decimal_cents(amount, amount))
+        try:
+            cents = round(amount * 100)
+        except (OverflowError, ValueError):
+            raise ValueError(f"invalid amount: {amount!r}") from None
+        return cls(_check_cents(cents, amount))
+    
+    @classmethod
+    def parse(cls, text):
+        """Money from a dollar amount string; raises ValueError if it is not one."""
+        return cls(parse_cents(text))
+    
+    @property
+    def cents(self):
+        return self._cents
+    
+    def __str__(self):
+        whole, fraction = divmod(abs(self._cents), 100)
+        return f"{'-' if self._cents < 0 else ''}{whole}.{fraction:02d}"
+    
+    def __repr__(self):
+        return f"Money('{self}')"
+    
+    def __format__(self, spec):
+        if not spec:
+            return str(self)
+        return format(Decimal(self._cents).scaleb(-2), spec)
+    
+    def __int__(self):
+        return self._cents
+    
+    __index__ = __int__
+    
+    def __float__(self):
+        return self._cents / 100
+    
+    def __bool__(self):
+        return self._cents != 0
+    
+    def __reduce__(self):
+        return Money, (self._cents,)
+    
+    @staticmethod
+    def _cents_of(other):
+        """other's cents if it is Money or integer cents, None if it is not a number."""
+        if isinstance(other, Money):
+            return other._cents
+        if isinstance(other, int):
+            return other
+        if isinstance(other, float):
+            raise TypeError("cannot mix Money and float; convert with Money.of()")
+        return None
+    
+    def __add__(self, other):
+        other = self._cents_of(other)
+        return NotImplemented if other is None else Money(self._cents + other)
+    
+    __radd__ = __add__
+    
+    def __sub__(self, other):
+        other = self._cents_of(other)
+        return NotImplemented if other is None else Money(self._cents - other)
+    
+    def __rsub__(self, other):
+        other = self._cents_of(other)
+        return NotImplemented if other is None else Money(other - self._cents)
+    
+    def __mul__(self, other):
+        if isinstance(other, float):
+            raise TypeError("cannot multiply Money by a float; round the result with Money.of()")
+        if not isinstance(other, int):
+            return NotImplemented
+        return Money(self._cents * other)
+    
+    __rmul__ = __mul__
+    
+    def __floordiv__(self, other):
+        # Splitting by a count gives Money; the ratio of two amounts is a count
+        if isinstance(other, Money):
+            return self._cents // other._cents
+        if isinstance(other, float):
+            raise TypeError("cannot divide Money by a float")
+        if not isinstance(other, int):
+            return NotImplemented
+        return Money(self._cents // other)
+    
+    def __truediv__(self, other):
+        raise TypeError("Money does not divide into fractional cents; use // for whole cents")
+    
+    def __rtruediv__(self, other):
+        raise TypeError("cannot divide by Money")
+    
+    __rfloordiv__ = __rtruediv__
+    
+    def __neg__(self):
+        return Money(-self._cents)
+    
+    def __pos__(self):
+        return self
+    
+    def __abs__(self):
+        return Money(abs(self._cents))
+    
+    def __eq__(self, other):
+        # Unequal rather than an error, so `in` checks and dict lookups still work
+        if isinstance(other, float):
+            return False
+        other = self._cents_of(other)
+        return NotImplemented if other is None else self._cents == other
+    
+    def __hash__(self):
+        # Hashes like its cents, since it compares equal to them
+        return hash(self._cents)
+    
+    def __lt__(self, other):
+        other = self._cents_of(other)
+        return NotImplemented if other is None else self._cents < other
+    
+    def __le__(self, other):
+        other = self._cents_of(other)
+        return NotImplemented if other is None else self._cents <= other
+    
+    def __gt__(self, other):
+        other = self._cents_of(other)
+        return NotImplemented if other is None else self._cents > other
+    
+    def __ge__(self, other):
+        other = self._cents_of(other)
+        return NotImplemented if other is None else self._cents >= other
+
+class StoreRow:
+    """Dict-style view of one row in an ExpenseStore or IncomeStore."""
+    __slots__ = ('store', 'index')
+    
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+    
+    def __getitem__(self, key):
+        store, i = self.store, self.index
+        if key == store.NAME_KEY:
+            return store.names[store.name_ids[i]]
+        if key == 'Amount':
+            return Money(store.cents[i])
+        if key == store.DATE_KEY:
+            return datetime.fromordinal(store.ordinals[i])
+        raise KeyError(key)
+    
+    def __setitem__(self, key, value):
+        store, i = self.store, self.index
+        if key == store.NAME_KEY:
+            store.set_name(i, value)
+        elif key == 'Amount':
+            store.set_cents(i, to_cents(value))
+        elif key == store.DATE_KEY:
+            store.set_ordinal(i, value.toordinal())
+        else:
+            raise KeyError(key)
+    
+    def to_dict(self):
+        """Return a plain dict copy of this row."""
+        store = self.store
+        return {store.NAME_KEY: self[store.NAME_KEY], 'Amount': self['Amount'], store.DATE_KEY: self[store.DATE_KEY]}
+    
+    def __repr__(self):
+        return f"StoreRow({self.to_dict()!r})"
+
+def _folded_names(names):
+    """{case-folded name: first spelling registered} for canonical_name."""
+    folded = {}
+    for name in names:
+        folded.setdefault(name.casefold(), name)
+    return folded
+
+class _LedgerStore:
+    """Columnar rows of integer cents, date ordinals and interned name IDs.
+    
+    Behaves like a list of dicts for the interactive menus: indexing and
+    iteration return StoreRow views, append() takes a record dict and
+    pop() returns one. Every change is reported to the callables in
+    listeners as listener(store, op, index), where op is 'put' after a row
+    is added or changed, 'ins' after one is inserted before existing rows
+    and 'del' after one is removed. version goes up on every change, so
+    derived data can be cached against it. While undo_log is a list, every
+    change also appends the (store, method, *args) call that reverts it.
+    
+    Names are a registry: lookups by name are dict hits, and a per-name
+    index of rows and total cents is built on first use and then kept
+    current by every edit.
+    
+    The indexes hold row IDs rather than positions, so a delete or insert
+    does not renumber them. IDs run in row order over range(len(self) +
+    len(_holes)), leaving out the sorted _holes that deleted rows left
+    behind; a row's position is its ID less the holes before it, found by
+    bisect. An insert takes a hole between its neighbours' IDs, as undoing
+    a delete does.
+    """
+    RECORD_TYPE = None
+    NAME_KEY = None
+    DATE_KEY = None
+    DEFAULT_NAMES = ()
+    
+    def __init__(self, records=()):
+        self.cents = array('q')
+        self.ordinals = array('i')
+        self.name_ids = array('I')
+        self.names = list(self.DEFAULT_NAMES)
+        self._name_lookup = {name: i for i, name in enumerate(self.names)}
+        self._folded_lookup = _folded_names(self.names)
+        self._name_rows = None
+        self._name_totals = None
+        self._holes = []
+        self.listeners = []
+        self.undo_log = None
+        self.version = 0
+        self._format_cache = None
+        for record in records:
+            self.append(record)
+    
+    @classmethod
+    def from_columns(cls, names, name_ids, cents, ordinals):
+        """Build a store around existing column arrays and name table."""
+        store = cls()
+        store.names = list(names)
+        store._name_lookup = {name: i for i, name in enumerate(store.names)}
+        store._folded_lookup = _folded_names(store.names)
+        store.name_ids = name_ids
+        store.cents = cents
+        store.ordinals = ordinals
+        return store
+    
+    def extend_columns(self, name_ids, cents, ordinals):
+        """Append many rows at once; name_ids must already be interned here."""
+        self._compact_ids()
+        start = len(self)
+        self.name_ids.extend(name_ids)
+        self.cents.extend(cents)
+        self.ordinals.extend(ordinals)
+        if self._name_rows is not None:
+            for index in range(start, len(self)):
+                self._index_name(index, self.name_ids[index])
+        if self.undo_log is not None:
+            self.undo_log.append((self, 'remove_rows', range(start, len(self))))
+        self.version += 1
+        if self.listeners:
+            for index in range(start, len(self)):
+                self._notify('put', index)
+    
+    def _notify(self, op, index):
+        self.version += 1
+        for listener in self.listeners:
+            listener(self, op, index)
+    
+    def intern(self, name):
+        """Return the ID for a name, adding it to the name table if new."""
+        name_id = self._name_lookup.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.names.append(name)
+            self._name_lookup[name] = name_id
+            self._folded_lookup.setdefault(name.casefold(), name)
+            if self._name_totals is not None:
+                self._name_totals.append(0)
+        return name_id
+    
+    def name_id(self, name):
+        """Return the ID for a known name, or None."""
+        return self._name_lookup.get(name)
+    
+    def canonical_name(self, name):
+        """Return the registered spelling of a name, matching case-insensitively.
+        
+        Unknown names come back unchanged. Read-only: intern() keeps the
+        case-folded table current, so concurrent readers need no lock.
+        """
+        if name in self._name_lookup:
+            return name
+        return self._folded_lookup.get(name.casefold(), name)
+    
+    def _row_id(self, index):
+        """The row ID of the row at position index."""
+        holes = self._holes
+        if not holes:
+            return index
+        # The ID is index plus the holes below it; settles in a step or two
+        skipped = bisect_right(holes, index)
+        while True:
+            below = bisect_right(holes, index + skipped)
+            if below == skipped:
+                return index + skipped
+            skipped = below
+    
+    def _positions(self, row_ids):
+        """Row positions for an array of row IDs (row_ids itself when there are no holes)."""
+        holes = self._holes
+        if not holes:
+            return row_ids
+        return array('I', [row_id - bisect_left(holes, row_id) for row_id in row_ids])
+    
+    def _compact_ids(self):
+        """Renumber the indexes so row IDs are positions again."""
+        if not self._holes:
+            return
+        if self._name_rows is not None:
+            for name_id, row_ids in self._name_rows.items():
+                self._name_rows[name_id] = self._positions(row_ids)
+        self._holes = []
+    
+    def _make_room(self, index):
+        """Free a row ID for a row about to be inserted at position index."""
+        holes = self._holes
+        after = bisect_right(holes, self._row_id(index - 1)) if index else 0
+        if after < len(holes) and (index == len(self) or holes[after] < self._row_id(index)):
+            del holes[after]
+        elif index < len(self):
+            # No free ID between the neighbours: renumber and shift later rows up
+            self._compact_ids()
+            self._shift_ids(index)
+    
+    def _shift_ids(self, index):
+        """Move the row IDs from index on up by one; IDs must be positions."""
+        if self._name_rows is not None:
+            for positions in self._name_rows.values():
+                for j in range(bisect_left(positions, index), len(positions)):
+                    positions[j] += 1
+    
+    def _ensure_name_index(self):
+        """Build the per-name row IDs and totals on first use."""
+        if self._name_rows is not None:
+            return
+        self._compact_ids()
+        rows = {}
+        totals = array('q', bytes(8 * len(self.names)))
+        for i, (name_id, cents) in enumerate(zip(self.name_ids, self.cents)):
+            positions = rows.get(name_id)
+            if positions is None:
+                positions = rows[name_id] = array('I')
+            positions.append(i)
+            totals[name_id] += cents
+        self._name_rows = rows
+        self._name_totals = totals
+    
+    def rows_for(self, name):
+        """Return every row for a payee or bank as a RowRange, in row order."""
+        self._ensure_name_index()
+        row_ids = self._name_rows.get(self._name_lookup.get(name))
+        return RowRange(self, self._positions(row_ids[:]) if row_ids else array('I'))
+    
+    def rows_matching(self, name=None, start_ordinal=None, end_ordinal=None):
+        """Return the rows for a name and/or dated in [start, end) as a RowRange in row order."""
+        candidates = range(len(self)) if name is None else self.rows_for(name).rows
+        if start_ordinal is None and end_ordinal is None:
+            return RowRange(self, array('I', candidates))
+        ordinals = self.ordinals
+        lo = 0 if start_ordinal is None else start_ordinal
+        hi = date.max.toordinal() + 1 if end_ordinal is None else end_ordinal
+        return RowRange(self, array('I', (i for i in candidates if lo <= ordinals[i] < hi)))
+    
+    def first_row(self, name):
+        """Return the first row for a payee or bank, or None."""
+        self._ensure_name_index()
+        row_ids = self._name_rows.get(self._name_lookup.get(name))
+        return StoreRow(self, self._positions(row_ids[:1])[0]) if row_ids else None
+    
+    def total_cents_for(self, name):
+        """Total amount, in cents, of every row for a payee or bank."""
+        name_id = self._name_lookup.get(name)
+        if name_id is None:
+            return 0
+        self._ensure_name_index()
+        return self._name_totals[name_id]
+    
+    def totals_by_name(self):
+        """Return {name: total cents} for every name that has rows."""
+        self._ensure_name_index()
+        return {self.names[name_id]: self._name_totals[name_id] for name_id in self._name_rows}
+    
+    def _index_name(self, index, name_id):
+        """Record the row at position index under name_id in the per-name index."""
+        row_ids = self._name_rows.get(name_id)
+        if row_ids is None:
+            row_ids = self._name_rows[name_id] = array('I')
+        row_id = self._row_id(index)
+        row_ids.insert(bisect_left(row_ids, row_id), row_id)
+        self._name_totals[name_id] += self.cents[index]
+    
+    def _unindex_name(self, index, name_id):
+        """Drop the row at position index from the per-name index."""
+        row_ids = self._name_rows[name_id]
+        del row_ids[bisect_left(row_ids, self._row_id(index))]
+        if not row_ids:
+            del self._name_rows[name_id]
+        self._name_totals[name_id] -= self.cents[index]
+    
+    def add_row(self, name, cents, ordinal):
+        """Append one row from its name, amount in cents and date ordinal."""
+        _check_cents(cents, cents)
+        name_id = self.intern(name)
+        self.name_ids.append(name_id)
+        self.cents.append(cents)
+        self.ordinals.append(ordinal)
+        if self._name_rows is not None:
+            self._index_name(len(self) - 1, name_id)
+        if self.undo_log is not None:
+            self.undo_log.append((self, 'pop', len(self) - 1))
+        if self.listeners:
+            self._notify('put', len(self) - 1)
+        else:
+            self.version += 1
+    
+    def add(self, name, amount, date):
+        """Append one row from its field values."""
+        self.add_row(name, to_cents(amount), date.toordinal())
+    
+    def append(self, record):
+        """Append a record dict."""
+        self.add(record[self.NAME_KEY], record['Amount'], record[self.DATE_KEY])
+    
+    def set_name(self, index, name):
+        """Set the payee or bank of a row."""
+        if self.undo_log is not None:
+            self.undo_log.append((self, 'set_name', index, self.names[self.name_ids[index]]))
+        name_id = self.intern(name)
+        if self._name_rows is not None:
+            self._unindex_name(index, self.name_ids[index])
+            self.name_ids[index] = name_id
+            self._index_name(index, name_id)
+        else:
+            self.name_ids[index] = name_id
+        self._notify('put', index)
+    
+    def set_cents(self, index, cents):
+        """Set the amount of a row, in cents."""
+        _check_cents(cents, cents)
+        if self.undo_log is not None:
+            self.undo_log.append((self, 'set_cents', index, self.cents[index]))
+        if self._name_totals is not None:
+            self._name_totals[self.name_ids[index]] += cents - self.cents[index]
+        self.cents[index] = cents
+        self._notify('put', index)
+    
+    def set_ordinal(self, index, ordinal):
+        """Set the date of a row as a proleptic Gregorian ordinal."""
+        if self.undo_log is not None:
+            self.undo_log.append((self, 'set_ordinal', index, self.ordinals[index]))
+        self.ordinals[index] = ordinal
+        self._notify('put', index)
+    
+    def pop(self, index=-1):
+        """Remove a row and return it as a dict."""
+        record = self[index].to_dict()
+        if index < 0:
+            index += len(self)
+        if self.undo_log is not None:
+            self.undo_log.append((self, 'insert_row', index, record[self.NAME_KEY], self.cents[index],
+                                  self.ordinals[index]))
+        if self._name_rows is not None:
+            self._unindex_name(index, self.name_ids[index])
+        row_id = self._row_id(index)
+        del self.name_ids[index]
+        del self.cents[index]
+        del self.ordinals[index]
+        # Later rows keep their IDs; the removed one leaves a hole unless it was the last
+        holes = self._holes
+        if row_id < len(self) + len(holes):
+            holes.insert(bisect_left(holes, row_id), row_id)
+        while holes and holes[-1] == len(self) + len(holes) - 1:
+            holes.pop()
+        self._notify('del', index)
+        return record
+    
+    def insert_row(self, index, name, cents, ordinal):
+        """Insert one row before position index, shifting later rows up."""
+        _check_cents(cents, cents)
+        name_id = self.intern(name)
+        self._make_room(index)
+        self.name_ids.insert(index, name_id)
+        self.cents.insert(index, cents)
+        self.ordinals.insert(index, ordinal)
+        if self._name_rows is not None:
+            self._index_name(index, name_id)
+        if self.undo_log is not None:
+            self.undo_log.append((self, 'pop', index))
+        self._notify('ins', index)
+    
+    def remove_rows(self, rows):
+        """Remove many rows in one pass over the columns.
+        
+        Listeners get one 'del' per removed row, highest position first,
+        which is the same as popping them one by one.
+        """
+        doomed = set(rows)
+        if not doomed:
+            return
+        if self.undo_log is not None:
+            self.undo_log.append((self, 'insert_rows', [
+                (index, self.names[self.name_ids[index]], self.cents[index], self.ordinals[index])
+                for index in sorted(doomed)]))
+        keep = [i for i in range(len(self)) if i not in doomed]
+        self.name_ids = array('I', map(self.name_ids.__getitem__, keep))
+        self.cents = array('q', map(self.cents.__getitem__, keep))
+        self.ordinals = array('i', map(self.ordinals.__getitem__, keep))
+        self._columns_replaced()
+        for index in sorted(doomed, reverse=True):
+            self._notify('del', index)
+    
+    def insert_rows(self, rows):
+        """Insert many (position, name, cents, ordinal) rows in one pass; undoes remove_rows().
+        
+        Positions are where the rows end up, in ascending order. Listeners
+        get one 'ins' per row, lowest position first, which is the same as
+        inserting them one by one.
+        """
+        if not rows:
+            return
+        name_ids, cents, ordinals = array('I'), array('q'), array('i')
+        copied = 0
+        for index, name, row_cents, ordinal in rows:
+            # Copy the existing rows that come before this one
+            end = copied + index - len(cents)
+            name_ids.extend(self.name_ids[copied:end])
+            cents.extend(self.cents[copied:end])
+            ordinals.extend(self.ordinals[copied:end])
+            copied = end
+            name_ids.append(self.intern(name))
+            cents.append(row_cents)
+            ordinals.append(ordinal)
+        name_ids.extend(self.name_ids[copied:])
+        cents.extend(self.cents[copied:])
+        ordinals.extend(self.ordinals[copied:])
+        self.name_ids, self.cents, self.ordinals = name_ids, cents, ordinals
+        self._columns_replaced()
+        if self.undo_log is not None:
+            self.undo_log.append((self, 'remove_rows', [index for index, _, _, _ in rows]))
+        for index, _, _, _ in rows:
+            self._notify('ins', index)
+    
+    def _columns_replaced(self):
+        """Drop what was derived from the old columns after a bulk rebuild."""
+        self._name_rows = self._name_totals = None
+        self._holes = []
+        if self._format_cache is not None:
+            # Re-formatting on demand is cheaper than shifting the cache per row
+            self.listeners.remove(self._format_cache.on_change)
+            self._format_cache = None
+    
+    def __len__(self):
+        return len(self.cents)
+    
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"{type(self).__name__} index out of range")
+        return StoreRow(self, index)
+    
+    def __iter__(self):
+        for i in range(len(self)):
+            yield StoreRow(self, i)
+
+class ExpenseStore(_LedgerStore):
+    """Columnar expense rows; payee IDs index into PAYEES first.
+    
+    Rows with a positive amount are also kept in a due-date index (parallel
+    sorted arrays of ordinals and row IDs, ties in row order), so period
+    queries are bisect range lookups. Single edits update it in place by
+    bisect. Bulk appends keep it current when they arrive in date order or
+    are few; otherwise they mark it stale and it is rebuilt with one sort
+    on the next query.
+    
+    recurring holds rule dicts ('Payee', 'Amount' or None for the payee's
+    last known amount, 'Frequency', and 'Due Date' of the first
+    occurrence); iter_recurring() expands them on demand. Rule edits reach
+    listeners as 'put-rule', 'ins-rule' and 'del-rule' with the rule's
+    position.
+    """
+    RECORD_TYPE = 'Expense'
+    NAME_KEY = 'Payee'
+    DATE_KEY = 'Due Date'
+    DEFAULT_NAMES = PAYEES
+    
+    def __init__(self, records=()):
+        self._index_ordinals = array('i')
+        self._index_rows = array('I')
+        self._index_stale = False
+        self._timeline = None
+        self.recurring = []
+        super().__init__(records)
+    
+    @classmethod
+    def from_columns(cls, names, name_ids, cents, ordinals):
+        store = super().from_columns(names, name_ids, cents, ordinals)
+        store._index_stale = len(store) > 0
+        return store
+    
+    def extend_columns(self, name_ids, cents, ordinals):
+        start = len(self)
+        super().extend_columns(name_ids, cents, ordinals)
+        if self._index_stale:
+            return
+        if not self._index_ordinals and len(self) - start > INDEX_INSERT_LIMIT:
+            # A bulk load: sort once on the first query, if one comes
+            self._index_stale = True
+            return
+        new_rows = [row for row in range(start, len(self)) if self.cents[row] > 0]
+        new_ordinals = [self.ordinals[row] for row in new_rows]
+        last = self._index_ordinals[-1] if self._index_ordinals else None
+        if new_ordinals and (last is None or new_ordinals[0] >= last) and \
+                all(a <= b for a, b in zip(new_ordinals, new_ordinals[1:])):
+            self._index_ordinals.extend(new_ordinals)
+            self._index_rows.extend(new_rows)
+        elif len(new_rows) <= INDEX_INSERT_LIMIT:
+            for row, ordinal in zip(new_rows, new_ordinals):
+                self._index(row, ordinal)
+        else:
+            self._index_stale = True
+    
+    def add_row(self, name, cents, ordinal):
+        # Check before the index changes, so a bad amount leaves the store as it was
+        _check_cents(cents, cents)
+        if cents > 0:
+            # The new row's ID is the next one after every existing row's
+            self._index(len(self) + len(self._holes), ordinal)
+        super().add_row(name, cents, ordinal)
+    
+    def set_cents(self, index, cents):
+        was_indexed = self.cents[index] > 0
+        super().set_cents(index, cents)
+        if was_indexed and cents <= 0:
+            self._unindex(self._row_id(index), self.ordinals[index])
+        elif not was_indexed and cents > 0:
+            self._index(self._row_id(index), self.ordinals[index])
+    
+    def set_ordinal(self, index, ordinal):
+        if self.cents[index] > 0:
+            row_id = self._row_id(index)
+            self._unindex(row_id, self.ordinals[index])
+            self._index(row_id, ordinal)
+        super().set_ordinal(index, ordinal)
+    
+    def pop(self, index=-1):
+        if index < 0:
+            index += len(self)
+        if self.cents[index] > 0:
+            self._unindex(self._row_id(index), self.ordinals[index])
+        return super().pop(index)
+    
+    def insert_row(self, index, name, cents, ordinal):
+        super().insert_row(index, name, cents, ordinal)
+        if cents > 0:
+            self._index(self._row_id(index), ordinal)
+    
+    def remove_rows(self, rows):
+        rows = set(rows)
+        if rows:
+            self._index_stale = True
+        super().remove_rows(rows)
+    
+    def insert_rows(self, rows):
+        if rows:
+            self._index_stale = True
+        super().insert_rows(rows)
+    
+    def _compact_ids(self):
+        if self._holes and not self._index_stale:
+            self._index_rows = self._positions(self._index_rows)
+        super()._compact_ids()
+    
+    def _shift_ids(self, index):
+        super()._shift_ids(index)
+        if not self._index_stale:
+            rows = self._index_rows
+            for j, row in enumerate(rows):
+                if row >= index:
+                    rows[j] = row + 1
+    
+    def _index(self, row, ordinal):
+        """Insert a row ID into the due-date index."""
+        if self._index_stale:
+            return
+        ordinals, rows = self._index_ordinals, self._index_rows
+        lo = bisect_left(ordinals, ordinal)
+        hi = bisect_right(ordinals, ordinal, lo)
+        # Keep rows sharing a due date in row order
+        while lo < hi and rows[lo] < row:
+            lo += 1
+        ordinals.insert(lo, ordinal)
+        rows.insert(lo, row)
+    
+    def _unindex(self, row, ordinal):
+        """Remove a row ID from the due-date index."""
+        if self._index_stale:
+            return
+        ordinals, rows = self._index_ordinals, self._index_rows
+        for j in range(bisect_left(ordinals, ordinal), bisect_right(ordinals, ordinal)):
+            if rows[j] == row:
+                del ordinals[j]
+                del rows[j]
+                return
+    
+    def index_is_stale(self):
+        """True if the due-date index must be rebuilt before the next query."""
+        return self._index_stale
+    
+    def _ensure_index(self):
+        """Rebuild the due-date index if bulk appends left it stale."""
+        if not self._index_stale:
+            return
+        self._compact_ids()
+        cents, ordinals = self.cents, self.ordinals
+        rows = sorted((i for i in range(len(self)) if cents[i] > 0), key=ordinals.__getitem__)
+        self._index_rows = array('I', rows)
+        self._index_ordinals = array('i', (ordinals[i] for i in rows))
+        self._index_stale = False
+    
+    def due_index(self):
+        """Return the (sorted due ordinals, row positions) arrays of positive-amount rows."""
+        self._ensure_index()
+        self._compact_ids()
+        return self._index_ordinals, self._index_rows
+    
+    def rows_due_between(self, start_ordinal, end_ordinal=None):
+        """Return positive-amount rows due in [start, end) as a RowRange in due-date order."""
+        self._ensure_index()
+        lo = bisect_left(self._index_ordinals, start_ordinal)
+        hi = len(self._index_ordinals) if end_ordinal is None else bisect_left(self._index_ordinals, end_ordinal, lo)
+        return RowRange(self, self._positions(self._index_rows[lo:hi]))
+    
+    def add_recurring(self, payee, amount, frequency, first_due):
+        """Add a recurring expense rule; amount None means the payee's last known amount."""
+        if frequency not in RECURRING_FREQUENCIES:
+            raise ValueError(f"unknown frequency {frequency!r}")
+        self.recurring.append({
+            'Payee': payee,
+            'Amount': None if amount is None else Money.of(amount),
+            'Frequency': frequency,
+            'Due Date': first_due
+        })
+        if self.undo_log is not None:
+            self.undo_log.append((self, 'remove_recurring', len(self.recurring) - 1))
+        self._notify('put-rule', len(self.recurring) - 1)
+    
+    def remove_recurring(self, index):
+        """Remove and return a recurring expense rule."""
+        rule = self.recurring.pop(index)
+        if index < 0:
+            index += len(self.recurring) + 1
+        if self.undo_log is not None:
+            self.undo_log.append((self, 'insert_recurring', index, rule))
+        self._notify('del-rule', index)
+        return rule
+    
+    def insert_recurring(self, index, rule):
+        """Put a rule dict back at a position in recurring."""
+        self.recurring.insert(index, rule)
+        if self.undo_log is not None:
+            self.undo_log.append((self, 'remove_recurring', index))
+        self._notify('ins-rule', index)
+    
+    def recurring_context(self):
+        """Return (explicit payee months, last known amounts) for the rules' payees."""
+        explicit = set()
+        last_known = {}
+        for payee in {rule['Payee'] for rule in self.recurring}:
+            latest = None
+            for row in self.rows_for(payee).rows:
+                day = date.fromordinal(self.ordinals[row])
+                explicit.add((payee, day.year, day.month))
+                if self.cents[row] > 0 and (latest is None or self.ordinals[row] >= self.ordinals[latest]):
+                    latest = row
+            if latest is not None:
+                last_known[payee] = Money(self.cents[latest])
+        return explicit, last_known
+    
+    def iter_recurring(self, start, end=None):
+        """Lazily yield the expenses generated by the recurring rules in [start, end)."""
+        return expand_recurring(self.recurring, start, end, *self.recurring_context())
+
+class RowRange:
+    """Read-only sequence of StoreRow views over selected row positions."""
+    __slots__ = ('store', 'rows')
+    
+    def __init__(self, store, rows):
+        self.store = store
+        self.rows = rows
+    
+    def __len__(self):
+        return len(self.rows)
+    
+    def __getitem__(self, i):
+        return StoreRow(self.store, self.rows[i])
+    
+    def __iter__(self):
+        store = self.store
+        for row in self.rows:
+            yield StoreRow(store, row)
+    
+    def __eq__(self, other):
+        if not isinstance(other, RowRange):
+            return NotImplemented
+        return self.store is other.store and list(self.rows) == list(other.rows)
+    
+    def total_cents(self):
+        """Sum of the amounts in this range, in cents."""
+        cents = self.store.cents
+        return sum(cents[row] for row in self.rows)
+
+class IncomeStore(_LedgerStore):
+    """Columnar income rows; bank IDs index into INCOME_SOURCES first."""
+    RECORD_TYPE = 'Income'
+    NAME_KEY = 'Bank'
+    DATE_KEY = 'Balance Date'
+    DEFAULT_NAMES = INCOME_SOURCES
+
+def _current_user():
+    """Login name for the audit trail."""
+    import getpass
+    try:
+        return getpass.getuser()
+    except (KeyError, OSError):
+        return 'unknown'
+
+class EditHistory:
+    """Undo and redo for the edits made to an ExpenseStore and IncomeStore.
+    
+    A step is an operation log, not a copy of the ledger: while an edit
+    runs, the stores' undo_log collects the call that reverts each change
+    (the old value of a field, the contents of a removed row), so a step
+    costs memory in proportion to the rows it touched. Undo replays a
+    step's calls newest first while the stores log their inverses, which
+    become the redo step. The newest limit steps are kept.
+    
+    audit gets one entry per changed row per step, undo and redo
+    included, saying who changed which amount and when (see AUDIT_FIELDS).
+    Entries are made from the log as each change is reported to the
+    stores' listeners, while its row positions are still current.
+    """
+    
+    def __init__(self, expenses, income, limit=HISTORY_LIMIT, user=None):
+        self.stores = (expenses, income)
+        self.undo_steps = deque(maxlen=limit)
+        self.redo_steps = deque(maxlen=limit)
+        self.user = user or _current_user()
+        self.audit = []
+        self._ops = None
+        self._audited = 0
+        self._action = None
+        self._when = None
+        self._last_edit = None
+    
+    @contextmanager
+    def _logging(self, action):
+        """Collect the stores' reverting calls, and audit entries for them, into a new list."""
+        ops = self._ops = []
+        self._audited = 0
+        self._action = action
+        self._when = datetime.now().isoformat(timespec='seconds')
+        self._last_edit = None
+        for store in self.stores:
+            store.undo_log = ops
+            store.listeners.append(self._on_change)
+        try:
+            yield ops
+        finally:
+            for store in self.stores:
+                store.undo_log = None
+                store.listeners.remove(self._on_change)
+            self._ops = None
+    
+    @contextmanager
+    def edit(self, label):
+        """Record the changes made in the with block as one undoable step."""
+        with self._logging(label) as ops:
+            try:
+                yield
+            finally:
+                if ops:
+                    self.undo_steps.append((label, ops))
+                    self.redo_steps.clear()
+    
+    def _replay(self, ops, action):
+        """Apply a step's reverting calls newest first; returns the calls that revert those."""
+        with self._logging(action) as inverse:
+            for store, method, *args in reversed(ops):
+                getattr(store, method)(*args)
+        return inverse
+    
+    def undo(self):
+        """Revert the newest step; returns its label, or None if there is nothing to undo."""
+        if not self.undo_steps:
+            return None
+        label, ops = self.undo_steps.pop()
+        self.redo_steps.append((label, self._replay(ops, f"Undo {label}")))
+        return label
+    
+    def redo(self):
+        """Make the newest undone step again; returns its label, or None."""
+        if not self.redo_steps:
+            return None
+        label, ops = self.redo_steps.pop()
+        self.undo_steps.append((label, self._replay(ops, f"Redo {label}")))
+        return label
+    
+    def undo_label(self):
+        """Label of the step undo() would revert, or None."""
+        return self.undo_steps[-1][0] if self.undo_steps else None
+    
+    def redo_label(self):
+        """Label of the step redo() would make again, or None."""
+        return self.redo_steps[-1][0] if self.redo_steps else None
+    
+    def _on_change(self, store, op, index):
+        # Each logged call is audited once, right after the change it reverts
+        ops = self._ops
+        while self._audited < len(ops):
+            self._audit_call(*ops[self._audited])
+            self._audited += 1
+    
+    def _add_entry(self, record_type, name, day, old, new):
+        entry = {'When': self._when, 'User': self.user, 'Action': self._action, 'Type': record_type,
+                 'Name': name, 'Date': day.isoformat(),
+                 'Old Amount': '' if old is None else old, 'New Amount': '' if new is None else new}
+        self.audit.append(entry)
+        return entry
+    
+    def _audit_call(self, store, method, *args):
+        """Audit the change that store.method(*args) would revert."""
+        if method in ('set_name', 'set_cents', 'set_ordinal'):
+            index = args[0]
+            name, day = store.names[store.name_ids[index]], date.fromordinal(store.ordinals[index])
+            new = Money(store.cents[index])
+            old = Money(args[1]) if method == 'set_cents' else new
+            if self._last_edit is not None and self._last_edit[0] == (store, index):
+                # Further fields of the same row update its entry, which keeps the first old amount
+                self._last_edit[1].update({'Name': name, 'Date': day.isoformat(), 'New Amount': new})
+                return
+            entry = self._add_entry(store.RECORD_TYPE, name, day, old, new)
+            self._last_edit = ((store, index), entry)
+            return
+        self._last_edit = None
+        if method in ('pop', 'remove_rows'):
+            for index in (args if method == 'pop' else args[0]):
+                self._add_entry(store.RECORD_TYPE, store.names[store.name_ids[index]],
+                                date.fromordinal(store.ordinals[index]), None, Money(store.cents[index]))
+        elif method in ('insert_row', 'insert_rows'):
+            for _, name, cents, ordinal in ([args] if method == 'insert_row' else args[0]):
+                self._add_entry(store.RECORD_TYPE, name, date.fromordinal(ordinal), Money(cents), None)
+        elif method == 'remove_recurring':
+            rule = store.recurring[args[0]]
+            self._add_entry('Recurring', rule['Payee'], rule['Due Date'].date(), None, rule['Amount'])
+        elif method == 'insert_recurring':
+            rule = args[1]
+            self._add_entry('Recurring', rule['Payee'], rule['Due Date'].date(), rule['Amount'], None)
+
+def to_cents(amount):
+    """Convert Money, a dollar amount or amount text to integer cents."""
+    if isinstance(amount, Money):
+        return int(amount)
+    return int(Money.of(amount))
+
+def recurring_due_dates(rule, start, end=None):
+    """Lazily yield a recurring rule's due dates in [start, end), or from start on.
+    
+    The rule's 'Due Date' is its first occurrence; later ones fall on the
+    same day of the month, moved back to the last day of shorter months.
+    """
+    from calendar import monthrange
+    first = rule['Due Date']
+    step = RECURRING_FREQUENCIES[rule['Frequency']]
+    month = first.year * 12 + first.month - 1
+    if start > first:
+        # Jump to the cycle containing start instead of walking up from first
+        month += (start.year * 12 + start.month - 1 - month) // step * step
+    while True:
+        year, month_index = divmod(month, 12)
+        due = datetime(year, month_index + 1, min(first.day, monthrange(year, month_index + 1)[1]))
+        if end is not None and due >= end:
+            return
+        if due >= start:
+            yield due
+        month += step
+
+def _recurring_records(rule, amount, start, end, explicit):
+    """Expense records for one rule's due dates that no explicit row overrides."""
+    payee = rule['Payee']
+    for due in recurring_due_dates(rule, start, end):
+        if (payee, due.year, due.month) not in explicit:
+            yield {'Payee': payee, 'Amount': amount, 'Due Date': due, 'Frequency': rule['Frequency']}
+
+def expand_recurring(rules, start, end=None, explicit=frozenset(), last_known=None):
+    """Lazily expand recurring rules into expense records in due-date order.
+    
+    explicit holds (payee, year, month) for every one-off row; such a row
+    replaces the generated occurrence for that payee and month. A rule
+    without an amount uses last_known[payee] and is skipped if there is
+    none. Only one pending occurrence per rule is held at a time, so
+    memory does not grow with the width of [start, end).
+    """
+    last_known = last_known or {}
+    streams = []
+    for rule in rules:
+        amount = rule['Amount'] if rule['Amount'] is not None else last_known.get(rule['Payee'])
+        if amount and amount > 0:
+            streams.append(_recurring_records(rule, Money.of(amount), start, end, explicit))
+    return merge(*streams, key=lambda exp: exp['Due Date'])
+
+def _add_recurring(rules, explicit, last_known, today, period_end, relevant, future):
+    """Merge generated expenses into sorted period and future lists.
+    
+    The period gets every occurrence due in [today, period_end); the future
+    list gets each rule's next occurrence after that. Returns (relevant,
+    future, generated total).
+    """
+    generated = list(expand_recurring(rules, today, period_end, explicit, last_known))
+    upcoming = []
+    for rule in rules:
+        exp = next(expand_recurring([rule], period_end, None, explicit, last_known), None)
+        if exp is not None:
+            upcoming.append(exp)
+    upcoming.sort(key=lambda exp: exp['Due Date'])
+    return (list(merge(relevant, generated, key=lambda exp: exp['Due Date'])),
+            list(merge(future, upcoming, key=lambda exp: exp['Due Date'])),
+            sum((exp['Amount'] for exp in generated), Money(0)))
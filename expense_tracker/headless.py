@@ -0,0 +1,141 @@
+"""Headless analysis of ledger files and the JSON, CSV and table summaries."""
+import csv
+import json
+import os
+import sys
+from contextlib import redirect_stdout
+from io import StringIO
+
+from .analysis import calculate_transfer
+from .core import HEADLESS_CSV_FIELDS, Money
+from .storage import CSVStorage, ingest_files, open_storage
+from .ui import print_results
+
+def analyze_ledger(filename, as_of=None, margin=None, accept_recommended=False, output='table'):
+    """Headless analysis of one ledger file; returns a picklable summary dict.
+    
+    Anything the loaders print is captured into 'messages' so it cannot
+    mix with JSON or CSV output. For table output the rendered report is
+    returned in 'report'.
+    """
+    summary = {'file': filename}
+    with redirect_stdout(StringIO()) as captured:
+        try:
+            storage = open_storage(filename)
+            database = not isinstance(storage, CSVStorage)
+            if database and not os.path.exists(filename):
+                results = None
+                print(f"Error: File '{filename}' not found.")
+            else:
+                try:
+                    if database:
+                        results = storage.calculate_transfer(as_of=as_of, margin=margin)
+                    else:
+                        expenses, income = storage.load()
+                        results = None if expenses is None else calculate_transfer(
+                            expenses, income, as_of=as_of, margin=margin)
+                finally:
+                    storage.close()
+        except Exception as e:
+            results = None
+            print(f"Error reading file: {e}")
+        messages = captured.getvalue().strip()
+    
+    return _ledger_summary(summary, results, messages, accept_recommended, output)
+
+def analyze_merged_ledgers(filenames, as_of=None, margin=None, accept_recommended=False, output='table', jobs=None):
+    """Headless analysis of several statements merged with ingest_files()."""
+    summary = {'file': ' + '.join(filenames)}
+    with redirect_stdout(StringIO()) as captured:
+        expenses, income, duplicates = ingest_files(filenames, jobs=jobs)
+        results = None
+        if expenses is not None:
+            if duplicates:
+                print(f"Skipped {duplicates} duplicate row(s) found in more than one file")
+            results = calculate_transfer(expenses, income, as_of=as_of, margin=margin)
+        messages = captured.getvalue().strip()
+    return _ledger_summary(summary, results, messages, accept_recommended, output)
+
+def _ledger_summary(summary, results, messages, accept_recommended, output):
+    """Fill in a headless summary dict from calculate_transfer results."""
+    if results is None:
+        summary['error'] = messages or f"Unable to read '{summary['file']}'"
+        return summary
+    
+    actual_transfer = results['transfer_amount'] if accept_recommended else Money(0)
+    sccu_after = results['sccu_before'] + actual_transfer
+    summary.update({
+        'as_of': results['current_date'].strftime('%Y-%m-%d'),
+        'period': results['period'],
+        'expense_count': len(results['relevant_expenses']),
+        'future_expense_count': len(results['future_expenses']),
+        'total_expenses': float(results['total_expenses']),
+        'safety_margin': float(results['safety_margin']),
+        'sccu_before': float(results['sccu_before']),
+        'etrade_before': float(results['etrade_before']),
+        'recommended_transfer': float(results['transfer_amount']),
+        'actual_transfer': float(actual_transfer),
+        'sccu_after_expenses': float(sccu_after - results['total_expenses']),
+        'etrade_after': float(results['etrade_before'] - actual_transfer),
+        'messages': messages,
+    })
+    if output == 'table':
+        with redirect_stdout(StringIO()) as report:
+            print_results(results, actual_transfer=actual_transfer)
+        summary['report'] = report.getvalue()
+    return summary
+
+def _analyze_ledger_job(job):
+    """ProcessPoolExecutor entry point for analyze_ledger."""
+    return analyze_ledger(*job)
+
+def analyze_ledgers(filenames, as_of=None, margin=None, accept_recommended=False, output='table', jobs=None):
+    """Analyze many ledgers, in parallel worker processes when there is more than one."""
+    job_args = [(filename, as_of, margin, accept_recommended, output) for filename in filenames]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(job_args) <= 1:
+        return [_analyze_ledger_job(job) for job in job_args]
+    # Batch many small ledgers per task to keep IPC overhead down
+    chunksize = max(1, len(job_args) // (jobs * 4))
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(_analyze_ledger_job, job_args, chunksize=chunksize))
+
+def summarize_ledgers(summaries):
+    """Aggregate totals across analyzed ledgers."""
+    ok = [summary for summary in summaries if 'error' not in summary]
+    return {
+        'ledgers': len(summaries),
+        'failed': len(summaries) - len(ok),
+        'total_expenses': float(sum((Money.of(summary['total_expenses']) for summary in ok), Money(0))),
+        'recommended_transfer': float(sum((Money.of(summary['recommended_transfer']) for summary in ok), Money(0))),
+        'actual_transfer': float(sum((Money.of(summary['actual_transfer']) for summary in ok), Money(0))),
+        'ledgers_needing_transfer': sum(1 for summary in ok if summary['recommended_transfer'] > 0),
+    }
+
+def write_ledger_summaries(summaries, output, stream=None):
+    """Write analyzed ledgers as 'json', 'csv' or 'table'."""
+    stream = stream or sys.stdout
+    totals = summarize_ledgers(summaries)
+    if output == 'json':
+        json.dump({'ledgers': summaries, 'totals': totals}, stream, indent=2)
+        stream.write('\n')
+    elif output == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=HEADLESS_CSV_FIELDS, extrasaction='ignore', lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(summaries)
+    else:
+        for summary in summaries:
+            if len(summaries) > 1:
+                stream.write(f"\n### {summary['file']}\n")
+            if 'error' in summary:
+                stream.write(f"{summary['error']}\n")
+                continue
+            if summary['messages']:
+                stream.write(summary['messages'] + '\n')
+            stream.write(summary['report'])
+        if len(summaries) > 1:
+            stream.write(f"\n{totals['ledgers']} ledger(s), {totals['failed']} failed: "
+                         f"expenses ${totals['total_expenses']:.2f}, "
+                         f"recommended transfers ${totals['recommended_transfer']:.2f} "
+                         f"({totals['ledgers_needing_transfer']} ledger(s))\n")
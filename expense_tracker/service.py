@@ -0,0 +1,281 @@
+"""--serve: a ledger as a local HTTP/JSON service."""
+import json
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from .analysis import calculate_transfer
+from .core import SAFETY_MARGIN_CENTS, SERVICE_HOST, SERVICE_PAGE_SIZE, Money, parse_date
+from .headless import _ledger_summary
+from .storage import LedgerJournal, read_csv_file, save_ledger
+
+class ReadWriteLock:
+    """Many readers at once or a single writer; a waiting writer holds off new readers."""
+    
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+    
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+    
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+class LedgerService:
+    """A CSV ledger held in memory for the HTTP service.
+    
+    handle() answers one request as (status, JSON-able body or encoded
+    bytes) and raises LookupError for unknown routes or rows and
+    ValueError for bad input; anything else is a bug and a 500. Reads share a ReadWriteLock and
+    edits take it exclusively. Every edit is journaled as it happens, like
+    the interactive menus, and close() compacts the journal when it has
+    grown. Analysis responses are cached per (as-of date, margin, store
+    versions), so repeated dashboard polls cost a dict lookup.
+    """
+    
+    def __init__(self, filename):
+        self.filename = filename
+        self.expenses, self.income = read_csv_file(filename)
+        if self.expenses is None:
+            raise ValueError(f"unable to read '{filename}'")
+        self.lock = ReadWriteLock()
+        self.journal = LedgerJournal(filename)
+        self.journal.attach(self.expenses, self.income)
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        self._warm_indexes()
+    
+    def _warm_indexes(self):
+        """Build the lazy indexes up front so concurrent readers never race to build them."""
+        self.expenses.due_index()
+        for store in (self.expenses, self.income):
+            store._ensure_name_index()
+    
+    def _store(self, kind):
+        if kind == 'expenses':
+            return self.expenses
+        if kind == 'income':
+            return self.income
+        raise LookupError(f"unknown collection '{kind}'")
+    
+    def handle(self, method, parts, query, payload=None):
+        """Route one request: /analysis, /expenses[/<index>] or /income[/<index>]."""
+        if parts == ['analysis'] and method == 'GET':
+            return 200, self.analysis(query.get('as_of'), query.get('margin'))
+        if parts and len(parts) <= 2:
+            store = self._store(parts[0])
+            if len(parts) == 1 and method == 'GET':
+                return 200, self.list_rows(store, query)
+            if len(parts) == 1 and method == 'POST':
+                return 201, self.add_row(store, payload or {})
+            index = int(parts[1]) if len(parts) == 2 and parts[1].isdigit() else None
+            if index is not None and method == 'GET':
+                with self.lock.read():
+                    return 200, _row_json(store, self._check_index(store, index))
+            if index is not None and method == 'PATCH':
+                return 200, self.update_row(store, index, payload or {})
+            if index is not None and method == 'DELETE':
+                return 200, self.delete_row(store, index)
+        raise LookupError(f"no route for {method} /{'/'.join(parts)}")
+    
+    def analysis(self, as_of=None, margin=None):
+        """calculate_transfer as encoded JSON, cached until the ledger changes."""
+        day = parse_date(as_of) if as_of else datetime.combine(date.today(), datetime.min.time())
+        margin = Money.parse(margin) if margin else Money(SAFETY_MARGIN_CENTS)
+        with self.lock.read():
+            key = (day, int(margin), self.expenses.version, self.income.version)
+            body = self._cache.get(key)
+            if body is None:
+                results = calculate_transfer(self.expenses, self.income, as_of=day, margin=margin)
+                summary = _ledger_summary({'file': self.filename}, results, '', False, 'json')
+                summary['upcoming'] = [
+                    {'Payee': exp['Payee'], 'Amount': float(exp['Amount']),
+                     'Due Date': exp['Due Date'].strftime('%Y-%m-%d')}
+                    for exp in results['relevant_expenses']]
+                body = json.dumps(summary).encode('utf-8')
+                with self._cache_lock:
+                    # Entries for older versions can never be hit again
+                    if len(self._cache) >= 1024 or any(cached[2:] != key[2:] for cached in self._cache):
+                        self._cache.clear()
+                    self._cache[key] = body
+        return body
+    
+    def list_rows(self, store, query):
+        """One page of rows, optionally filtered by name and a [start, end) date range."""
+        name = query.get(store.NAME_KEY.lower())
+        start = parse_date(query['start']).toordinal() if query.get('start') else None
+        end = parse_date(query['end']).toordinal() if query.get('end') else None
+        offset = int(query.get('offset', 0))
+        limit = int(query.get('limit', SERVICE_PAGE_SIZE))
+        if offset < 0 or limit < 0:
+            raise ValueError("offset and limit must not be negative")
+        with self.lock.read():
+            rows = store.rows_matching(store.canonical_name(name) if name else None, start, end).rows
+            return {'total': len(rows), 'offset': offset,
+                    'rows': [_row_json(store, row) for row in rows[offset:offset + limit]]}
+    
+    def _check_index(self, store, index):
+        if not 0 <= index < len(store):
+            raise LookupError(f"no {store.RECORD_TYPE.lower()} row {index}")
+        return index
+    
+    def _fields(self, store, payload, required):
+        """Validate a row payload into {'name', 'cents', 'ordinal'}, for the keys present."""
+        if not isinstance(payload, dict):
+            raise ValueError("expected a JSON object")
+        fields = {}
+        for key, field in ((store.NAME_KEY, 'name'), ('Amount', 'cents'), (store.DATE_KEY, 'ordinal')):
+            if key not in payload:
+                if required:
+                    raise ValueError(f"missing '{key}'")
+                continue
+            value = payload[key]
+            if field == 'name':
+                if not isinstance(value, str) or not value.strip():
+                    raise ValueError(f"'{key}' must be a non-empty string")
+                fields[field] = store.canonical_name(value.strip())
+            elif field == 'cents':
+                # Money.of() rejects NaN, infinity and amounts too large for the cents column
+                if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+                    raise ValueError(f"'{key}' must be a number")
+                try:
+                    fields[field] = int(Money.of(value))
+                except ValueError as e:
+                    raise ValueError(f"'{key}': {e}") from None
+            else:
+                if not isinstance(value, str):
+                    raise ValueError(f"'{key}' must be a date string")
+                fields[field] = parse_date(value).toordinal()
+        return fields
+    
+    def add_row(self, store, payload):
+        fields = self._fields(store, payload, required=True)
+        with self.lock.write():
+            store.add_row(fields['name'], fields['cents'], fields['ordinal'])
+            return _row_json(store, len(store) - 1)
+    
+    def update_row(self, store, index, payload):
+        fields = self._fields(store, payload, required=False)
+        with self.lock.write():
+            self._check_index(store, index)
+            if 'name' in fields:
+                store.set_name(index, fields['name'])
+            if 'cents' in fields:
+                store.set_cents(index, fields['cents'])
+            if 'ordinal' in fields:
+                store.set_ordinal(index, fields['ordinal'])
+            return _row_json(store, index)
+    
+    def delete_row(self, store, index):
+        with self.lock.write():
+            row = _row_json(store, self._check_index(store, index))
+            store.pop(index)
+            return row
+    
+    def close(self):
+        """Stop journaling and rewrite the CSV if the journal has grown long."""
+        with self.lock.write():
+            save_ledger(self.expenses, self.income, self.filename, self.journal)
+
+def _row_json(store, index):
+    """A store row as a JSON-able dict, with its current position as 'index'."""
+    return {'index': index, store.NAME_KEY: store.names[store.name_ids[index]],
+            'Amount': float(Money(store.cents[index])),
+            store.DATE_KEY: date.fromordinal(store.ordinals[index]).isoformat()}
+
+class LedgerRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end for the LedgerService on self.server.service."""
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        self._dispatch('GET')
+    
+    def do_POST(self):
+        self._dispatch('POST')
+    
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+    
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+    
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            payload = json.loads(self.rfile.read(length)) if length else None
+            status, body = self.server.service.handle(method, parts, query, payload)
+        except LookupError as e:
+            status, body = 404, {'error': str(e)}
+        except ValueError as e:
+            status, body = 400, {'error': str(e)}
+        except Exception:
+            # Not the client's fault: report it here rather than echo internals back
+            traceback.print_exc()
+            status, body = 500, {'error': "internal server error"}
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        # Dashboards poll constantly; a line per request would drown stderr
+        pass
+
+def make_ledger_server(filename, host=SERVICE_HOST, port=0):
+    """A ThreadingHTTPServer serving one CSV ledger; port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), LedgerRequestHandler)
+    server.daemon_threads = True
+    try:
+        server.service = LedgerService(filename)
+    except Exception:
+        server.server_close()
+        raise
+    return server
+
+def serve_ledger(filename, host=SERVICE_HOST, port=8000):
+    """Serve a ledger until interrupted, then save it."""
+    server = make_ledger_server(filename, host, port)
+    host, port = server.server_address[:2]
+    print(f"Serving '{filename}' on http://{host}:{port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.close()
@@ -0,0 +1,161 @@
+"""Ledgers kept in SQLite; only imported for .db, .sqlite and .sqlite3 files."""
+import os
+import sqlite3
+from datetime import date, datetime
+
+from .analysis import _transfer_results, period_bounds
+from .core import SAFETY_MARGIN_CENTS, _LedgerStore, ExpenseStore, IncomeStore, Money, _add_recurring, to_cents
+from .storage import read_csv_file
+
+class SQLiteStorage:
+    """Ledger kept in a SQLite database.
+    
+    One 'ledger' table mirrors the CSV: a type ('Expense' or 'Income'), the
+    payee or bank name, the amount in cents and the due or balance date as
+    an ordinal, in insertion order. Indexes on (type, day) and name let
+    calculate_transfer's period filters run as indexed range queries.
+    Recurring expense rules live in a small 'recurring' table.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS ledger (
+            id INTEGER PRIMARY KEY,
+            type TEXT NOT NULL,
+            name TEXT NOT NULL,
+            cents INTEGER NOT NULL,
+            day INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS ledger_type_day ON ledger (type, day);
+        CREATE INDEX IF NOT EXISTS ledger_name ON ledger (name);
+        CREATE TABLE IF NOT EXISTS recurring (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            cents INTEGER,
+            day INTEGER NOT NULL,
+            frequency TEXT NOT NULL
+        );
+    """
+    
+    def __init__(self, filename):
+        self.filename = filename
+        self._conn = None
+    
+    @property
+    def conn(self):
+        """The database connection, opened (and the schema created) on first use."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.filename)
+            self._conn.executescript(self.SCHEMA)
+        return self._conn
+    
+    def load(self):
+        """Return (ExpenseStore, IncomeStore), or (None, None) on error."""
+        if not os.path.exists(self.filename):
+            print(f"Error: File '{self.filename}' not found.")
+            return None, None
+        try:
+            expenses = ExpenseStore()
+            income = IncomeStore()
+            stores = {'Expense': expenses, 'Income': income}
+            for record_type, name, cents, day in self.conn.execute(
+                    "SELECT type, name, cents, day FROM ledger ORDER BY id"):
+                stores[record_type].add_row(name, cents, day)
+            for rule in self._recurring_rules():
+                expenses.add_recurring(rule['Payee'], rule['Amount'], rule['Frequency'], rule['Due Date'])
+            return expenses, income
+        except sqlite3.Error as e:
+            print(f"Error reading database: {e}")
+            return None, None
+    
+    def save(self, expenses, income):
+        """Replace the database contents in a single transaction."""
+        conn = self.conn
+        with conn:
+            conn.execute("DELETE FROM ledger")
+            for store in (expenses, income):
+                if not isinstance(store, _LedgerStore):
+                    store = (ExpenseStore if store is expenses else IncomeStore)(store)
+                names = store.names
+                conn.executemany(
+                    "INSERT INTO ledger (type, name, cents, day) VALUES (?, ?, ?, ?)",
+                    ((store.RECORD_TYPE, names[name_id], cents, day)
+                     for name_id, cents, day in zip(store.name_ids, store.cents, store.ordinals)))
+                if store.RECORD_TYPE == 'Expense':
+                    conn.execute("DELETE FROM recurring")
+                    conn.executemany(
+                        "INSERT INTO recurring (name, cents, day, frequency) VALUES (?, ?, ?, ?)",
+                        ((rule['Payee'], None if rule['Amount'] is None else to_cents(rule['Amount']),
+                          rule['Due Date'].toordinal(), rule['Frequency']) for rule in store.recurring))
+        print(f"\nData saved to '{self.filename}'")
+    
+    def _recurring_rules(self):
+        """The recurring expense rules, in the order they were added."""
+        return [{'Payee': name, 'Amount': None if cents is None else Money(cents),
+                 'Frequency': frequency, 'Due Date': datetime.fromordinal(day)}
+                for name, cents, day, frequency in self.conn.execute(
+                    "SELECT name, cents, day, frequency FROM recurring ORDER BY id")]
+    
+    def _recurring_context(self, rules):
+        """(explicit payee months, last known amounts) for the rules' payees, via the name index."""
+        explicit = set()
+        last_known = {}
+        for payee in {rule['Payee'] for rule in rules}:
+            for cents, day in self.conn.execute(
+                    "SELECT cents, day FROM ledger WHERE type = 'Expense' AND name = ? ORDER BY day, id",
+                    (payee,)):
+                due = date.fromordinal(day)
+                explicit.add((payee, due.year, due.month))
+                if cents > 0:
+                    last_known[payee] = Money(cents)
+        return explicit, last_known
+    
+    def _expenses_due(self, start_ordinal, end_ordinal=None):
+        """Positive expenses due in [start, end) as record dicts in due-date order."""
+        query = "SELECT name, cents, day FROM ledger WHERE type = 'Expense' AND day >= ?"
+        params = [start_ordinal]
+        if end_ordinal is not None:
+            query += " AND day < ?"
+            params.append(end_ordinal)
+        query += " AND cents > 0 ORDER BY day, id"
+        return [{'Payee': name, 'Amount': Money(cents), 'Due Date': datetime.fromordinal(day)}
+                for name, cents, day in self.conn.execute(query, params)]
+    
+    def calculate_transfer(self, as_of=None, margin=None):
+        """calculate_transfer answered with indexed queries instead of a full load."""
+        current_date = as_of or datetime.now()
+        margin = Money(SAFETY_MARGIN_CENTS) if margin is None else Money.of(margin)
+        period, today, period_end = period_bounds(current_date)
+        relevant_expenses = self._expenses_due(today.toordinal(), period_end.toordinal())
+        future_expenses = self._expenses_due(period_end.toordinal())
+        relevant_cents = self.conn.execute(
+            "SELECT COALESCE(SUM(cents), 0) FROM ledger "
+            "WHERE type = 'Expense' AND day >= ? AND day < ? AND cents > 0",
+            (today.toordinal(), period_end.toordinal())).fetchone()[0]
+        total_expenses = Money(relevant_cents)
+        rules = self._recurring_rules()
+        if rules:
+            relevant_expenses, future_expenses, generated_total = _add_recurring(
+                rules, *self._recurring_context(rules), today, period_end, relevant_expenses, future_expenses)
+            total_expenses += generated_total
+        
+        income = ({'Bank': name, 'Amount': Money(cents)} for name, cents in self.conn.execute(
+            "SELECT name, cents FROM ledger WHERE type = 'Income' ORDER BY id"))
+        return _transfer_results(current_date, period, relevant_expenses, future_expenses, total_expenses,
+                                 income, margin)
+    
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+def migrate_csv_to_sqlite(csv_filename, db_filename):
+    """One-shot import of a CSV ledger (plus its journal) into a SQLite database."""
+    expenses, income = read_csv_file(csv_filename)
+    if expenses is None:
+        return False
+    storage = SQLiteStorage(db_filename)
+    try:
+        storage.save(expenses, income)
+    finally:
+        storage.close()
+    print(f"Migrated {len(expenses)} expense(s) and {len(income)} income row(s) to '{db_filename}'")
+    return True
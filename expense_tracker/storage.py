@@ -0,0 +1,1009 @@
+"""Reading and writing ledgers: CSV and the compact export formats, snapshots,
+the edit journal, bulk ingest, bank statements and account settings.
+"""
+import csv
+import glob
+import json
+import mmap
+import os
+import stat
+import struct
+import sys
+from array import array
+from contextlib import suppress
+from datetime import date, datetime
+from functools import lru_cache
+from io import StringIO, TextIOWrapper
+
+from .analysis import calculate_transfer
+from .core import (ACCOUNTS_SUFFIX, ALIASES_SUFFIX, AUDIT_FIELDS, AUDIT_SUFFIX, COLUMNS_EXTENSION, COLUMNS_HEADER, COLUMNS_MAGIC,
+                   DEFAULT_CSV_FILENAME, GZIP_EXTENSION, GZIP_LEVEL, INGEST_CHUNK_BYTES, INGEST_DATE_SAMPLE_BYTES,
+                   JOURNAL_COMPACT_THRESHOLD, JOURNAL_SUFFIX, PARQUET_EXTENSION, PARQUET_MAGIC, PAYEE_ALIASES,
+                   SAVE_WRITE_BATCH, SNAPSHOT_COUNTS, SNAPSHOT_HEADER, SNAPSHOT_MAGIC, SNAPSHOT_SUFFIX,
+                   SQLITE_EXTENSIONS, STATEMENT_DATE_COLUMNS, STATEMENT_DESCRIPTION_COLUMNS, DateParser,
+                   ExpenseStore, IncomeStore, Money, merge_date_summaries, optional_module, parse_cents, parse_date,
+                   warn_dates)
+
+def iter_csv_records(filename):
+    """Lazily yield ('Expense', record) and ('Income', record) pairs from a CSV file.
+    
+    Expense rows with a Frequency are recurring rules and come out as
+    ('Recurring', rule). Rows come from the CSV as last written in full;
+    edits still pending in its journal are applied by read_csv_file.
+    """
+    due_dates = DateParser()
+    balance_dates = DateParser()
+    
+    with _open_ledger_text(filename) as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            if row['Type'] == 'Expense' and row.get('Frequency'):
+                yield 'Recurring', {
+                    'Payee': row['Payee'],
+                    'Amount': Money.parse(row['Amount']) if row['Amount'] else None,
+                    'Frequency': row['Frequency'],
+                    'Due Date': due_dates.parse(row['Due Date'])
+                }
+            elif row['Type'] == 'Expense':
+                yield 'Expense', {
+                    'Payee': row['Payee'],
+                    'Amount': Money.parse(row['Amount']),
+                    'Due Date': due_dates.parse(row['Due Date'])
+                }
+            elif row['Type'] == 'Income':
+                yield 'Income', {
+                    'Bank': row['Bank'],
+                    'Amount': Money.parse(row['Amount']),
+                    'Balance Date': balance_dates.parse(row['Balance Date'])
+                }
+    
+    due_dates.warn_ambiguous('Due Date')
+    balance_dates.warn_ambiguous('Balance Date')
+
+def _load_ledger(filename, fmt):
+    """Parse a ledger file in any export format into (ExpenseStore, IncomeStore)."""
+    if fmt == 'parquet':
+        return _read_parquet(filename)
+    if fmt == 'columns':
+        return _read_columns(filename)
+    expenses = ExpenseStore()
+    income = IncomeStore()
+    for record_type, record in iter_csv_records(filename):
+        if record_type == 'Expense':
+            expenses.append(record)
+        elif record_type == 'Recurring':
+            expenses.add_recurring(record['Payee'], record['Amount'], record['Frequency'], record['Due Date'])
+        else:
+            income.append(record)
+    return expenses, income
+
+def read_csv_file(filename, use_snapshot=True):
+    """Read expense and income data from CSV file.
+    
+    Gzipped CSV, Parquet and .cols exports are recognized by their
+    content and read too. With use_snapshot, a valid binary snapshot next
+    to a CSV is loaded instead of parsing it, and a fresh one is written
+    after parsing; the columnar formats load as fast without one.
+    """
+    try:
+        fmt = ledger_format(filename)
+        use_snapshot = use_snapshot and fmt in ('csv', 'csv.gz')
+        loaded = load_snapshot(filename) if use_snapshot else None
+        if loaded is not None:
+            expenses, income = loaded
+        else:
+            expenses, income = _load_ledger(filename, fmt)
+            if use_snapshot:
+                write_snapshot(filename, expenses, income)
+        LedgerJournal(filename).replay(expenses, income)
+        return expenses, income
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+        return None, None
+    except Exception as e:
+        print(f"Error reading file: {e}")
+        return None, None
+
+def _csv_fingerprint(filename, with_hash=True):
+    """Return (size, mtime_ns, blake2b digest or None) for a CSV file."""
+    stat = os.stat(filename)
+    digest = None
+    if with_hash:
+        import hashlib
+        hasher = hashlib.blake2b(digest_size=32)
+        with open(filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                hasher.update(chunk)
+        digest = hasher.digest()
+    return stat.st_size, stat.st_mtime_ns, digest
+
+def _snapshot_layout():
+    """Item sizes of the store columns, recorded so other platforms rebuild."""
+    return bytes([array('q').itemsize, array('i').itemsize, array('I').itemsize,
+                  sys.byteorder == 'little'])
+
+def _store_sections(expenses, income):
+    """Return the byte sections of the stores as snapshots and .cols files hold them.
+    
+    First each store's row/name counts, then per store its cents, ordinal
+    and name ID columns and NUL-separated name table, then any recurring
+    rules as JSON.
+    """
+    counts = bytearray()
+    sections = [counts]
+    for store in (expenses, income):
+        names = '\0'.join(store.names).encode('utf-8')
+        counts += SNAPSHOT_COUNTS.pack(len(store), len(store.names), len(names))
+        sections.extend([store.cents.tobytes(), store.ordinals.tobytes(), store.name_ids.tobytes(), names])
+    if expenses.recurring:
+        # Rules are few, so they trail the columns as JSON
+        sections.append(json.dumps([
+            [rule['Payee'], None if rule['Amount'] is None else int(rule['Amount']),
+             rule['Frequency'], rule['Due Date'].date().isoformat()]
+            for rule in expenses.recurring]).encode('utf-8'))
+    return sections
+
+def _read_store_sections(data, offset, byteswap=False):
+    """Rebuild (ExpenseStore, IncomeStore) from _store_sections bytes starting at offset."""
+    counts = []
+    for _ in range(2):
+        counts.append(SNAPSHOT_COUNTS.unpack_from(data, offset))
+        offset += SNAPSHOT_COUNTS.size
+    stores = []
+    for store_class, (rows, _, names_length) in zip((ExpenseStore, IncomeStore), counts):
+        columns = []
+        for typecode in ('q', 'i', 'I'):
+            column = array(typecode)
+            end = offset + rows * column.itemsize
+            column.frombytes(data[offset:end])
+            if byteswap:
+                column.byteswap()
+            columns.append(column)
+            offset = end
+        names = data[offset:offset + names_length].decode('utf-8').split('\0')
+        offset += names_length
+        cents, ordinals, name_ids = columns
+        stores.append(store_class.from_columns(names, name_ids, cents, ordinals))
+    if offset < len(data):
+        for payee, cents, frequency, first_due in json.loads(data[offset:].decode('utf-8')):
+            amount = None if cents is None else Money(cents)
+            stores[0].add_recurring(payee, amount, frequency, datetime.fromisoformat(first_due))
+    return tuple(stores)
+
+def write_snapshot(filename, expenses, income):
+    """Write the binary snapshot for a CSV; failures only cost the cache."""
+    try:
+        size, mtime_ns, digest = _csv_fingerprint(filename)
+        sections = _store_sections(expenses, income)
+        
+        def write(f):
+            f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, _snapshot_layout(), size, mtime_ns, digest))
+            for section in sections:
+                f.write(section)
+        
+        _replace_atomically(filename + SNAPSHOT_SUFFIX, write, binary=True)
+    except OSError:
+        pass
+
+def load_snapshot(filename):
+    """Return (ExpenseStore, IncomeStore) from a valid snapshot, or None.
+    
+    The snapshot is valid when the CSV's size matches and either its mtime
+    also matches or its content hash does (e.g. after a touch). Columns
+    are copied straight out of the memory-mapped file, followed by any
+    recurring rules.
+    """
+    try:
+        with open(filename + SNAPSHOT_SUFFIX, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            magic, layout, size, mtime_ns, digest = SNAPSHOT_HEADER.unpack_from(mapped, 0)
+            if magic != SNAPSHOT_MAGIC or layout != _snapshot_layout():
+                return None
+            csv_size, csv_mtime_ns, _ = _csv_fingerprint(filename, with_hash=False)
+            if csv_size != size:
+                return None
+            touched = csv_mtime_ns != mtime_ns
+            if touched and _csv_fingerprint(filename)[2] != digest:
+                return None
+            
+            stores = _read_store_sections(mapped, SNAPSHOT_HEADER.size)
+    except (OSError, ValueError, struct.error):
+        return None
+    
+    # Same content under a new mtime: record it so the next load skips hashing
+    if touched:
+        write_snapshot(filename, *stores)
+    return stores
+
+def ledger_format(filename):
+    """Return 'csv', 'csv.gz', 'columns' or 'parquet' for an existing ledger file, from its first bytes."""
+    with open(filename, 'rb') as f:
+        head = f.read(len(COLUMNS_MAGIC))
+    if head.startswith(PARQUET_MAGIC):
+        return 'parquet'
+    if head == COLUMNS_MAGIC:
+        return 'columns'
+    if head.startswith(b'\x1f\x8b'):
+        return 'csv.gz'
+    return 'csv'
+
+def _save_format(filename):
+    """The format save_to_csv writes for a file name; Parquet needs pyarrow."""
+    name = filename.lower()
+    if name.endswith(GZIP_EXTENSION):
+        return 'csv.gz'
+    if name.endswith(COLUMNS_EXTENSION):
+        return 'columns'
+    if name.endswith(PARQUET_EXTENSION):
+        if optional_module('pyarrow.parquet') is None:
+            print(f"Note: pyarrow is not installed, so '{filename}' is written in the built-in columnar format")
+            return 'columns'
+        return 'parquet'
+    return 'csv'
+
+def _open_ledger_text(filename):
+    """Open a CSV ledger for reading as text, decompressing it if it is gzipped."""
+    if ledger_format(filename) == 'csv.gz':
+        import gzip
+        return gzip.open(filename, 'rt', encoding='utf-8', newline='')
+    return open(filename, 'r', newline='')
+
+def _write_columns(f, expenses, income):
+    """Write the built-in columnar format: magic and column layout, then the store sections."""
+    f.write(COLUMNS_HEADER.pack(COLUMNS_MAGIC, _snapshot_layout()))
+    for section in _store_sections(expenses, income):
+        f.write(section)
+
+def _read_columns(filename):
+    """Read a .cols file into (ExpenseStore, IncomeStore)."""
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        magic, layout = COLUMNS_HEADER.unpack_from(mapped, 0)
+        native = _snapshot_layout()
+        if magic != COLUMNS_MAGIC or layout[:3] != native[:3]:
+            raise ValueError(f"'{filename}' was written with an incompatible column layout")
+        return _read_store_sections(mapped, COLUMNS_HEADER.size, byteswap=layout[3] != native[3])
+
+def _arrow_buffer(values, typecode):
+    """Copy a null-free fixed-width Arrow array into an array of typecode."""
+    column = array(typecode)
+    if len(values):
+        start = values.offset * column.itemsize
+        column.frombytes(memoryview(values.buffers()[1])[start:start + len(values) * column.itemsize])
+    return column
+
+def _pyarrow():
+    """The pyarrow modules the Parquet reader and writer use, imported on first use."""
+    return (optional_module('pyarrow'), optional_module('pyarrow.compute'),
+            optional_module('pyarrow.parquet'))
+
+def _write_parquet(f, expenses, income):
+    """Write the ledger as one Parquet table with the CSV's rows and column order.
+    
+    Columns are Type, Name, Amount (cents), Date and Frequency (set on
+    recurring rules only). The store columns go to Arrow without a
+    per-row Python loop.
+    """
+    pa, pc, pq = _pyarrow()
+    epoch = date(1970, 1, 1).toordinal()
+    parts = []
+    
+    def add_rows(store):
+        count = len(store)
+        name_ids = pa.Array.from_buffers(pa.uint32(), count, [None, pa.py_buffer(store.name_ids)])
+        ordinals = pa.Array.from_buffers(pa.int32(), count, [None, pa.py_buffer(store.ordinals)])
+        parts.append({
+            'Type': pa.repeat(store.RECORD_TYPE, count),
+            'Name': pa.DictionaryArray.from_arrays(name_ids, pa.array(store.names, pa.string())).dictionary_decode(),
+            'Amount': pa.Array.from_buffers(pa.int64(), count, [None, pa.py_buffer(store.cents)]),
+            'Date': pc.subtract(ordinals, pa.scalar(epoch, pa.int32())).view(pa.date32()),
+            'Frequency': pa.nulls(count, pa.string()),
+        })
+    
+    add_rows(expenses)
+    rules = expenses.recurring
+    parts.append({
+        'Type': pa.repeat('Expense', len(rules)),
+        'Name': pa.array([rule['Payee'] for rule in rules], pa.string()),
+        'Amount': pa.array([None if rule['Amount'] is None else int(rule['Amount']) for rule in rules], pa.int64()),
+        'Date': pa.array([rule['Due Date'].date() for rule in rules], pa.date32()),
+        'Frequency': pa.array([rule['Frequency'] for rule in rules], pa.string()),
+    })
+    add_rows(income)
+    table = pa.table({column: pa.concat_arrays([part[column] for part in parts]) for column in parts[0]})
+    pq.write_table(table, f)
+
+def _read_parquet(filename):
+    """Read a Parquet ledger written by _write_parquet into (ExpenseStore, IncomeStore)."""
+    if optional_module('pyarrow.parquet') is None:
+        raise ValueError(f"reading '{filename}' needs pyarrow, which is not installed")
+    pa, pc, pq = _pyarrow()
+    epoch = date(1970, 1, 1).toordinal()
+    table = pq.read_table(filename, columns=['Type', 'Name', 'Amount', 'Date', 'Frequency'])
+    is_rule = pc.is_valid(table['Frequency'])
+    expenses, income = ExpenseStore(), IncomeStore()
+    rows = table.filter(pc.invert(is_rule))
+    for store in (expenses, income):
+        part = rows.filter(pc.equal(rows['Type'], store.RECORD_TYPE))
+        names = part['Name'].combine_chunks().dictionary_encode()
+        # Map the file's name table onto the store's, which starts with its defaults
+        remap = pa.array([store.intern(name) for name in names.dictionary.to_pylist()], pa.uint32())
+        days = pc.add(part['Date'].combine_chunks().view(pa.int32()), pa.scalar(epoch, pa.int32()))
+        store.extend_columns(_arrow_buffer(pc.take(remap, names.indices), 'I'),
+                             _arrow_buffer(part['Amount'].combine_chunks(), 'q'),
+                             _arrow_buffer(days, 'i'))
+    for payee, cents, first_due, frequency in zip(*(table.filter(is_rule)[column].to_pylist()
+                                                   for column in ('Name', 'Amount', 'Date', 'Frequency'))):
+        amount = None if cents is None else Money(cents)
+        expenses.add_recurring(payee, amount, frequency, datetime.combine(first_due, datetime.min.time()))
+    return expenses, income
+
+def _expand_sources(sources):
+    """Turn a glob pattern or a list of paths/patterns into a sorted file list."""
+    if isinstance(sources, (str, os.PathLike)):
+        sources = [sources]
+    filenames = []
+    for source in map(str, sources):
+        matches = sorted(glob.glob(source)) if glob.has_magic(source) else [source]
+        filenames.extend(matches)
+    return filenames
+
+def _plan_chunks(filename, chunk_bytes):
+    """Split a CSV into (filename, start, end) byte ranges that end on line boundaries.
+    
+    Rows must not contain quoted newlines, which holds for ledgers written
+    by save_to_csv and for typical bank exports. Compressed and columnar
+    files are one (filename, 0, None) chunk, read whole.
+    """
+    if ledger_format(filename) != 'csv':
+        return [(filename, 0, None)]
+    size = os.path.getsize(filename)
+    with open(filename, 'rb') as f:
+        f.readline()  # header
+        start = f.tell()
+        chunks = []
+        while start < size:
+            end = start + chunk_bytes
+            if end < size:
+                f.seek(end)
+                f.readline()
+                end = f.tell()
+            else:
+                end = size
+            chunks.append((filename, start, end))
+            start = end
+    return chunks
+
+def _sample_date_formats(filename, sample_bytes=INGEST_DATE_SAMPLE_BYTES):
+    """{record type: date format} detected from the first rows of a ledger CSV.
+    
+    Reads at most sample_bytes, stopping once both date columns have
+    fixed their format; a column with only ISO dates so far is left out.
+    """
+    if ledger_format(filename) != 'csv':
+        return {}
+    with open(filename, 'rb') as f:
+        sample = f.read(sample_bytes)
+    if len(sample) == sample_bytes:
+        sample = sample[:sample.rfind(b'\n') + 1]  # drop the cut-off last row
+    reader = csv.reader(StringIO(sample.decode('utf-8-sig', errors='replace'), newline=''))
+    columns = {name: i for i, name in enumerate(next(reader, []))}
+    type_col = columns.get('Type')
+    layouts = {'Expense': columns.get('Due Date'), 'Income': columns.get('Balance Date')}
+    parsers = {record_type: DateParser() for record_type in layouts}
+    for row in reader:
+        if all(parser.fmt for parser in parsers.values()):
+            break
+        record_type = row[type_col] if type_col is not None and type_col < len(row) else None
+        date_col = layouts.get(record_type)
+        if date_col is not None and date_col < len(row):
+            with suppress(ValueError):
+                parsers[record_type].parse(row[date_col])
+    return {record_type: parser.fmt for record_type, parser in parsers.items() if parser.fmt}
+
+def _parse_csv_chunk(chunk, formats=None):
+    """Parse one byte range of a ledger CSV into compact columns (worker process).
+    
+    Returns {'Expense': (names, name_ids, cents, ordinals), 'Income': ...}
+    with name IDs local to this chunk, plus 'Recurring': a list of
+    (payee, amount or None, frequency, first due ordinal) rules and
+    'Dates': {record type: DateParser.summary()} for its date column.
+    formats maps a record type to a date format already detected for the
+    file, which the chunk then keeps to.
+    """
+    filename, start, end = chunk
+    formats = formats or {}
+    if end is None:
+        # Read whole, which warns about its dates itself
+        stores = _load_ledger(filename, ledger_format(filename))
+        result = {store.RECORD_TYPE: (store.names, store.name_ids, store.cents, store.ordinals) for store in stores}
+        result['Recurring'] = [(rule['Payee'], rule['Amount'], rule['Frequency'], rule['Due Date'].toordinal())
+                               for rule in stores[0].recurring]
+        result['Dates'] = {}
+        return result
+    with open(filename, 'rb') as f:
+        header = next(csv.reader([f.readline().decode('utf-8-sig')]))
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+    columns = {name: i for i, name in enumerate(header)}
+    type_col, amount_col = columns['Type'], columns['Amount']
+    frequency_col = columns.get('Frequency')
+    layouts = {
+        'Expense': (columns['Payee'], columns['Due Date'], DateParser(fmt=formats.get('Expense'))),
+        'Income': (columns['Bank'], columns['Balance Date'], DateParser(fmt=formats.get('Income'))),
+    }
+    parsed = {record_type: ([], {}, array('I'), array('q'), array('i')) for record_type in layouts}
+    rules = []
+    for row in csv.reader(StringIO(text, newline='')):
+        if not row or row[type_col] not in layouts:
+            continue
+        name_col, date_col, dates = layouts[row[type_col]]
+        if frequency_col is not None and row[frequency_col] and row[type_col] == 'Expense':
+            amount = Money.parse(row[amount_col]) if row[amount_col] else None
+            rules.append((row[name_col], amount, row[frequency_col], dates.parse(row[date_col]).toordinal()))
+            continue
+        names, lookup, name_ids, cents, ordinals = parsed[row[type_col]]
+        name = row[name_col]
+        name_id = lookup.get(name)
+        if name_id is None:
+            name_id = lookup[name] = len(names)
+            names.append(name)
+        name_ids.append(name_id)
+        cents.append(parse_cents(row[amount_col]))
+        ordinals.append(dates.parse(row[date_col]).toordinal())
+    result = {record_type: (names, name_ids, cents, ordinals)
+              for record_type, (names, _, name_ids, cents, ordinals) in parsed.items()}
+    result['Recurring'] = rules
+    result['Dates'] = {record_type: dates.summary() for record_type, (_, _, dates) in layouts.items()}
+    return result
+
+def _warn_file_dates(filename, summaries):
+    """Print the date warnings for one ingested file."""
+    for record_type, column in (('Expense', 'Due Date'), ('Income', 'Balance Date')):
+        if record_type in summaries:
+            warn_dates(f"'{column}' of '{filename}'", summaries[record_type])
+
+def ingest_files(sources, jobs=None, chunk_bytes=INGEST_CHUNK_BYTES):
+    """Load several ledger CSVs in parallel and merge them into one ledger.
+    
+    sources is a glob pattern or a list of paths/patterns. Files larger than
+    chunk_bytes are split on line boundaries so one big statement also
+    spreads across the worker processes. A row whose (name, amount, date)
+    already came from an earlier file is dropped as a duplicate; repeats
+    within one file are kept, since those are separate charges.
+    
+    A date column's format is detected once per file, from its first
+    INGEST_DATE_SAMPLE_BYTES, and every chunk reads with it, as if the file
+    were read in one go. When the sample holds only ISO dates, the first
+    chunk to detect a format sets it, and a later chunk that settled on
+    another one is parsed again with it. Ambiguous and mismatched dates are
+    warned about once per file.
+    
+    Returns (ExpenseStore, IncomeStore, duplicates removed), or
+    (None, None, 0) on error.
+    """
+    filenames = _expand_sources(sources)
+    if not filenames:
+        print(f"Error: No files match {sources!r}.")
+        return None, None, 0
+    
+    try:
+        chunks, chunk_formats = [], []
+        for filename in filenames:
+            file_chunks = _plan_chunks(filename, chunk_bytes)
+            formats = _sample_date_formats(filename) if len(file_chunks) > 1 else {}
+            chunks.extend(file_chunks)
+            chunk_formats.extend([formats] * len(file_chunks))
+        jobs = jobs or os.cpu_count() or 1
+        if jobs == 1 or len(chunks) <= 1:
+            parsed_chunks = map(_parse_csv_chunk, chunks, chunk_formats)
+            executor = None
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=jobs)
+            parsed_chunks = executor.map(_parse_csv_chunk, chunks, chunk_formats)
+        
+        stores = {'Expense': ExpenseStore(), 'Income': IncomeStore()}
+        seen_rules = set()
+        seen = {record_type: set() for record_type in stores}
+        file_keys = {record_type: set() for record_type in stores}
+        duplicates = 0
+        current_file = None
+        file_dates = {}
+        try:
+            for chunk, parsed in zip(chunks, parsed_chunks):
+                filename = chunk[0]
+                if filename != current_file:
+                    # Rows only count as duplicates against earlier files
+                    for record_type in stores:
+                        seen[record_type] |= file_keys[record_type]
+                        file_keys[record_type] = set()
+                    if current_file is not None:
+                        _warn_file_dates(current_file, file_dates)
+                    current_file = filename
+                    file_dates = {}
+                formats = {record_type: summary[0] for record_type, summary in file_dates.items() if summary[0]}
+                if any(summary[0] and formats.get(record_type, summary[0]) != summary[0]
+                       for record_type, summary in parsed['Dates'].items()):
+                    parsed = _parse_csv_chunk(chunk, formats)
+                for record_type, summary in parsed.pop('Dates').items():
+                    file_dates[record_type] = merge_date_summaries(file_dates.get(record_type), summary)
+                for rule in parsed.pop('Recurring'):
+                    # The same rule in several statements is one rule
+                    if rule not in seen_rules:
+                        seen_rules.add(rule)
+                        payee, amount, frequency, ordinal = rule
+                        stores['Expense'].add_recurring(payee, amount, frequency, datetime.fromordinal(ordinal))
+                for record_type, (names, name_ids, cents, ordinals) in parsed.items():
+                    store, earlier, keys = stores[record_type], seen[record_type], file_keys[record_type]
+                    remap = [store.intern(name) for name in names]
+                    kept_ids, kept_cents, kept_ordinals = array('I'), array('q'), array('i')
+                    for local_id, amount, ordinal in zip(name_ids, cents, ordinals):
+                        name_id = remap[local_id]
+                        key = (name_id, amount, ordinal)
+                        if key in earlier:
+                            duplicates += 1
+                            continue
+                        keys.add(key)
+                        kept_ids.append(name_id)
+                        kept_cents.append(amount)
+                        kept_ordinals.append(ordinal)
+                    store.extend_columns(kept_ids, kept_cents, kept_ordinals)
+            if current_file is not None:
+                _warn_file_dates(current_file, file_dates)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return stores['Expense'], stores['Income'], duplicates
+    except FileNotFoundError as e:
+        print(f"Error: File '{e.filename}' not found.")
+        return None, None, 0
+    except Exception as e:
+        print(f"Error reading file: {e}")
+        return None, None, 0
+
+@lru_cache(maxsize=None)
+def _umask():
+    """The process umask; reading it means setting it, so do that once."""
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+def _replace_atomically(filename, write, binary=False):
+    """Write a file via a temp file in the same directory and rename it into place.
+    
+    write(f) receives the open temp file. A crash part-way leaves the old
+    file untouched. The file keeps the old file's permissions, or gets the
+    usual ones for a new file rather than mkstemp's owner-only 0600.
+    """
+    import tempfile
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(filename)}.", suffix='.tmp')
+    try:
+        with (os.fdopen(fd, 'wb') if binary else os.fdopen(fd, 'w', newline='')) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            mode = stat.S_IMODE(os.stat(filename).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_umask()
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, filename)
+    except BaseException:
+        with suppress(OSError):
+            os.unlink(temp_path)
+        raise
+
+def _write_ledger_csv(f, expenses, income):
+    """Write the ledger CSV layout, SAVE_WRITE_BATCH lines per write.
+    
+    Each name's leading fields and each date's trailing fields are
+    formatted once and amounts come straight from the cents column, so
+    rows need no dicts or strftime calls; one line buffer is reused.
+    """
+    recurring = expenses.recurring
+    fieldnames = ['Type', 'Payee', 'Bank', 'Amount', 'Due Date', 'Balance Date']
+    if recurring:
+        fieldnames.append('Frequency')
+    writer = csv.writer(f)
+    writer.writerow(fieldnames)
+    frequency = ',' if recurring else ''
+    quoted = StringIO()
+    quoter = csv.writer(quoted)
+    
+    def field(text):
+        # Quote a mid-row field exactly as the csv module would
+        quoted.seek(0)
+        quoted.truncate()
+        quoter.writerow([text, ''])
+        return quoted.getvalue()[:-3]
+    
+    buffer = []
+    
+    def write_rows(store, prefix, suffix):
+        prefixes = [prefix.format(field(name)) for name in store.names]
+        suffixes = {}
+        for name_id, cents, ordinal in zip(store.name_ids, store.cents, store.ordinals):
+            tail = suffixes.get(ordinal)
+            if tail is None:
+                tail = suffixes[ordinal] = suffix.format(date.fromordinal(ordinal).isoformat(), frequency)
+            whole, fraction = divmod(-cents if cents < 0 else cents, 100)
+            buffer.append(f"{prefixes[name_id]}{'-' if cents < 0 else ''}{whole}.{fraction:02d}{tail}")
+            if len(buffer) >= SAVE_WRITE_BATCH:
+                f.write(''.join(buffer))
+                buffer.clear()
+        f.write(''.join(buffer))
+        buffer.clear()
+    
+    write_rows(expenses, 'Expense,{},,', ',{},{}\r\n')
+    for rule in recurring:
+        writer.writerow([
+            'Expense', rule['Payee'], '',
+            '' if rule['Amount'] is None else Money.of(rule['Amount']),
+            rule['Due Date'].strftime('%Y-%m-%d'), '', rule['Frequency']
+        ])
+    write_rows(income, 'Income,,{},', ',,{}{}\r\n')
+
+def save_to_csv(expenses, income, filename=DEFAULT_CSV_FILENAME):
+    """Save expense and income data to CSV file.
+    
+    The Frequency column is only written when there are recurring rules, so
+    ledgers without them keep the original layout. A name ending in .gz
+    writes gzip-compressed CSV, .parquet a Parquet file (when pyarrow is
+    installed) and .cols the built-in columnar format; read_csv_file reads
+    them all back.
+    """
+    if not isinstance(expenses, ExpenseStore):
+        expenses = ExpenseStore(expenses)
+    if not isinstance(income, IncomeStore):
+        income = IncomeStore(income)
+    fmt = _save_format(filename)
+    
+    def write(f):
+        if fmt == 'parquet':
+            _write_parquet(f, expenses, income)
+        elif fmt == 'columns':
+            _write_columns(f, expenses, income)
+        elif fmt == 'csv.gz':
+            import gzip
+            # mtime=0 keeps the bytes the same for the same ledger
+            with TextIOWrapper(gzip.GzipFile(fileobj=f, mode='wb', compresslevel=GZIP_LEVEL, mtime=0),
+                               encoding='utf-8', newline='') as text:
+                _write_ledger_csv(text, expenses, income)
+        else:
+            _write_ledger_csv(f, expenses, income)
+    
+    _replace_atomically(filename, write, binary=fmt != 'csv')
+    
+    # The CSV now holds every edit, so any journal next to it starts over
+    journal = LedgerJournal(filename)
+    if os.path.exists(journal.path):
+        journal.reset()
+    
+    # The stores match the new file exactly, so cache them for the next load
+    if fmt in ('csv', 'csv.gz'):
+        write_snapshot(filename, expenses, income)
+    
+    print(f"\nData saved to '{filename}'")
+
+class LedgerJournal:
+    """Append-only log of edits made since a CSV was last written in full.
+    
+    Lives next to the CSV as '<filename>.journal'. The first line records
+    the CSV's size and mtime; a journal whose marker no longer matches
+    (the CSV was rewritten or edited elsewhere) is ignored. Each later line
+    is one change: 'put' and 'ins' rows carry the row's full new state,
+    'del' rows the removed position; 'put-rule', 'ins-rule' and 'del-rule'
+    do the same for recurring expense rules.
+    """
+    
+    def __init__(self, filename):
+        self.filename = filename
+        self.path = filename + JOURNAL_SUFFIX
+        self.op_count = 0
+        self._file = None
+        self._writer = None
+        self._attach_offset = 0
+        self._attach_count = 0
+        self._stores = ()
+    
+    def _base_marker(self):
+        stat = os.stat(self.filename)
+        return ['#base', str(stat.st_size), str(stat.st_mtime_ns)]
+    
+    def _read_ops(self, warn=True):
+        """Return the journaled ops, or None if there is no valid journal."""
+        try:
+            with open(self.path, newline='') as f:
+                rows = list(csv.reader(f))
+        except FileNotFoundError:
+            return None
+        if not rows or rows[0] != self._base_marker():
+            if warn:
+                print(f"Warning: ignoring out-of-date journal '{self.path}'")
+            return None
+        return rows[1:]
+    
+    def replay(self, expenses, income):
+        """Apply journaled edits to stores freshly loaded from the CSV."""
+        ops = self._read_ops()
+        if ops is None:
+            return 0
+        stores = {'Expense': expenses, 'Income': income}
+        applied = 0
+        for op in ops:
+            try:
+                # Parse the whole line before changing anything, so a torn line is not half applied
+                store, index = stores[op[0]], int(op[2])
+                if op[1] in ('put-rule', 'ins-rule'):
+                    rule = {'Payee': op[3], 'Amount': Money.parse(op[4]) if op[4] else None, 'Frequency': op[6],
+                            'Due Date': parse_date(op[5])}
+                    if op[1] == 'put-rule':
+                        store.add_recurring(rule['Payee'], rule['Amount'], rule['Frequency'], rule['Due Date'])
+                    else:
+                        store.insert_recurring(index, rule)
+                elif op[1] == 'del-rule':
+                    store.remove_recurring(index)
+                elif op[1] == 'del':
+                    store.pop(index)
+                else:
+                    name, cents, ordinal = op[3], int(op[4]), parse_date(op[5]).toordinal()
+                    if op[1] == 'ins':
+                        store.insert_row(index, name, cents, ordinal)
+                    elif index == len(store):
+                        store.add_row(name, cents, ordinal)
+                    else:
+                        store.set_name(index, name)
+                        store.set_cents(index, cents)
+                        store.set_ordinal(index, ordinal)
+            except (KeyError, IndexError, ValueError):
+                # A crash mid-append can leave a partial last line
+                print(f"Warning: journal '{self.path}' is truncated after {applied} edit(s)")
+                break
+            applied += 1
+        self.op_count = applied
+        return applied
+    
+    def attach(self, expenses, income):
+        """Journal every later edit to these stores."""
+        ops = self._read_ops(warn=False)
+        if ops is None:
+            self.reset()
+        else:
+            self.op_count = len(ops)
+        self._file = open(self.path, 'a', newline='')
+        self._writer = csv.writer(self._file)
+        self._attach_offset = self._file.tell()
+        self._attach_count = self.op_count
+        self._stores = (expenses, income)
+        for store in self._stores:
+            store.listeners.append(self.record)
+    
+    def record(self, store, op, index):
+        """Store listener: append one change and flush it to disk."""
+        if op in ('del', 'del-rule'):
+            self._writer.writerow([store.RECORD_TYPE, op, index])
+        elif op in ('put-rule', 'ins-rule'):
+            rule = store.recurring[index]
+            self._writer.writerow([
+                store.RECORD_TYPE, op, index,
+                rule['Payee'],
+                '' if rule['Amount'] is None else Money.of(rule['Amount']),
+                rule['Due Date'].date().isoformat(),
+                rule['Frequency']
+            ])
+        else:
+            self._writer.writerow([
+                store.RECORD_TYPE, op, index,
+                store.names[store.name_ids[index]],
+                store.cents[index],
+                date.fromordinal(store.ordinals[index]).isoformat()
+            ])
+        self._file.flush()
+        self.op_count += 1
+    
+    def reset(self):
+        """Start an empty journal for the CSV as it is now."""
+        marker = self._base_marker()
+        _replace_atomically(self.path, lambda f: csv.writer(f).writerow(marker))
+        self.op_count = 0
+    
+    def rollback(self):
+        """Drop the edits journaled since attach() and stop journaling."""
+        if self._file is not None:
+            self._file.truncate(self._attach_offset)
+            self.op_count = self._attach_count
+        self.close()
+    
+    def close(self):
+        """Stop journaling; edits already written stay in the journal."""
+        for store in self._stores:
+            store.listeners.remove(self.record)
+        self._stores = ()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def save_ledger(expenses, income, filename=DEFAULT_CSV_FILENAME, journal=None):
+    """Persist edits, rewriting the CSV only when the journal cannot cover them.
+    
+    If a journal attached to this file already holds the edits, saving
+    costs nothing more. Once it grows past JOURNAL_COMPACT_THRESHOLD
+    edits, or when there is no journal for this file, the CSV is rewritten
+    in full, which also empties the journal.
+    """
+    if journal is not None:
+        journal.close()
+        if journal.filename == filename and journal.op_count < JOURNAL_COMPACT_THRESHOLD:
+            print(f"\nData saved to '{filename}' ({journal.op_count} edit(s) in '{journal.path}')")
+            return
+    save_to_csv(expenses, income, filename)
+
+def write_audit_log(filename, entries):
+    """Append EditHistory audit entries to '<filename>.audit.csv', with a header if it is new."""
+    if not entries:
+        return
+    path = filename + AUDIT_SUFFIX
+    is_new = not os.path.exists(path)
+    with open(path, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=AUDIT_FIELDS)
+        if is_new:
+            writer.writeheader()
+        writer.writerows(entries)
+
+class CSVStorage:
+    """Ledger kept in a CSV file (the default storage)."""
+    
+    def __init__(self, filename):
+        self.filename = filename
+    
+    def load(self):
+        """Return (ExpenseStore, IncomeStore), or (None, None) on error."""
+        return read_csv_file(self.filename)
+    
+    def save(self, expenses, income):
+        """Rewrite the CSV with the given data."""
+        save_to_csv(expenses, income, self.filename)
+    
+    def calculate_transfer(self, as_of=None, margin=None):
+        """Load the ledger and run calculate_transfer on it."""
+        expenses, income = self.load()
+        return calculate_transfer(expenses, income, as_of=as_of, margin=margin)
+    
+    def close(self):
+        pass
+
+def open_storage(filename):
+    """Return the storage for a ledger file: SQLite for .db/.sqlite/.sqlite3, CSV otherwise."""
+    if os.path.splitext(filename)[1].lower() in SQLITE_EXTENSIONS:
+        from .sqlite_storage import SQLiteStorage
+        return SQLiteStorage(filename)
+    return CSVStorage(filename)
+
+def _statement_cents(text):
+    """Parse a bank export amount such as '$1,250.00', '-12.5' or '(12.50)' into cents."""
+    text = text.strip().replace('$', '')
+    if text[:1] == '(' and text[-1:] == ')':
+        return -parse_cents(text[1:-1])
+    return parse_cents(text)
+
+def _statement_column(header, candidates):
+    """Position of the first candidate column in a lowercased header row, or None."""
+    for candidate in candidates:
+        if candidate in header:
+            return header.index(candidate)
+    return None
+
+def _read_statement_csv(f, filename):
+    """Yield (ordinal, signed cents, description) from a bank CSV export."""
+    reader = csv.reader(f)
+    header = [column.strip().lower() for column in next(reader, [])]
+    date_col = _statement_column(header, STATEMENT_DATE_COLUMNS)
+    description_col = _statement_column(header, STATEMENT_DESCRIPTION_COLUMNS)
+    amount_col = _statement_column(header, ('amount',))
+    debit_col = _statement_column(header, ('debit', 'withdrawal', 'withdrawals'))
+    if date_col is None or description_col is None or (amount_col is None and debit_col is None):
+        raise ValueError(f"'{filename}' needs date, description and amount or debit columns")
+    
+    parser = DateParser()
+    for line_num, row in enumerate(reader, start=2):
+        if not any(field.strip() for field in row):
+            continue
+        try:
+            if debit_col is not None and debit_col < len(row) and row[debit_col].strip():
+                # Debit columns hold payments as positive amounts
+                cents = -abs(_statement_cents(row[debit_col]))
+            elif amount_col is not None:
+                cents = _statement_cents(row[amount_col])
+            else:
+                continue
+            ordinal = parser.parse(row[date_col].strip()).toordinal()
+        except (ValueError, IndexError) as e:
+            print(f"Warning: Skipping statement line {line_num} in '{filename}': {e}")
+            continue
+        yield ordinal, cents, row[description_col].strip()
+    parser.warn_ambiguous('Date')
+
+def _read_statement_ofx(text, filename):
+    """Yield (ordinal, signed cents, description) from OFX <STMTTRN> blocks.
+    
+    Tags are read as SGML, so closing tags and line breaks are optional.
+    """
+    fields = None
+    for token in text.split('<')[1:]:
+        tag, _, value = token.partition('>')
+        tag = tag.strip().upper()
+        value = value.strip()
+        if tag == 'STMTTRN':
+            fields = {}
+        elif tag == '/STMTTRN' and fields is not None:
+            try:
+                posted = fields.get('DTPOSTED', '')
+                ordinal = date(int(posted[:4]), int(posted[4:6]), int(posted[6:8])).toordinal()
+                cents = _statement_cents(fields['TRNAMT'])
+            except (KeyError, ValueError) as e:
+                print(f"Warning: Skipping statement transaction in '{filename}': {e}")
+            else:
+                yield ordinal, cents, fields.get('NAME') or fields.get('MEMO', '')
+            fields = None
+        elif fields is not None and tag in ('DTPOSTED', 'TRNAMT', 'NAME', 'MEMO'):
+            fields[tag] = value
+
+def read_bank_statement(filename):
+    """Read the payments from a bank CSV or OFX export.
+    
+    Returns (date ordinal, cents, description) tuples in date order, or
+    None on error. When the export has negative amounts, only those are
+    payments (as positive cents); otherwise every amount is.
+    """
+    try:
+        with open(filename, newline='') as f:
+            text = f.read()
+    except OSError as e:
+        print(f"Error reading statement '{filename}': {e}")
+        return None
+    try:
+        if '<STMTTRN>' in text.upper():
+            rows = list(_read_statement_ofx(text, filename))
+        else:
+            rows = list(_read_statement_csv(StringIO(text), filename))
+    except ValueError as e:
+        print(f"Error reading statement '{filename}': {e}")
+        return None
+    if any(cents < 0 for _, cents, _ in rows):
+        payments = [(ordinal, -cents, description) for ordinal, cents, description in rows if cents < 0]
+    else:
+        payments = rows
+    payments.sort()
+    return payments
+
+def load_payee_aliases(filename):
+    """Read '<ledger>.aliases.json' ({description fragment: payee}) over PAYEE_ALIASES."""
+    aliases = dict(PAYEE_ALIASES)
+    path = filename + ALIASES_SUFFIX
+    try:
+        with open(path) as f:
+            aliases.update((str(fragment), str(payee)) for fragment, payee in json.load(f).items())
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"Warning: ignoring payee aliases '{path}': {e}")
+    return aliases
+
+def load_account_config(filename):
+    """Read '<ledger>.accounts.json': {"payees": {payee: account}, "margins": {account: amount}}.
+    
+    Returns None when there is no such file or it cannot be used.
+    """
+    path = filename + ACCOUNTS_SUFFIX
+    try:
+        with open(path) as f:
+            config = json.load(f)
+        payees = dict(config.get('payees', {}))
+        margins = {account: Money.of(amount) for account, amount in config.get('margins', {}).items()}
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        print(f"Warning: ignoring account settings '{path}': {e}")
+        return None
+    return {'payees': payees, 'margins': margins}
@@ -0,0 +1,938 @@
+"""The interactive program: data menus, tables and printed reports."""
+import glob
+import os
+import sys
+from datetime import date, datetime, timedelta
+from itertools import chain, islice
+
+from .analysis import (_single_transfer_plan, calculate_transfer, cash_flow_timeline, close_paid_expenses,
+                       plan_transfers, reconcile_statement)
+from .core import (DEFAULT_CSV_FILENAME, INCOME_SOURCES, PAYEES, TABLE_PAGE_SIZE, TABLE_WRITE_BATCH,
+                   EditHistory, _LedgerStore, ExpenseStore, IncomeStore, Money)
+from .storage import (CSVStorage, LedgerJournal, ingest_files, load_account_config, load_payee_aliases,
+                      open_storage, read_bank_statement, save_ledger, write_audit_log)
+
+def get_yes_no_input(prompt):
+    """Get yes/no input from user."""
+    while True:
+        response = input(prompt).strip().lower()
+        if response in ['yes', 'y']:
+            return True
+        elif response in ['no', 'n']:
+            return False
+        else:
+            print("Please enter 'yes' or 'no'")
+
+def _peek(records):
+    """Return an iterator over records, or None if there are none."""
+    iterator = iter(records)
+    first = next(iterator, None)
+    if first is None:
+        return None
+    return chain([first], iterator)
+
+class RowFormatCache:
+    """Formatted table lines for a store's rows, kept until a row changes.
+    
+    Registered as a store listener: 'put' drops that row's line, 'ins'
+    opens an empty slot and 'del' removes one, so cached lines stay
+    aligned with row positions.
+    """
+    
+    def __init__(self, store):
+        self.store = store
+        self.lines = [None] * len(store)
+        self._dates = {}
+        store.listeners.append(self.on_change)
+    
+    def on_change(self, store, op, index):
+        if op == 'put':
+            if index < len(self.lines):
+                self.lines[index] = None
+            else:
+                self.lines.extend([None] * (index + 1 - len(self.lines)))
+        elif op == 'ins':
+            self.lines.insert(index, None)
+        elif op == 'del':
+            del self.lines[index]
+    
+    def numbered_lines(self, rows):
+        """Yield '#  name  amount  date' lines for row positions, formatting only misses."""
+        store, lines, dates = self.store, self.lines, self._dates
+        names, name_ids, cents, ordinals = store.names, store.name_ids, store.cents, store.ordinals
+        for row in rows:
+            line = lines[row]
+            if line is None:
+                ordinal = ordinals[row]
+                day = dates.get(ordinal)
+                if day is None:
+                    day = dates[ordinal] = date.fromordinal(ordinal).isoformat()
+                line = lines[row] = f"{names[name_ids[row]]:<25} ${Money(cents[row]):>10.2f} {day:<15}"
+            yield f"{row + 1:<4} {line}"
+
+def _row_format_cache(store):
+    """Return the store's RowFormatCache, creating it on first use."""
+    if store._format_cache is None:
+        store._format_cache = RowFormatCache(store)
+    return store._format_cache
+
+def _record_lines(records, name_key, date_key, name=None, start=None, end=None):
+    """Table lines for plain record dicts, numbered by position and filtered."""
+    for i, record in enumerate(records, 1):
+        if name is not None and record[name_key] != name:
+            continue
+        if (start is not None and record[date_key] < start) or (end is not None and record[date_key] >= end):
+            continue
+        yield f"{i:<4} {record[name_key]:<25} ${record['Amount']:>10.2f} {record[date_key].strftime('%Y-%m-%d'):<15}"
+
+def _write_lines(lines):
+    """Write lines to stdout in large batches rather than one print() per line."""
+    while True:
+        batch = list(islice(lines, TABLE_WRITE_BATCH))
+        if not batch:
+            return
+        sys.stdout.write('\n'.join(batch) + '\n')
+
+def _display_table(records, name_key, date_key, name=None, start=None, end=None, page_size=None):
+    """Shared body of display_expenses and display_income; returns False if nothing matched.
+    
+    Rows keep their full-table numbers when filtered. Ledger stores reuse
+    cached row lines; with page_size the table is shown a page at a time.
+    """
+    if isinstance(records, _LedgerStore):
+        rows = records.rows_matching(
+            name, start and start.toordinal(), end and end.toordinal()).rows
+        total = len(rows)
+        lines = _peek(_row_format_cache(records).numbered_lines(rows))
+    else:
+        total = None
+        lines = _peek(_record_lines(records, name_key, date_key, name, start, end))
+    if lines is None:
+        return False
+    
+    rule = "-" * 70
+    header = ["", rule, f"{'#':<4} {name_key:<25} {'Amount':>12} {date_key:<15}", rule]
+    if page_size is None:
+        _write_lines(chain(header, lines, [rule]))
+        return True
+    shown = 0
+    while lines is not None:
+        page = list(islice(lines, page_size))
+        shown += len(page)
+        sys.stdout.write('\n'.join(header + page + [rule]) + '\n')
+        lines = _peek(lines)
+        if lines is not None:
+            of_total = f" of {total}" if total is not None else ""
+            if input(f"Showing {shown}{of_total}. Press Enter for more, q to stop: ").strip().lower() == 'q':
+                break
+    return True
+
+def display_expenses(expenses, payee=None, start=None, end=None, page_size=None):
+    """Display expenses in a formatted table, optionally filtered by payee and due dates in [start, end)."""
+    if not _display_table(expenses, 'Payee', 'Due Date', payee, start, end, page_size):
+        filtered = payee is not None or start is not None or end is not None
+        print("  No matching expenses." if filtered else "  No expenses to display.")
+
+def display_recurring(expenses):
+    """Display the recurring expense rules in a formatted table."""
+    if not expenses.recurring:
+        print("  No recurring expenses.")
+        return
+    
+    print("\n" + "-" * 70)
+    print(f"{'#':<4} {'Payee':<25} {'Amount':>12} {'Frequency':<10} {'First Due':<12}")
+    print("-" * 70)
+    for i, rule in enumerate(expenses.recurring, 1):
+        amount = 'last known' if rule['Amount'] is None else f"${rule['Amount']:>10.2f}"
+        print(f"{i:<4} {rule['Payee']:<25} {amount:>12} {rule['Frequency']:<10} {rule['Due Date'].strftime('%Y-%m-%d'):<12}")
+    print("-" * 70)
+
+def display_income(income, bank=None, start=None, end=None, page_size=None):
+    """Display income in a formatted table, optionally filtered by bank and balance dates in [start, end)."""
+    if not _display_table(income, 'Bank', 'Balance Date', bank, start, end, page_size):
+        filtered = bank is not None or start is not None or end is not None
+        print("  No matching income." if filtered else "  No income to display.")
+
+def show_rows_for_edit(store, display):
+    """Show the rows a menu action picks from, one page at a time.
+    
+    Past a page of rows, first ask for a name or a date range so only the
+    relevant slice is listed.
+    """
+    name = start = end = None
+    if len(store) > TABLE_PAGE_SIZE:
+        answer = input(f"Show which rows? {store.NAME_KEY} name, YYYY-MM-DD..YYYY-MM-DD, or Enter for all: ").strip()
+        if '..' in answer:
+            first, last = (part.strip() for part in answer.split('..', 1))
+            try:
+                start = datetime.strptime(first, '%Y-%m-%d') if first else None
+                end = datetime.strptime(last, '%Y-%m-%d') + timedelta(days=1) if last else None
+            except ValueError:
+                print("Invalid date range; showing all rows.")
+                start = end = None
+        elif answer:
+            name = store.canonical_name(answer)
+    display(store, name, start, end, page_size=TABLE_PAGE_SIZE)
+
+def add_expense(expenses):
+    """Add a new expense."""
+    print("\n--- Add New Expense ---")
+    print("Available payees:")
+    for i, payee in enumerate(PAYEES, 1):
+        print(f"  {i}. {payee}")
+    
+    payee_input = input("\nPayee name or number: ").strip()
+    
+    # Check if input is a number
+    if payee_input.isdigit():
+        idx = int(payee_input) - 1
+        if 0 <= idx < len(PAYEES):
+            payee = PAYEES[idx]
+        else:
+            print("Invalid payee number.")
+            return False
+    else:
+        payee = expenses.canonical_name(payee_input)
+    
+    try:
+        amount = Money.parse(input("Amount: $"))
+        due_date_str = input("Due Date (YYYY-MM-DD): ")
+        due_date = datetime.strptime(due_date_str, '%Y-%m-%d')
+        
+        expenses.append({
+            'Payee': payee,
+            'Amount': amount,
+            'Due Date': due_date
+        })
+        print(f"✓ Added: {payee} - ${amount:.2f} due on {due_date.date()}")
+        return True
+    except ValueError as e:
+        print(f"Invalid input: {e}")
+        return False
+
+def add_recurring_expense(expenses):
+    """Add a recurring expense rule."""
+    print("\n--- Add Recurring Expense ---")
+    print("Available payees:")
+    for i, payee in enumerate(PAYEES, 1):
+        print(f"  {i}. {payee}")
+    
+    payee_input = input("\nPayee name or number: ").strip()
+    
+    if payee_input.isdigit():
+        idx = int(payee_input) - 1
+        if 0 <= idx < len(PAYEES):
+            payee = PAYEES[idx]
+        else:
+            print("Invalid payee number.")
+            return False
+    else:
+        payee = expenses.canonical_name(payee_input)
+    
+    try:
+        amount_str = input("Amount (Enter to use the last known amount): $").strip()
+        amount = Money.parse(amount_str) if amount_str else None
+        frequency = input("Frequency (monthly/quarterly/annual) [monthly]: ").strip().lower() or 'monthly'
+        due_date_str = input("First Due Date (YYYY-MM-DD): ")
+        due_date = datetime.strptime(due_date_str, '%Y-%m-%d')
+        
+        expenses.add_recurring(payee, amount, frequency, due_date)
+        amount_text = 'last known amount' if amount is None else f"${amount:.2f}"
+        print(f"✓ Added: {payee} - {amount_text} {frequency} from {due_date.date()}")
+        return True
+    except ValueError as e:
+        print(f"Invalid input: {e}")
+        return False
+
+def delete_recurring_expense(expenses):
+    """Delete a recurring expense rule."""
+    if not expenses.recurring:
+        print("No recurring expenses to delete.")
+        return False
+    
+    display_recurring(expenses)
+    
+    try:
+        choice = int(input("\nEnter recurring expense number to delete (0 to cancel): "))
+        if choice == 0:
+            return False
+        
+        if 1 <= choice <= len(expenses.recurring):
+            deleted = expenses.remove_recurring(choice - 1)
+            print(f"✓ Deleted: {deleted['Payee']} ({deleted['Frequency']})")
+            return True
+        else:
+            print("Invalid recurring expense number.")
+            return False
+    except (ValueError, IndexError) as e:
+        print(f"Invalid input: {e}")
+        return False
+
+def modify_expense(expenses):
+    """Modify an existing expense."""
+    if not expenses:
+        print("No expenses to modify.")
+        return False
+    
+    show_rows_for_edit(expenses, display_expenses)
+    
+    try:
+        choice = int(input("\nEnter expense number to modify (0 to cancel): "))
+        if choice == 0:
+            return False
+        
+        if 1 <= choice <= len(expenses):
+            idx = choice - 1
+            exp = expenses[idx]
+            
+            print(f"\nModifying: {exp['Payee']} - ${exp['Amount']:.2f} due on {exp['Due Date'].strftime('%Y-%m-%d')}")
+            print("Press Enter to keep current value")
+            
+            # Modify payee
+            payee_input = input(f"Payee [{exp['Payee']}]: ").strip()
+            if payee_input:
+                exp['Payee'] = expenses.canonical_name(payee_input)
+            
+            # Modify amount
+            amount_input = input(f"Amount [${exp['Amount']:.2f}]: $").strip()
+            if amount_input:
+                exp['Amount'] = Money.parse(amount_input)
+            
+            # Modify due date
+            date_input = input(f"Due Date [{exp['Due Date'].strftime('%Y-%m-%d')}]: ").strip()
+            if date_input:
+                exp['Due Date'] = datetime.strptime(date_input, '%Y-%m-%d')
+            
+            print("✓ Expense modified successfully")
+            return True
+        else:
+            print("Invalid expense number.")
+            return False
+    except (ValueError, IndexError) as e:
+        print(f"Invalid input: {e}")
+        return False
+
+def delete_expense(expenses):
+    """Delete an expense."""
+    if not expenses:
+        print("No expenses to delete.")
+        return False
+    
+    show_rows_for_edit(expenses, display_expenses)
+    
+    try:
+        choice = int(input("\nEnter expense number to delete (0 to cancel): "))
+        if choice == 0:
+            return False
+        
+        if 1 <= choice <= len(expenses):
+            idx = choice - 1
+            deleted = expenses.pop(idx)
+            print(f"✓ Deleted: {deleted['Payee']} - ${deleted['Amount']:.2f}")
+            return True
+        else:
+            print("Invalid expense number.")
+            return False
+    except (ValueError, IndexError) as e:
+        print(f"Invalid input: {e}")
+        return False
+
+def add_income(income):
+    """Add or update income entry."""
+    print("\n--- Add/Update Income ---")
+    print("Available banks:")
+    for i, bank in enumerate(INCOME_SOURCES, 1):
+        print(f"  {i}. {bank}")
+    
+    bank_input = input("\nBank name or number: ").strip()
+    
+    # Check if input is a number
+    if bank_input.isdigit():
+        idx = int(bank_input) - 1
+        if 0 <= idx < len(INCOME_SOURCES):
+            bank = INCOME_SOURCES[idx]
+        else:
+            print("Invalid bank number.")
+            return False
+    else:
+        bank = income.canonical_name(bank_input)
+    
+    try:
+        amount = Money.parse(input("Amount: $"))
+        balance_date_str = input("Balance Date (YYYY-MM-DD): ")
+        balance_date = datetime.strptime(balance_date_str, '%Y-%m-%d')
+        
+        # Check if bank already exists and update, otherwise add
+        existing = income.first_row(bank)
+        if existing:
+            existing['Amount'] = amount
+            existing['Balance Date'] = balance_date
+            print(f"✓ Updated: {bank} - ${amount:.2f}")
+        else:
+            income.append({
+                'Bank': bank,
+                'Amount': amount,
+                'Balance Date': balance_date
+            })
+            print(f"✓ Added: {bank} - ${amount:.2f}")
+        return True
+    except ValueError as e:
+        print(f"Invalid input: {e}")
+        return False
+
+def modify_income(income):
+    """Modify an existing income entry."""
+    if not income:
+        print("No income to modify.")
+        return False
+    
+    show_rows_for_edit(income, display_income)
+    
+    try:
+        choice = int(input("\nEnter income number to modify (0 to cancel): "))
+        if choice == 0:
+            return False
+        
+        if 1 <= choice <= len(income):
+            idx = choice - 1
+            inc = income[idx]
+            
+            print(f"\nModifying: {inc['Bank']} - ${inc['Amount']:.2f} as of {inc['Balance Date'].strftime('%Y-%m-%d')}")
+            print("Press Enter to keep current value")
+            
+            # Modify amount
+            amount_input = input(f"Amount [${inc['Amount']:.2f}]: $").strip()
+            if amount_input:
+                inc['Amount'] = Money.parse(amount_input)
+            
+            # Modify balance date
+            date_input = input(f"Balance Date [{inc['Balance Date'].strftime('%Y-%m-%d')}]: ").strip()
+            if date_input:
+                inc['Balance Date'] = datetime.strptime(date_input, '%Y-%m-%d')
+            
+            print("✓ Income modified successfully")
+            return True
+        else:
+            print("Invalid income number.")
+            return False
+    except (ValueError, IndexError) as e:
+        print(f"Invalid input: {e}")
+        return False
+
+def delete_income(income):
+    """Delete an income entry."""
+    if not income:
+        print("No income to delete.")
+        return False
+    
+    show_rows_for_edit(income, display_income)
+    
+    try:
+        choice = int(input("\nEnter income number to delete (0 to cancel): "))
+        if choice == 0:
+            return False
+        
+        if 1 <= choice <= len(income):
+            idx = choice - 1
+            deleted = income.pop(idx)
+            print(f"✓ Deleted: {deleted['Bank']} - ${deleted['Amount']:.2f}")
+            return True
+        else:
+            print("Invalid income number.")
+            return False
+    except (ValueError, IndexError) as e:
+        print(f"Invalid input: {e}")
+        return False
+
+def import_bank_statement(expenses, filename=DEFAULT_CSV_FILENAME):
+    """Reconcile a bank statement against the expenses and close the paid ones."""
+    statement_filename = input("Enter bank statement filename (CSV or OFX): ").strip()
+    transactions = read_bank_statement(statement_filename)
+    if transactions is None:
+        return False
+    result = reconcile_statement(expenses, transactions, load_payee_aliases(filename))
+    print_reconciliation(result, expenses)
+    if not result['matched']:
+        return False
+    if get_yes_no_input(f"\nMark {len(result['matched'])} matched expense(s) as paid and remove them? (yes/no): "):
+        print(f"✓ Closed {close_paid_expenses(expenses, result)} paid expense(s)")
+        return True
+    return False
+
+def manage_data(expenses, income, filename=DEFAULT_CSV_FILENAME, history=None):
+    """Interactive menu to manage expenses and income.
+    
+    Each change made from the menu is one step in history (an EditHistory,
+    created when not given), so it can be undone and redone.
+    """
+    if history is None:
+        history = EditHistory(expenses, income)
+    while True:
+        print("\n" + "="*60)
+        print("DATA MANAGEMENT MENU")
+        print("="*60)
+        print("Expenses:")
+        print("  1. View expenses")
+        print("  2. Add expense")
+        print("  3. Modify expense")
+        print("  4. Delete expense")
+        print("  R. Add recurring expense")
+        print("  X. Delete recurring expense")
+        print("  B. Import bank statement (close paid expenses)")
+        print("\nIncome:")
+        print("  5. View income")
+        print("  6. Add/Update income")
+        print("  7. Modify income")
+        print("  8. Delete income")
+        print("\nHistory:")
+        undo_label, redo_label = history.undo_label(), history.redo_label()
+        print(f"  U. Undo{f' ({undo_label})' if undo_label else ''}")
+        print(f"  Y. Redo{f' ({redo_label})' if redo_label else ''}")
+        print("\n  9. Continue to analysis")
+        print("  0. Exit program")
+        print("="*60)
+        
+        choice = input("\nSelect option: ").strip().upper()
+        
+        if choice == '1':
+            print("\n--- Current Expenses ---")
+            show_rows_for_edit(expenses, display_expenses)
+            if expenses.recurring:
+                print("\n--- Recurring Expenses ---")
+                display_recurring(expenses)
+        elif choice == '2':
+            with history.edit("Add expense"):
+                add_expense(expenses)
+        elif choice == '3':
+            with history.edit("Modify expense"):
+                modify_expense(expenses)
+        elif choice == '4':
+            with history.edit("Delete expense"):
+                delete_expense(expenses)
+        elif choice == 'R':
+            with history.edit("Add recurring expense"):
+                add_recurring_expense(expenses)
+        elif choice == 'X':
+            with history.edit("Delete recurring expense"):
+                delete_recurring_expense(expenses)
+        elif choice == 'B':
+            with history.edit("Import bank statement"):
+                import_bank_statement(expenses, filename)
+        elif choice == '5':
+            print("\n--- Current Income ---")
+            show_rows_for_edit(income, display_income)
+        elif choice == '6':
+            with history.edit("Add/Update income"):
+                add_income(income)
+        elif choice == '7':
+            with history.edit("Modify income"):
+                modify_income(income)
+        elif choice == '8':
+            with history.edit("Delete income"):
+                delete_income(income)
+        elif choice == 'U':
+            label = history.undo()
+            print(f"✓ Undone: {label}" if label else "Nothing to undo.")
+        elif choice == 'Y':
+            label = history.redo()
+            print(f"✓ Redone: {label}" if label else "Nothing to redo.")
+        elif choice == '9':
+            return True
+        elif choice == '0':
+            return False
+        else:
+            print("Invalid option. Please try again.")
+
+def get_manual_expense_data():
+    """Manually input expense data."""
+    expenses = ExpenseStore()
+    print("\n--- Enter Expense Data ---")
+    print("Available payees:")
+    for i, payee in enumerate(PAYEES, 1):
+        print(f"  {i}. {payee}")
+    
+    while True:
+        print("\nEnter expense (or press Enter to finish):")
+        payee_input = input("  Payee name or number: ").strip()
+        
+        if not payee_input:
+            break
+        
+        # Check if input is a number
+        if payee_input.isdigit():
+            idx = int(payee_input) - 1
+            if 0 <= idx < len(PAYEES):
+                payee = PAYEES[idx]
+            else:
+                print("Invalid payee number. Please try again.")
+                continue
+        else:
+            payee = expenses.canonical_name(payee_input)
+        
+        try:
+            amount = Money.parse(input("  Amount: $"))
+            due_date_str = input("  Due Date (YYYY-MM-DD): ")
+            due_date = datetime.strptime(due_date_str, '%Y-%m-%d')
+            
+            expenses.append({
+                'Payee': payee,
+                'Amount': amount,
+                'Due Date': due_date
+            })
+            print(f"  Added: {payee} - ${amount:.2f} due on {due_date.date()}")
+        except ValueError as e:
+            print(f"Invalid input: {e}. Please try again.")
+    
+    return expenses
+
+def get_manual_income_data():
+    """Manually input income data."""
+    income = IncomeStore()
+    print("\n--- Enter Income Data ---")
+    print("Available banks:")
+    for i, bank in enumerate(INCOME_SOURCES, 1):
+        print(f"  {i}. {bank}")
+    
+    for bank in INCOME_SOURCES:
+        print(f"\nEnter data for {bank}:")
+        try:
+            amount = Money.parse(input("  Amount: $"))
+            balance_date_str = input("  Balance Date (YYYY-MM-DD): ")
+            balance_date = datetime.strptime(balance_date_str, '%Y-%m-%d')
+            
+            income.append({
+                'Bank': bank,
+                'Amount': amount,
+                'Balance Date': balance_date
+            })
+        except ValueError as e:
+            print(f"Invalid input: {e}. Setting to 0.")
+            income.append({
+                'Bank': bank,
+                'Amount': Money(0),
+                'Balance Date': datetime.now()
+            })
+    
+    return income
+
+def print_reconciliation(result, expenses, closed=False):
+    """Print match counts, then every unmatched payment and unpaid expense."""
+    matched, unmatched, unpaid = result['matched'], result['unmatched'], result['unpaid']
+    print("\n" + "="*60)
+    print("BANK STATEMENT RECONCILIATION")
+    print("="*60)
+    total = Money(sum(cents for (_, cents, _), _ in matched))
+    print(f"Payments:                 {len(matched) + len(unmatched)}")
+    print(f"Matched to expenses:      {len(matched)} (${total:,.2f})"
+          f"{' - closed' if closed else ''}")
+    print(f"Unmatched payments:       {len(unmatched)}")
+    print(f"Unpaid expenses:          {len(unpaid)}")
+    if unmatched:
+        print("\nPAYMENTS WITH NO OPEN EXPENSE:")
+        for ordinal, cents, description in unmatched:
+            print(f"  {date.fromordinal(ordinal).isoformat():<12} ${Money(cents):>10.2f}  {description}")
+    if unpaid:
+        print("\nEXPENSES DUE DURING THE STATEMENT WITH NO PAYMENT:")
+        for row in unpaid:
+            print(f"  {date.fromordinal(expenses.ordinals[row]).isoformat():<12} "
+                  f"${Money(expenses.cents[row]):>10.2f}  {expenses.names[expenses.name_ids[row]]}")
+    print("="*60)
+
+def reconcile_ledger(filename, statement_filenames):
+    """Close the expenses in a ledger file paid by bank statements, and report the rest."""
+    storage = open_storage(filename)
+    try:
+        expenses, income = storage.load()
+        if expenses is None:
+            return False
+        transactions = []
+        for statement_filename in statement_filenames:
+            payments = read_bank_statement(statement_filename)
+            if payments is None:
+                return False
+            transactions.extend(payments)
+        transactions.sort()
+        result = reconcile_statement(expenses, transactions, load_payee_aliases(filename))
+        # Report first: unpaid rows are positions in the ledger as loaded
+        print_reconciliation(result, expenses, closed=True)
+        if result['matched']:
+            close_paid_expenses(expenses, result)
+            storage.save(expenses, income)
+        return True
+    finally:
+        storage.close()
+
+def get_actual_transfer_amount(recommended_amount, sccu_before, etrade_before,
+                               source='E-Trade Savings', destination='SCCU Checking'):
+    """Get the actual transfer amount from user.
+    
+    sccu_before and etrade_before are the destination and source balances;
+    other accounts are named in the prompt.
+    """
+    if recommended_amount <= 0:
+        return Money(0)
+    
+    if (source, destination) == ('E-Trade Savings', 'SCCU Checking'):
+        print(f"\nRECOMMENDED TRANSFER: ${recommended_amount:.2f}")
+    else:
+        print(f"\nRECOMMENDED TRANSFER: ${recommended_amount:.2f} from {source} to {destination}")
+    
+    while True:
+        user_input = input(f"\nEnter actual transfer amount (or press Enter to use recommended ${recommended_amount:.2f}): $").strip()
+        
+        # If user presses Enter, use recommended amount
+        if not user_input:
+            return recommended_amount
+        
+        try:
+            actual_amount = Money.parse(user_input)
+            
+            # Validate the amount
+            if actual_amount < 0:
+                print("Transfer amount cannot be negative. Please try again.")
+                continue
+            
+            if actual_amount > etrade_before:
+                print(f"Transfer amount cannot exceed {source} balance (${etrade_before:.2f}). Please try again.")
+                continue
+            
+            return actual_amount
+            
+        except ValueError:
+            print("Invalid amount. Please enter a number.")
+
+def apply_transfer_plan(plan):
+    """Ask for the actual amount of each transfer the plan makes now; return the transfers made.
+    
+    Every step is one get_actual_transfer_amount prompt, checked against
+    the source balance as the earlier steps left it.
+    """
+    balances = dict(plan['balances_before'])
+    made = []
+    for transfer in plan['transfers']:
+        if transfer['Date'] > plan['as_of']:
+            break
+        source, destination = transfer['From'], transfer['To']
+        amount = get_actual_transfer_amount(transfer['Amount'], balances.get(destination, Money(0)),
+                                            balances.get(source, Money(0)), source, destination)
+        if amount > 0:
+            balances[source] = balances.get(source, Money(0)) - amount
+            balances[destination] = balances.get(destination, Money(0)) + amount
+            made.append(dict(transfer, Amount=amount))
+    return made
+
+def print_transfer_plan(plan):
+    """Print a plan_transfers() schedule, its balances and any shortfalls."""
+    months = round((plan['horizon_end'] - plan['as_of']).days / 30.4)
+    print()
+    print(f"TRANSFER PLAN (next {months} months, {len(plan['balances_after'])} accounts):")
+    print("-" * 60)
+    if plan['transfers']:
+        for transfer in plan['transfers']:
+            print(f"  {transfer['Date'].strftime('%Y-%m-%d')} | {transfer['From']:<20} -> "
+                  f"{transfer['To']:<20} | ${transfer['Amount']:>10.2f}")
+        print("-" * 60)
+        print(f"  {len(plan['transfers'])} transfer(s), total ${plan['total']:.2f}")
+    else:
+        print("  No transfers needed.")
+    for shortfall in plan['shortfalls']:
+        print(f"  ⚠️  {shortfall['Account']} is ${shortfall['Amount']:.2f} short on "
+              f"{shortfall['Date'].strftime('%Y-%m-%d')} with no account left to cover it")
+    print()
+    print("BALANCES AT THE END OF THE PLAN:")
+    for account, balance in sorted(plan['balances_after'].items()):
+        print(f"  {account:<20} ${balance:>12.2f}  (margin ${plan['margins'][account]:.2f})")
+    print()
+
+def print_results(results, actual_transfer=None, timeline=None, plan=None):
+    """Print the analysis results.
+    
+    actual_transfer is asked for interactively unless it is given. With a
+    CashFlowTimeline, also print when checking first drops below the margin.
+    With a plan_transfers() plan, the plan and the transfers it makes now
+    replace the two-account balances and outlook.
+    """
+    margin = results['safety_margin']
+    print("\n" + "="*60)
+    print("MONTHLY EXPENSE ANALYSIS")
+    print("="*60)
+    print(f"Analysis Date: {results['current_date'].strftime('%Y-%m-%d')}")
+    print(f"Period: {results['period'].upper()} of the month")
+    print()
+    
+    print("UPCOMING EXPENSES:")
+    print("-" * 60)
+    if results['relevant_expenses']:
+        for exp in results['relevant_expenses']:
+            print(f"  {exp['Due Date'].strftime('%Y-%m-%d')} | {exp['Payee']:<20} | ${exp['Amount']:>10.2f}")
+        print("-" * 60)
+        print(f"  {'TOTAL':<32} | ${results['total_expenses']:>10.2f}")
+    else:
+        print("  No upcoming expenses for this period.")
+    print()
+    
+    # Show future expenses if any
+    if results['future_expenses']:
+        print("FUTURE EXPENSES (Not included in current transfer calculation):")
+        print("-" * 60)
+        for exp in results['future_expenses']:
+            print(f"  {exp['Due Date'].strftime('%Y-%m-%d')} | {exp['Payee']:<20} | ${exp['Amount']:>10.2f}")
+        print()
+    
+    if plan is not None:
+        print_transfer_plan(plan)
+        made = apply_transfer_plan(plan)
+        if made:
+            print()
+            print("TRANSFERS MADE:")
+            for transfer in made:
+                print(f"  {transfer['From']:<20} -> {transfer['To']:<20} | ${transfer['Amount']:>10.2f}")
+        print("="*60)
+        return
+    
+    print("ACCOUNT BALANCES:")
+    print("-" * 60)
+    print("BEFORE TRANSFER:")
+    print(f"  SCCU Checking:    ${results['sccu_before']:>12.2f}")
+    print(f"  E-Trade Savings:  ${results['etrade_before']:>12.2f}")
+    print()
+    
+    if results['transfer_amount'] > 0:
+        print(f"  (Recommendation based on: Expenses ${results['total_expenses']:.2f} + Safety Margin ${margin:.2f})")
+        
+        # Get actual transfer amount from user: the one step of a single-transfer plan
+        if actual_transfer is None:
+            made = apply_transfer_plan(_single_transfer_plan(results))
+            actual_transfer = sum((transfer['Amount'] for transfer in made), Money(0))
+        else:
+            actual_transfer = Money.of(actual_transfer)
+            print(f"\nRECOMMENDED TRANSFER: ${results['transfer_amount']:.2f}")
+        
+        # Recalculate balances with actual transfer
+        sccu_after = results['sccu_before'] + actual_transfer
+        etrade_after = results['etrade_before'] - actual_transfer
+        
+        print()
+        print(f"ACTUAL TRANSFER: ${actual_transfer:.2f}")
+        print()
+        print("AFTER TRANSFER:")
+        print(f"  SCCU Checking:    ${sccu_after:>12.2f}")
+        print(f"  E-Trade Savings:  ${etrade_after:>12.2f}")
+        print()
+        print("AFTER PAYING EXPENSES:")
+        print(f"  SCCU Checking:    ${sccu_after - results['total_expenses']:>12.2f}")
+        
+        # Show warning if below safety margin
+        final_balance = sccu_after - results['total_expenses']
+        if final_balance < margin:
+            print(f"    ⚠️  WARNING: Balance is ${margin - final_balance:.2f} below safety margin!")
+        else:
+            print(f"    (Includes ${final_balance - (final_balance - margin):.2f} safety margin)")
+    else:
+        print("NO TRANSFER NEEDED")
+        print(f"  Current SCCU balance is sufficient (includes ${margin:.2f} safety margin)")
+        print()
+        print("AFTER PAYING EXPENSES:")
+        print(f"  SCCU Checking:    ${results['sccu_before'] - results['total_expenses']:>12.2f}")
+        print(f"    (Includes ${margin:.2f} safety margin)")
+    
+    if timeline is not None:
+        transfer = actual_transfer if results['transfer_amount'] > 0 else Money(0)
+        horizon = (timeline.horizon_end - timeline.as_of).days
+        low_date, low_balance = timeline.minimum_balance(transfer=transfer)
+        below = timeline.first_below(margin, transfer=transfer)
+        print()
+        print(f"CASH FLOW OUTLOOK (next {horizon} days):")
+        print("-" * 60)
+        print(f"  Lowest SCCU balance:  ${low_balance:>12.2f} on {low_date.strftime('%Y-%m-%d')}")
+        if below is None:
+            print(f"  Stays above the ${margin:.2f} safety margin")
+        else:
+            print(f"  ⚠️  Drops below the ${margin:.2f} safety margin on {below[0].strftime('%Y-%m-%d')} (${below[1]:.2f})")
+    
+    print("="*60)
+
+def main():
+    """Main program function."""
+    print("="*60)
+    print("MONTHLY EXPENSE AND INCOME MANAGER")
+    print("="*60)
+    
+    # Step 1: Check if user has CSV file
+    has_csv = get_yes_no_input("\nDo you have a CSV file for processing? (yes/no): ")
+    
+    expenses = ExpenseStore()
+    income = IncomeStore()
+    journal = None
+    storage = None
+    history = None
+    
+    if has_csv:
+        filename = input("Enter CSV filename: ").strip()
+        if glob.has_magic(filename):
+            # Several statements at once, e.g. statements/*.csv
+            expenses, income, duplicates = ingest_files(filename)
+            if duplicates:
+                print(f"Skipped {duplicates} duplicate row(s) found in more than one file")
+        else:
+            storage = open_storage(filename)
+            expenses, income = storage.load()
+        
+        if expenses is None or income is None:
+            print("Failed to read CSV. Please enter data manually.")
+            if storage is not None:
+                storage.close()
+                storage = None
+            has_csv = False
+        else:
+            print(f"\n✓ Successfully loaded {len(expenses)} expense(s) and {len(income)} income source(s)")
+            
+            # Edits to the file we save to are journaled instead of rewriting it
+            if isinstance(storage, CSVStorage) and os.path.abspath(filename) == os.path.abspath(DEFAULT_CSV_FILENAME):
+                journal = LedgerJournal(filename)
+                journal.attach(expenses, income)
+            
+            # Allow user to review and modify imported data
+            if get_yes_no_input("\nWould you like to review/modify the imported data? (yes/no): "):
+                history = EditHistory(expenses, income)
+                if not manage_data(expenses, income, DEFAULT_CSV_FILENAME if glob.has_magic(filename) else filename,
+                                   history):
+                    # Leave the ledger as it was loaded
+                    if journal is not None:
+                        journal.rollback()
+                    print("\nProgram terminated by user.")
+                    return
+    
+    if not has_csv:
+        # Get manual input
+        expenses = get_manual_expense_data()
+        income = get_manual_income_data()
+        
+        # Allow user to review and modify manually entered data
+        if expenses or income:
+            if get_yes_no_input("\nWould you like to review/modify your entries? (yes/no): "):
+                history = EditHistory(expenses, income)
+                if not manage_data(expenses, income, history=history):
+                    print("\nProgram terminated by user.")
+                    return
+    
+    # Save data back to a database it came from, otherwise to the CSV
+    if storage is not None and not isinstance(storage, CSVStorage):
+        storage.save(expenses, income)
+        storage.close()
+        saved_filename = storage.filename
+    else:
+        save_ledger(expenses, income, journal=journal)
+        saved_filename = DEFAULT_CSV_FILENAME
+    if history is not None:
+        write_audit_log(saved_filename, history.audit)
+    
+    # Calculate and display results, with a transfer plan when the ledger has account settings
+    results = calculate_transfer(expenses, income)
+    config = load_account_config(filename if has_csv and not glob.has_magic(filename) else DEFAULT_CSV_FILENAME)
+    plan = None
+    if config is not None:
+        plan = plan_transfers(expenses, income, results['current_date'],
+                              payee_accounts=config['payees'], margins=config['margins'])
+    timeline = None if plan is not None else cash_flow_timeline(expenses, income, results['current_date'])
+    print_results(results, timeline=timeline, plan=plan)
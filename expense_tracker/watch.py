@@ -0,0 +1,138 @@
+"""--watch: re-analyze a CSV ledger whenever it changes."""
+import asyncio
+import os
+import sys
+from array import array
+from contextlib import redirect_stdout
+from datetime import datetime
+from io import StringIO
+
+from .analysis import calculate_transfer
+from .core import JOURNAL_SUFFIX, WATCH_POLL_SECONDS
+from .headless import _ledger_summary, write_ledger_summaries
+from .storage import LedgerJournal, _parse_csv_chunk, read_csv_file
+
+class LedgerWatcher:
+    """Keeps a CSV ledger loaded and in step with the file on disk.
+    
+    poll() compares the file's stat with the last one seen. Rows appended
+    to the end are parsed on their own (a trailing partial line waits for
+    the next poll) and added to the loaded stores, so their due-date and
+    name indexes stay built. Any other change, such as a rewrite by
+    save_to_csv, a truncation or new edits in the journal, reloads the
+    ledger in full.
+    """
+    # Bytes before the parsed offset that must be unchanged for an append
+    TAIL_CHECK_BYTES = 64
+    
+    def __init__(self, filename):
+        self.filename = filename
+        self.expenses = None
+        self.income = None
+        self._seen = None
+        self._offset = 0
+        self._tail = b''
+        self._journaled = False
+    
+    def _stat(self):
+        """((inode, size, mtime_ns) of the CSV, (size, mtime_ns) of its journal or None)."""
+        stat = os.stat(self.filename)
+        try:
+            journal = os.stat(self.filename + JOURNAL_SUFFIX)
+            journal = (journal.st_size, journal.st_mtime_ns)
+        except FileNotFoundError:
+            journal = None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns), journal
+    
+    def _read(self, start, end):
+        with open(self.filename, 'rb') as f:
+            f.seek(start)
+            return f.read(end - start)
+    
+    def poll(self):
+        """Bring the stores up to date; return 'reloaded', 'appended' or None if nothing changed."""
+        try:
+            seen = self._stat()
+        except FileNotFoundError:
+            # Report a missing file once, not on every poll
+            if self._seen == 'missing':
+                return None
+            self._seen = 'missing'
+            self.expenses = self.income = None
+            print(f"Error: File '{self.filename}' not found.")
+            return 'reloaded'
+        if seen == self._seen:
+            return None
+        (inode, size, _), journal = seen
+        if (self.expenses is not None and not self._journaled and isinstance(self._seen, tuple)
+                and inode == self._seen[0][0] and journal == self._seen[1] and size > self._offset
+                and self._read(self._offset - len(self._tail), self._offset) == self._tail):
+            self._seen = seen
+            return 'appended' if self._append(size) else None
+        self._reload(seen)
+        return 'reloaded'
+    
+    def _reload(self, seen):
+        """Load the whole ledger (through its snapshot when valid)."""
+        self.expenses, self.income = read_csv_file(self.filename)
+        self._journaled = LedgerJournal(self.filename)._read_ops(warn=False) is not None
+        size = seen[0][1]
+        self._offset = size
+        self._tail = self._read(max(0, size - self.TAIL_CHECK_BYTES), size)
+        # If the file moved on while it was being read, reload again next poll
+        self._seen = seen if self._stat() == seen else None
+        if self.expenses is not None:
+            self.expenses.due_index()
+    
+    def _append(self, size):
+        """Parse the complete lines added since the last poll into the stores."""
+        added = self._read(self._offset, size)
+        end = self._offset + added.rfind(b'\n') + 1
+        if end <= self._offset:
+            return False
+        parsed = _parse_csv_chunk((self.filename, self._offset, end))
+        for payee, amount, frequency, ordinal in parsed.pop('Recurring'):
+            self.expenses.add_recurring(payee, amount, frequency, datetime.fromordinal(ordinal))
+        for store, (names, name_ids, cents, ordinals) in ((self.expenses, parsed['Expense']),
+                                                          (self.income, parsed['Income'])):
+            remap = [store.intern(name) for name in names]
+            store.extend_columns(array('I', (remap[name_id] for name_id in name_ids)), cents, ordinals)
+        self._offset = end
+        self._tail = self._read(max(0, end - self.TAIL_CHECK_BYTES), end)
+        return True
+    
+    def refresh(self, as_of=None, margin=None, accept_recommended=False, output='table'):
+        """Poll the ledger; return a headless summary dict if it changed, else None."""
+        summary = {'file': self.filename}
+        with redirect_stdout(StringIO()) as captured:
+            try:
+                change = self.poll()
+            except Exception as e:
+                self.expenses = self.income = None
+                self._seen = None
+                change = 'reloaded'
+                print(f"Error reading file: {e}")
+            if change is None:
+                return None
+            results = None if self.expenses is None else calculate_transfer(
+                self.expenses, self.income, as_of=as_of, margin=margin)
+            messages = captured.getvalue().strip()
+        return _ledger_summary(summary, results, messages, accept_recommended, output)
+
+async def watch_ledger(filename, as_of=None, margin=None, accept_recommended=False, output='table',
+                       interval=WATCH_POLL_SECONDS, stream=None):
+    """Re-emit the analysis of a CSV ledger every time the file changes; runs until cancelled.
+    
+    The standard library has no portable change notification, so the file
+    is polled every interval seconds; a poll that finds nothing new is a
+    single stat. Parsing and analysis run in a worker thread, leaving the
+    event loop free for other tasks.
+    """
+    stream = stream or sys.stdout
+    watcher = LedgerWatcher(filename)
+    while True:
+        summary = await asyncio.to_thread(watcher.refresh, as_of, margin, accept_recommended, output)
+        if summary is not None:
+            write_ledger_summaries([summary], output, stream)
+            stream.flush()
+        await asyncio.sleep(interval)
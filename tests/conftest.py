@@ -0,0 +1,24 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+# For tests that reuse the benchmark harnesses
+sys.path.insert(1, str(ROOT / 'benchmarks'))
+
+from expense_tracker.core import ExpenseStore, IncomeStore, Money  # noqa: E402
+from expense_tracker.storage import save_to_csv  # noqa: E402
+
+@pytest.fixture
+def ledger_file(tmp_path):
+    """A small CSV ledger: ten March bills alternating Netflix and Chase Visa, and a checking balance."""
+    filename = str(tmp_path / 'ledger.csv')
+    expenses, income = ExpenseStore(), IncomeStore()
+    for day in range(1, 11):
+        expenses.add('Netflix' if day % 2 else 'Chase Visa', Money(1000 + day), datetime(2026, 3, day))
+    income.add('SCCU Checking', Money(250000), datetime(2026, 3, 1))
+    save_to_csv(expenses, income, filename)
+    return filename
@@ -0,0 +1,81 @@
+"""The analysis backends must pick the same rows and totals as a plain scan."""
+import random
+from datetime import datetime
+
+import pytest
+
+from expense_tracker.analysis import ANALYSIS_BACKENDS
+from expense_tracker.core import PAYEES, ExpenseStore, IncomeStore, Money, optional_module
+
+BACKENDS = [
+    'python',
+    pytest.param('numpy', marks=pytest.mark.skipif(optional_module('numpy') is None,
+                                                   reason="NumPy is not installed")),
+]
+
+def random_store(rng, count, build_index):
+    """A store with clustered due dates, non-positive amounts and edits after the index was built."""
+    start = datetime(2026, 1, 1).toordinal()
+    store = ExpenseStore()
+    for _ in range(count):
+        store.add_row(rng.choice(PAYEES), rng.choice([0, -1250, rng.randrange(1, 100000)]),
+                      start + rng.randrange(90))
+    if build_index:
+        store.due_index()
+    for _ in range(count // 5):
+        if not len(store):
+            break
+        index = rng.randrange(len(store))
+        choice = rng.random()
+        if choice < 0.4:
+            store.set_cents(index, rng.choice([0, rng.randrange(1, 100000)]))
+        elif choice < 0.8:
+            store.set_ordinal(index, start + rng.randrange(90))
+        else:
+            store.pop(index)
+    return store, start
+
+def scan(store, today, end):
+    """Period rows, future rows and period total by scanning every row."""
+    payable = sorted((store.ordinals[row], row) for row in range(len(store)) if store.cents[row] > 0)
+    relevant = [row for ordinal, row in payable if today <= ordinal < end]
+    future = [row for ordinal, row in payable if ordinal >= end]
+    return relevant, future, sum(store.cents[row] for row in relevant)
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('build_index', [True, False])
+@pytest.mark.parametrize('seed', range(10))
+def test_backend_matches_scan(backend, build_index, seed):
+    rng = random.Random(seed)
+    split_period = ANALYSIS_BACKENDS[backend]
+    for _ in range(30):
+        store, start = random_store(rng, rng.randrange(0, 200), build_index)
+        today = start + rng.randrange(-5, 95)
+        end = today + rng.randrange(0, 20)
+        relevant, future, total = split_period(store, today, end)
+        assert (list(relevant.rows), list(future.rows), total) == scan(store, today, end)
+
+def as_dicts(results):
+    """Results with store rows turned into plain dicts, as SQLite returns them."""
+    return {key: [{field: exp[field] for field in ('Payee', 'Amount', 'Due Date')} for exp in value]
+            if isinstance(value, list) else value for key, value in results.items()}
+
+def test_sqlite_storage_gives_the_same_results(tmp_path):
+    from expense_tracker.analysis import calculate_transfer
+    from expense_tracker.sqlite_storage import SQLiteStorage
+    
+    rng = random.Random(7)
+    expenses, start = random_store(rng, 150, build_index=False)
+    expenses.add_recurring('Netflix', Money(1599), 'monthly', datetime.fromordinal(start))
+    income = IncomeStore()
+    income.add_row('SCCU Checking', 250000, start)
+    income.add_row('E-Trade Savings', 5000000, start)
+    storage = SQLiteStorage(str(tmp_path / 'ledger.db'))
+    storage.save(expenses, income)
+    try:
+        for offset in (0, 20, 45):
+            as_of = datetime.fromordinal(start + offset)
+            assert as_dicts(storage.calculate_transfer(as_of=as_of, margin=Money(50000))) == \
+                as_dicts(calculate_transfer(expenses, income, as_of=as_of, margin=Money(50000)))
+    finally:
+        storage.close()
@@ -0,0 +1,93 @@
+"""Undo and redo must restore the ledger exactly, and audit every change."""
+import random
+from datetime import datetime
+
+import pytest
+
+from expense_tracker.core import EditHistory, ExpenseStore, IncomeStore, Money
+from test_stores import NAMES, START, check_indexes, random_edit, rows_of
+
+def ledger(rng, count=50):
+    expenses, income = ExpenseStore(), IncomeStore()
+    for _ in range(count):
+        expenses.add_row(rng.choice(NAMES), rng.randrange(1, 100000), START + rng.randrange(40))
+    income.add('SCCU Checking', Money(500000), datetime(2026, 1, 1))
+    return expenses, income
+
+def state(expenses, income):
+    return rows_of(expenses), rows_of(income), [dict(rule) for rule in expenses.recurring]
+
+@pytest.mark.parametrize('seed', range(30))
+def test_undo_and_redo_walk_back_and_forth_through_every_state(seed):
+    rng = random.Random(seed)
+    expenses, income = ledger(rng)
+    if seed % 2:
+        expenses.due_index()
+        expenses.rows_for(NAMES[0])
+    history = EditHistory(expenses, income, user='tester')
+    states = [state(expenses, income)]
+    for step in range(rng.randrange(1, 40)):
+        with history.edit(f"step {step}"):
+            for _ in range(rng.randrange(1, 4)):
+                if rng.random() < 0.1:
+                    expenses.add_recurring(rng.choice(NAMES), None, 'monthly', datetime(2026, 1, 1))
+                elif rng.random() < 0.1 and expenses.recurring:
+                    expenses.remove_recurring(rng.randrange(len(expenses.recurring)))
+                else:
+                    random_edit(expenses, rng)
+        states.append(state(expenses, income))
+    
+    for expected in reversed(states[:-1]):
+        assert history.undo() is not None
+        assert state(expenses, income) == expected
+    assert history.undo() is None
+    check_indexes(expenses)
+    for expected in states[1:]:
+        assert history.redo() is not None
+        assert state(expenses, income) == expected
+    assert history.redo() is None
+    check_indexes(expenses)
+
+def test_a_new_edit_clears_redo():
+    expenses, income = ledger(random.Random(1), 5)
+    history = EditHistory(expenses, income, user='tester')
+    with history.edit("Delete"):
+        expenses.pop(0)
+    history.undo()
+    assert history.redo_label() == "Delete"
+    with history.edit("Modify"):
+        expenses.set_cents(0, 1)
+    assert history.redo_label() is None
+    assert history.undo_label() == "Modify"
+
+def test_history_keeps_the_newest_steps():
+    expenses, income = ledger(random.Random(2), 5)
+    history = EditHistory(expenses, income, limit=3, user='tester')
+    for cents in range(1, 6):
+        with history.edit(f"set {cents}"):
+            expenses.set_cents(0, cents)
+    assert [history.undo() for _ in range(4)] == ["set 5", "set 4", "set 3", None]
+    assert expenses.cents[0] == 2
+
+def test_edits_that_change_nothing_are_not_steps():
+    expenses, income = ledger(random.Random(3), 5)
+    history = EditHistory(expenses, income, user='tester')
+    with history.edit("Nothing"):
+        pass
+    assert history.undo_label() is None
+
+def test_audit_records_old_and_new_amounts_for_edits_undo_and_redo():
+    expenses, income = ExpenseStore(), IncomeStore()
+    expenses.add_row('Netflix', 1500, START)
+    history = EditHistory(expenses, income, user='tester')
+    with history.edit("Modify"):
+        expenses.set_cents(0, 1700)
+        expenses.set_ordinal(0, START + 3)
+    history.undo()
+    history.redo()
+    assert [(entry['Action'], entry['User'], entry['Name'], entry['Old Amount'], entry['New Amount'])
+            for entry in history.audit] == [
+        ("Modify", 'tester', 'Netflix', Money(1500), Money(1700)),
+        ("Undo Modify", 'tester', 'Netflix', Money(1700), Money(1500)),
+        ("Redo Modify", 'tester', 'Netflix', Money(1500), Money(1700)),
+    ]
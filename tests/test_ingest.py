@@ -0,0 +1,39 @@
+"""Parallel ingest must read a file's dates the way reading it in one go does."""
+import pytest
+
+from expense_tracker.storage import ingest_files, read_csv_file
+from test_stores import rows_of
+
+HEADER = 'Type,Payee,Bank,Amount,Due Date,Balance Date\r\n'
+
+@pytest.fixture
+def ambiguous_ledger(tmp_path):
+    # The first slash date is month-first; a later chunk starts with one only day-first can read
+    filename = tmp_path / 'ledger.csv'
+    lines = [HEADER, 'Income,,SCCU Checking,100.00,,2026-01-01\r\n']
+    lines += [f'Expense,Netflix,,1.00,2026-01-{day:02d},\r\n' for day in range(1, 21)]
+    lines.append('Expense,Netflix,,2.00,02/10/2026,\r\n')
+    lines += ['Expense,Netflix,,3.00,13/02/2026,\r\n'] * 10
+    lines += [f'Expense,Netflix,,4.00,03/{day:02d}/2026,\r\n' for day in range(1, 11)]
+    filename.write_text(''.join(lines), newline='')
+    return str(filename)
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_chunks_keep_the_files_date_format(ambiguous_ledger, jobs, capsys):
+    expenses, income, _ = ingest_files(ambiguous_ledger, jobs=jobs, chunk_bytes=200)
+    warnings = capsys.readouterr().out
+    serial_expenses, serial_income = read_csv_file(ambiguous_ledger, use_snapshot=False)
+    
+    assert rows_of(expenses) == rows_of(serial_expenses)
+    assert rows_of(income) == rows_of(serial_income)
+    assert warnings.count("ambiguous date(s) in 'Due Date' of") == 1
+    assert warnings.count("do not match its format %m/%d/%Y") == 1
+
+def test_chunks_fall_back_to_the_first_detected_format(ambiguous_ledger, monkeypatch, capsys):
+    # A sample of ISO dates only leaves the format to whichever chunk finds it first
+    monkeypatch.setattr('expense_tracker.storage._sample_date_formats', lambda filename: {})
+    expenses, _, _ = ingest_files(ambiguous_ledger, jobs=1, chunk_bytes=200)
+    capsys.readouterr()
+    serial_expenses, _ = read_csv_file(ambiguous_ledger, use_snapshot=False)
+    
+    assert rows_of(expenses) == rows_of(serial_expenses)
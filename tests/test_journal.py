@@ -0,0 +1,122 @@
+"""Journaled edits must come back exactly when the ledger is read again."""
+import os
+from datetime import datetime
+
+import pytest
+
+from expense_tracker.core import JOURNAL_COMPACT_THRESHOLD, SNAPSHOT_SUFFIX, EditHistory, Money
+from expense_tracker.storage import LedgerJournal, _umask, read_csv_file, save_ledger, save_to_csv
+from test_history import state
+
+def edit_everything(expenses, income):
+    expenses.add_row('Corner Store', 4200, datetime(2026, 3, 4).toordinal())
+    expenses.set_cents(2, 999)
+    expenses.set_name(3, 'Netflix')
+    expenses.set_ordinal(4, datetime(2026, 4, 1).toordinal())
+    expenses.pop(5)
+    expenses.insert_row(1, 'Chase Visa', 7700, datetime(2026, 3, 2).toordinal())
+    expenses.add_recurring('Netflix', Money(1599), 'monthly', datetime(2026, 1, 15))
+    expenses.add_recurring('Chase Visa', None, 'annual', datetime(2026, 6, 1))
+    expenses.remove_recurring(0)
+    income.set_cents(0, 300000)
+
+@pytest.mark.parametrize('use_snapshot', [True, False])
+def test_reading_replays_journaled_edits(ledger_file, use_snapshot):
+    expenses, income = read_csv_file(ledger_file)
+    journal = LedgerJournal(ledger_file)
+    journal.attach(expenses, income)
+    edit_everything(expenses, income)
+    journal.close()
+    
+    assert journal.op_count == 10
+    assert state(*read_csv_file(ledger_file, use_snapshot=use_snapshot)) == state(expenses, income)
+
+def test_undo_and_redo_are_journaled_too(ledger_file):
+    expenses, income = read_csv_file(ledger_file)
+    journal = LedgerJournal(ledger_file)
+    journal.attach(expenses, income)
+    history = EditHistory(expenses, income, user='tester')
+    with history.edit("Edits"):
+        edit_everything(expenses, income)
+    history.undo()
+    history.redo()
+    history.undo()
+    journal.close()
+    assert state(*read_csv_file(ledger_file)) == state(expenses, income)
+
+def test_rollback_drops_only_this_sessions_edits(ledger_file):
+    expenses, income = read_csv_file(ledger_file)
+    journal = LedgerJournal(ledger_file)
+    journal.attach(expenses, income)
+    expenses.set_cents(0, 1)
+    journal.close()
+    kept = state(expenses, income)
+    
+    expenses, income = read_csv_file(ledger_file)
+    journal = LedgerJournal(ledger_file)
+    journal.attach(expenses, income)
+    expenses.pop(0)
+    journal.rollback()
+    assert state(*read_csv_file(ledger_file)) == kept
+
+def test_close_stops_listening(ledger_file):
+    expenses, income = read_csv_file(ledger_file)
+    journal = LedgerJournal(ledger_file)
+    journal.attach(expenses, income)
+    journal.close()
+    expenses.set_cents(0, 1)
+    assert expenses.listeners == [] and income.listeners == []
+    assert journal.op_count == 0
+
+def test_a_rewritten_csv_ignores_the_old_journal(ledger_file):
+    expenses, income = read_csv_file(ledger_file)
+    journal = LedgerJournal(ledger_file)
+    journal.attach(expenses, income)
+    expenses.set_cents(0, 1)
+    journal.close()
+    with open(ledger_file, 'a', newline='') as f:
+        f.write('Expense,Netflix,,5.00,2026-05-01,\r\n')
+    expenses, income = read_csv_file(ledger_file, use_snapshot=False)
+    assert expenses.cents[0] == 1001 and len(expenses) == 11
+
+def test_a_truncated_last_line_is_skipped(ledger_file):
+    expenses, income = read_csv_file(ledger_file)
+    journal = LedgerJournal(ledger_file)
+    journal.attach(expenses, income)
+    expenses.set_cents(0, 1)
+    expenses.set_cents(1, 2)
+    journal.close()
+    with open(journal.path, 'rb+') as f:
+        f.truncate(os.path.getsize(journal.path) - 8)
+    expenses, income = read_csv_file(ledger_file)
+    assert (expenses.cents[0], expenses.cents[1]) == (1, 1002)
+
+def test_saving_compacts_a_long_journal_into_the_csv(ledger_file):
+    expenses, income = read_csv_file(ledger_file)
+    journal = LedgerJournal(ledger_file)
+    journal.attach(expenses, income)
+    for cents in range(JOURNAL_COMPACT_THRESHOLD):
+        expenses.set_cents(0, cents)
+    save_ledger(expenses, income, ledger_file, journal)
+    
+    assert LedgerJournal(ledger_file)._read_ops() == []
+    assert state(*read_csv_file(ledger_file)) == state(expenses, income)
+
+def test_saving_a_short_journal_leaves_the_csv_alone(ledger_file):
+    expenses, income = read_csv_file(ledger_file)
+    journal = LedgerJournal(ledger_file)
+    journal.attach(expenses, income)
+    expenses.set_cents(0, 5)
+    mtime = os.stat(ledger_file).st_mtime_ns
+    save_ledger(expenses, income, ledger_file, journal)
+    assert os.stat(ledger_file).st_mtime_ns == mtime
+    assert state(*read_csv_file(ledger_file)) == state(expenses, income)
+
+@pytest.mark.skipif(os.name != 'posix', reason="POSIX permissions")
+def test_rewrites_keep_the_files_permissions(ledger_file):
+    # The fixture's save created the snapshot: it gets the umask's permissions, not mkstemp's 0600
+    assert os.stat(ledger_file + SNAPSHOT_SUFFIX).st_mode & 0o777 == 0o666 & ~_umask()
+    os.chmod(ledger_file, 0o640)
+    expenses, income = read_csv_file(ledger_file)
+    save_to_csv(expenses, income, ledger_file)
+    assert os.stat(ledger_file).st_mode & 0o777 == 0o640
@@ -0,0 +1,51 @@
+"""Money stays exact integer cents: floats never mix in from either side, and text parses strictly."""
+import operator
+import pickle
+
+import pytest
+
+from expense_tracker.core import Money, parse_cents
+
+FLOAT_OPERATIONS = [operator.add, operator.sub, operator.mul, operator.truediv, operator.floordiv,
+                    operator.lt, operator.le, operator.gt, operator.ge]
+
+@pytest.mark.parametrize('operation', FLOAT_OPERATIONS, ids=lambda operation: operation.__name__)
+def test_floats_are_rejected_in_both_operand_orders(operation):
+    with pytest.raises(TypeError):
+        operation(Money(250), 1.5)
+    with pytest.raises(TypeError):
+        operation(1.5, Money(250))
+
+def test_floats_are_never_equal():
+    assert Money(250) != 2.5 and 2.5 != Money(250)
+    assert not Money(200) == 2.0 and not 200.0 == Money(200)
+
+def test_integer_cents_arithmetic_stays_money():
+    amount = Money(250)
+    for result, cents in ((amount + 50, 300), (50 + amount, 300), (amount - 50, 200), (1000 - amount, 750),
+                          (amount * 3, 750), (3 * amount, 750), (amount // 3, 83), (-amount, -250),
+                          (sum([amount, amount]), 500)):
+        assert type(result) is Money and result == cents
+    assert Money(750) // amount == 3
+    with pytest.raises(TypeError):
+        amount / 2
+    with pytest.raises(TypeError):
+        Money(2.5)
+
+def test_money_acts_as_its_cents():
+    amount = Money(-125050)
+    assert int(amount) == operator.index(amount) == -125050
+    assert float(amount) == -1250.5
+    assert hash(amount) == hash(-125050) and {-125050: 'x'}[amount] == 'x'
+    assert str(amount) == '-1250.50' and f"{amount:>10,.2f}" == ' -1,250.50'
+    assert pickle.loads(pickle.dumps(amount)) == amount
+
+@pytest.mark.parametrize('text, cents', [('250', 25000), ('250.5', 25050), ('-1,250.00', -125000),
+                                         ('+12,345,678.9', 1234567890), ('1,000.005', 100000)])
+def test_parse_cents_accepts_thousands_groups(text, cents):
+    assert parse_cents(text) == cents
+
+@pytest.mark.parametrize('text', ['1,2,3', '1,23', '1234,567', ',100', '1,000,00', '1.000,50', '1,,000'])
+def test_parse_cents_rejects_misplaced_commas(text):
+    with pytest.raises(ValueError):
+        parse_cents(text)
@@ -0,0 +1,65 @@
+"""The ledger service must answer bad input with 400, bugs with 500, and resolve names without writing."""
+import json
+import threading
+from http.client import HTTPConnection
+
+import pytest
+
+from expense_tracker.core import ExpenseStore
+from expense_tracker.service import make_ledger_server
+
+@pytest.fixture
+def server(ledger_file):
+    server = make_ledger_server(ledger_file)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    server.service.close()
+
+def request(server, method, path, payload=None):
+    connection = HTTPConnection(*server.server_address[:2])
+    try:
+        connection.request(method, path, body=None if payload is None else json.dumps(payload))
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+def test_canonical_name_is_read_only_and_current():
+    store = ExpenseStore()
+    store.intern('Corner Store')
+    store.intern('Netflix')
+    store.intern('NETFLIX')
+    folded = dict(store._folded_lookup)
+    assert store.canonical_name('corner STORE') == 'Corner Store'
+    # The first spelling registered wins
+    assert store.canonical_name('netflix') == 'Netflix'
+    assert store.canonical_name('Nowhere') == 'Nowhere'
+    assert store._folded_lookup == folded
+
+@pytest.mark.parametrize('payload, message', [
+    ({'Payee': 'Netflix', 'Amount': 5, 'Due Date': 5}, "'Due Date' must be a date string"),
+    ({'Payee': 'Netflix', 'Amount': [5], 'Due Date': '2026-03-01'}, "'Amount' must be a number"),
+    ({'Payee': 'Netflix', 'Amount': 5, 'Due Date': 'soon'}, None),
+    (['Netflix'], "expected a JSON object"),
+])
+def test_bad_input_is_a_400(server, payload, message):
+    status, body = request(server, 'POST', '/expenses', payload)
+    assert status == 400
+    assert message is None or body['error'] == message
+
+def test_names_resolve_case_insensitively(server):
+    status, body = request(server, 'POST', '/expenses', {'Payee': 'chase visa', 'Amount': 12.5, 'Due Date': '2026-03-20'})
+    assert status == 201 and body['Payee'] == 'Chase Visa'
+    status, body = request(server, 'GET', '/expenses?payee=NETFLIX')
+    assert status == 200 and body['total'] == 5
+
+def test_unexpected_errors_are_a_500(server, monkeypatch, capsys):
+    def broken(*args):
+        raise TypeError("internal detail")
+    monkeypatch.setattr(server.service, 'handle', broken)
+    status, body = request(server, 'GET', '/analysis')
+    assert status == 500 and 'internal detail' not in body['error']
+    assert 'internal detail' in capsys.readouterr().err
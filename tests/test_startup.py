@@ -0,0 +1,26 @@
+"""The headless analysis path must start within its budget and leave optional features unloaded."""
+import pytest
+
+from bench_startup import BUDGET_MS, headless_command, import_times, startup_times, time_to_first_output
+from ledger_generator import generate_ledger
+
+# Features the headless path must not pay for at startup
+OPTIONAL_MODULES = ['numpy', 'sqlite3', 'expense_tracker.sqlite_storage', 'expense_tracker.service',
+                    'expense_tracker.watch', 'http.server', 'asyncio', 'concurrent.futures', 'shutil']
+
+@pytest.fixture(scope='module')
+def command(tmp_path_factory):
+    command = headless_command(generate_ledger(str(tmp_path_factory.mktemp('startup') / 'ledger.csv'), 100))
+    # Write the snapshot and bytecode first, as every run after the first finds them
+    time_to_first_output(command)
+    return command
+
+def test_headless_run_leaves_optional_modules_unloaded(command):
+    imported = {module.strip() for _, module in import_times(command)}
+    assert 'expense_tracker.headless' in imported
+    assert [module for module in OPTIONAL_MODULES if module in imported] == []
+
+def test_headless_cold_start_is_within_budget(command):
+    # The best run, as in bench_startup.py: a busy machine only adds time
+    best = min(startup_times(command, 10)) * 1000
+    assert best <= BUDGET_MS, f"cold start {best:.1f} ms is over the {BUDGET_MS:.0f} ms budget"
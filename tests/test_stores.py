@@ -0,0 +1,98 @@
+"""The due-date and per-name indexes must match a scan of the columns after any edits."""
+import random
+from array import array
+
+import pytest
+
+from expense_tracker.core import MAX_CENTS, PAYEES, ExpenseStore
+
+NAMES = PAYEES[:4] + ['Corner Store']
+START = 739000
+
+def rows_of(store):
+    return [(store.names[store.name_ids[row]], store.cents[row], store.ordinals[row]) for row in range(len(store))]
+
+def check_indexes(store):
+    rows = rows_of(store)
+    due = sorted((ordinal, row) for row, (_, cents, ordinal) in enumerate(rows) if cents > 0)
+    assert list(store.rows_due_between(0).rows) == [row for _, row in due]
+    assert list(store.rows_due_between(START + 10, START + 20).rows) == \
+        [row for ordinal, row in due if START + 10 <= ordinal < START + 20]
+    for name in NAMES:
+        positions = [row for row, (row_name, _, _) in enumerate(rows) if row_name == name]
+        assert list(store.rows_for(name).rows) == positions
+        assert store.total_cents_for(name) == sum(rows[row][1] for row in positions)
+        first = store.first_row(name)
+        assert (first.index if first else None) == (positions[0] if positions else None)
+    ordinals, index_rows = store.due_index()
+    assert list(zip(ordinals, index_rows)) == due
+
+def random_edit(store, rng):
+    choice = rng.random()
+    row = (rng.choice(NAMES), rng.choice([0, -500, rng.randrange(1, 100000)]), START + rng.randrange(40))
+    if choice < 0.3 or not len(store):
+        store.add_row(*row)
+    elif choice < 0.45:
+        store.set_ordinal(rng.randrange(len(store)), row[2])
+    elif choice < 0.55:
+        store.set_cents(rng.randrange(len(store)), row[1])
+    elif choice < 0.6:
+        store.set_name(rng.randrange(len(store)), row[0])
+    elif choice < 0.8:
+        store.pop(rng.randrange(len(store)))
+    elif choice < 0.9:
+        store.insert_row(rng.randrange(len(store) + 1), *row)
+    elif choice < 0.95:
+        store.remove_rows(rng.sample(range(len(store)), min(len(store), 3)))
+    else:
+        store.extend_columns(array('I', [store.intern(row[0])]), array('q', [row[1]]), array('i', [row[2]]))
+
+@pytest.mark.parametrize('seed', range(40))
+def test_indexes_match_columns_after_random_edits(seed):
+    rng = random.Random(seed)
+    store = ExpenseStore()
+    # Build the indexes at different points so both upkeep and rebuilds are covered
+    if seed % 2:
+        store.due_index()
+        store.rows_for(NAMES[0])
+    for _ in range(rng.randrange(1, 150)):
+        random_edit(store, rng)
+        if rng.random() < 0.1:
+            check_indexes(store)
+    check_indexes(store)
+
+def test_adding_an_earlier_due_date_keeps_the_index_built():
+    store = ExpenseStore()
+    for day in (5, 10, 20):
+        store.add_row(NAMES[0], 100, START + day)
+    store.due_index()
+    store.add_row(NAMES[1], 200, START + 1)
+    assert not store.index_is_stale()
+    assert list(store.rows_due_between(START, START + 6).rows) == [3, 0]
+
+def test_undoing_a_delete_reuses_the_row_id():
+    store = ExpenseStore()
+    for day in range(10):
+        store.add_row(NAMES[day % 2], 100 + day, START + day)
+    store.due_index()
+    store.rows_for(NAMES[0])
+    removed = store.pop(4)
+    store.insert_row(4, removed['Payee'], int(removed['Amount']), removed['Due Date'].toordinal())
+    assert store._holes == []
+    check_indexes(store)
+
+@pytest.mark.parametrize('cents', [MAX_CENTS + 1, -MAX_CENTS - 2, 2**80])
+def test_out_of_range_amount_leaves_the_store_unchanged(cents):
+    store = ExpenseStore()
+    store.add_row(NAMES[0], 100, START)
+    store.due_index()
+    store.rows_for(NAMES[0])
+    before = rows_of(store)
+    with pytest.raises(ValueError):
+        store.add_row(NAMES[1], cents, START + 1)
+    with pytest.raises(ValueError):
+        store.set_cents(0, cents)
+    with pytest.raises(ValueError):
+        store.insert_row(0, NAMES[1], cents, START + 1)
+    assert rows_of(store) == before
+    check_indexes(store)
@@ -0,0 +1,59 @@
+"""plan_transfers must keep every account funded with as few transfers as it safely can."""
+import random
+from datetime import datetime
+
+from expense_tracker.analysis import plan_transfers
+from expense_tracker.core import ExpenseStore, IncomeStore, Money
+
+AS_OF = datetime(2026, 10, 17)
+
+def ledger(balances, bills):
+    expenses, income = ExpenseStore(), IncomeStore()
+    for account, amount in balances.items():
+        income.add(account, Money(amount), AS_OF)
+    for payee, amount, due in bills:
+        expenses.add(payee, Money(amount), due)
+    return expenses, income
+
+def transfers_of(plan):
+    return [(transfer['Date'], transfer['From'], transfer['To'], transfer['Amount']) for transfer in plan['transfers']]
+
+def test_one_top_up_covers_later_periods():
+    expenses, income = ledger({'SCCU Checking': 0, 'E-Trade Savings': 1000000},
+                              [('Netflix', 15050, datetime(2026, 10, 20)), ('Chase Visa', 7500, datetime(2026, 11, 5))])
+    plan = plan_transfers(expenses, income, AS_OF, months=2, margin=0)
+    assert transfers_of(plan) == [(AS_OF, 'E-Trade Savings', 'SCCU Checking', Money(22550))]
+    assert plan['shortfalls'] == []
+
+def test_money_moves_just_in_time_when_it_cannot_cover_everyone():
+    # Pre-funding the card's later bill would leave checking short sooner
+    expenses, income = ledger({'SCCU Checking': 0, 'Visa': 0, 'E-Trade Savings': 12000},
+                              [('Netflix', 10000, datetime(2026, 10, 20)), ('Netflix', 5000, datetime(2026, 11, 20)),
+                               ('Store', 5000, datetime(2026, 11, 5))])
+    plan = plan_transfers(expenses, income, AS_OF, months=2, margin=0, payee_accounts={'Store': 'Visa'})
+    assert transfers_of(plan) == [(AS_OF, 'E-Trade Savings', 'SCCU Checking', Money(10000)),
+                                  (datetime(2026, 11, 1), 'E-Trade Savings', 'Visa', Money(2000))]
+    assert [(short['Account'], short['Amount']) for short in plan['shortfalls']] == \
+        [('Visa', Money(3000)), ('SCCU Checking', Money(5000))]
+
+def test_every_account_stays_above_its_margin():
+    rng = random.Random(5)
+    accounts = [f'Card {i}' for i in range(6)]
+    balances = {account: rng.randrange(0, 50000) for account in accounts}
+    balances['E-Trade Savings'] = 10000000
+    payees = {f'Payee {i}': rng.choice(accounts) for i in range(20)}
+    bills = [(rng.choice(list(payees)), rng.randrange(1, 40000), datetime.fromordinal(AS_OF.toordinal() + rng.randrange(180)))
+             for _ in range(300)]
+    expenses, income = ledger(balances, bills)
+    margins = {account: Money(10000) for account in accounts}
+    plan = plan_transfers(expenses, income, AS_OF, months=6, payee_accounts=payees, margins=margins)
+    
+    assert plan['shortfalls'] == []
+    # One top-up per account that needs one, and no more money than they lack in total
+    assert len(plan['transfers']) <= len(accounts) + 1
+    for account, balance in plan['balances_after'].items():
+        assert balance >= plan['margins'][account]
+    needed = sum(max(0, amount + plan['margins'][account] - balances.get(account, 0))
+                 for account, amount in ((account, sum(bill[1] for bill in bills if payees[bill[0]] == account))
+                                         for account in accounts))
+    assert plan['total'] == needed